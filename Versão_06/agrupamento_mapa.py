@@ -0,0 +1,185 @@
+"""
+Agrupamento dos pontos de coleta no servidor, para o mapa.
+
+Em vez de mandar todos os pontos ao navegador, a base é agrupada uma vez
+por versão numa pirâmide de níveis de zoom: em cada nível os pontos caem
+em células de `CELULA_PX` pixels da projeção do mapa (Web Mercator) e
+cada célula vira um grupo com a quantidade de pontos e o centro médio. As
+células de um nível são a união de 2x2 células do nível seguinte, então
+a pirâmide é montada de baixo para cima sem voltar aos pontos.
+
+A cada rerun só os grupos (ou, nos zooms mais próximos, os pontos) que
+caem na área visível são enviados, com no máximo `LIMITE_MARCADORES`.
+"""
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+# Tamanho da célula na tela; potência de 2 para as células se encaixarem
+CELULA_PX = 64
+TAMANHO_TILE_PX = 256
+ZOOM_MIN = 3
+# Acima deste zoom os pontos são mostrados um a um
+ZOOM_MAX = 15
+LIMITE_MARCADORES = 1500
+# Margem (fração da área visível) para o arraste não mostrar bordas vazias
+MARGEM_VISTA = 0.25
+
+
+def mercator(lats, lons):
+    """Coordenadas em [0, 1) na projeção Web Mercator."""
+    lats = np.clip(lats, -85.05112878, 85.05112878)
+    x = (lons + 180.0) / 360.0
+    seno = np.sin(np.radians(lats))
+    y = 0.5 - np.log((1 + seno) / (1 - seno)) / (4 * math.pi)
+    return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+
+def area_em_volta(lat, lon, zoom, largura_px=800, altura_px=500):
+    """(sul, oeste, norte, leste) visível num mapa centrado em (lat, lon)."""
+    graus_por_px = 360.0 / (TAMANHO_TILE_PX * (1 << int(zoom)))
+    meia_lon = largura_px / 2 * graus_por_px
+    meia_lat = altura_px / 2 * graus_por_px * math.cos(math.radians(lat))
+    return lat - meia_lat, lon - meia_lon, lat + meia_lat, lon + meia_lon
+
+
+def _agrupar(linhas, colunas, quantidades, somas_lat, somas_lon, primeiros):
+    """Soma os grupos que caem na mesma célula (linha, coluna)."""
+    chaves = (linhas << 32) | colunas
+    unicas, inverso = np.unique(chaves, return_inverse=True)
+    n = len(unicas)
+    primeiro = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(primeiro, inverso, primeiros)
+    return (
+        unicas >> 32,
+        unicas & 0xFFFFFFFF,
+        np.bincount(inverso, weights=quantidades, minlength=n).astype(np.int64),
+        np.bincount(inverso, weights=somas_lat, minlength=n),
+        np.bincount(inverso, weights=somas_lon, minlength=n),
+        primeiro,
+    )
+
+
+class PiramideClusters:
+    """
+    Pirâmide de grupos sobre o DataFrame de pontos (colunas `latitude`,
+    `longitude` e, opcionalmente, `nome`, `endereco` e `categorias`).
+    """
+
+    def __init__(self, pontos, zoom_min=ZOOM_MIN, zoom_max=ZOOM_MAX, celula_px=CELULA_PX):
+        inicio = time.perf_counter()
+        self.pontos = pontos.reset_index(drop=True)
+        self.zoom_min = zoom_min
+        self.zoom_max = zoom_max
+        self._niveis = {}
+        self.ultima_consulta = None
+
+        lats = self.pontos["latitude"].to_numpy(dtype=np.float64)
+        lons = self.pontos["longitude"].to_numpy(dtype=np.float64)
+        self._pontos = self._nivel(lats, lons, np.ones(len(lats), dtype=np.int64),
+                                   np.arange(len(lats), dtype=np.int64))
+
+        # Células no zoom máximo; cada nível acima divide linha e coluna por 2
+        bits = zoom_max + int(math.log2(TAMANHO_TILE_PX // celula_px))
+        x, y = mercator(lats, lons)
+        grupos = (
+            np.floor(y * (1 << bits)).astype(np.int64),
+            np.floor(x * (1 << bits)).astype(np.int64),
+            np.ones(len(lats)), lats, lons, np.arange(len(lats), dtype=np.int64),
+        )
+        for zoom in range(zoom_max, zoom_min - 1, -1):
+            grupos = _agrupar(*grupos)
+            linhas, colunas, quantidades, somas_lat, somas_lon, primeiros = grupos
+            self._niveis[zoom] = self._nivel(somas_lat / quantidades, somas_lon / quantidades,
+                                             quantidades, primeiros)
+            grupos = (linhas >> 1, colunas >> 1, quantidades, somas_lat, somas_lon, primeiros)
+
+        self.tempo_construcao = time.perf_counter() - inicio
+
+    @staticmethod
+    def _nivel(lats, lons, quantidades, primeiros):
+        """Arrays de um nível ordenados pela longitude (para `searchsorted`)."""
+        ordem = np.argsort(lons, kind="stable")
+        return {
+            "lat": lats[ordem],
+            "lon": lons[ordem],
+            "quantidade": quantidades[ordem],
+            "primeiro": primeiros[ordem],
+        }
+
+    # ---------------------------------------------------------------- #
+    def vista_inicial(self):
+        """Área que enquadra todos os pontos: (sul, oeste, norte, leste)."""
+        if len(self.pontos) == 0:
+            return -33.75, -73.99, 5.27, -34.79   # Brasil
+        lats, lons = self._pontos["lat"], self._pontos["lon"]
+        return float(lats.min()), float(lons[0]), float(lats.max()), float(lons[-1])
+
+    def zoom_inicial(self, largura_px=800, altura_px=500):
+        """Maior zoom em que a `vista_inicial` cabe no mapa."""
+        sul, oeste, norte, leste = self.vista_inicial()
+        x, y = mercator(np.array([sul, norte]), np.array([oeste, leste]))
+        largura = max(abs(x[1] - x[0]), 1e-9)
+        altura = max(abs(y[1] - y[0]), 1e-9)
+        zoom = math.floor(min(math.log2(largura_px / (largura * TAMANHO_TILE_PX)),
+                              math.log2(altura_px / (altura * TAMANHO_TILE_PX))))
+        return max(self.zoom_min, min(zoom, self.zoom_max + 3))
+
+    def visiveis(self, sul, oeste, norte, leste, zoom, limite=LIMITE_MARCADORES):
+        """
+        Grupos e pontos dentro da área, como DataFrame com `latitude`,
+        `longitude` e `quantidade`. Onde a quantidade é 1 vêm também os dados
+        do ponto. Se passar de `limite`, ficam os maiores grupos e
+        `attrs["truncado"]` indica o corte.
+        """
+        zoom = int(round(zoom))
+        if zoom > self.zoom_max:
+            nivel = self._pontos
+        else:
+            nivel = self._niveis.get(max(zoom, self.zoom_min), self._pontos)
+
+        margem_lat = (norte - sul) * MARGEM_VISTA
+        margem_lon = (leste - oeste) * MARGEM_VISTA
+        i, j = np.searchsorted(nivel["lon"], [oeste - margem_lon, leste + margem_lon], side="left")
+        faixa = slice(i, j)
+        dentro = (nivel["lat"][faixa] >= sul - margem_lat) & (nivel["lat"][faixa] <= norte + margem_lat)
+        selecionados = np.flatnonzero(dentro) + i
+
+        total = len(selecionados)
+        if total > limite:
+            maiores = np.argpartition(-nivel["quantidade"][selecionados], limite - 1)[:limite]
+            selecionados = selecionados[maiores]
+
+        quantidades = nivel["quantidade"][selecionados]
+        resultado = pd.DataFrame({
+            "latitude": nivel["lat"][selecionados],
+            "longitude": nivel["lon"][selecionados],
+            "quantidade": quantidades,
+        })
+        unicos = quantidades == 1
+        for coluna in ("nome", "endereco", "categorias"):
+            if coluna in self.pontos.columns:
+                valores = pd.Series(pd.NA, index=resultado.index, dtype="string")
+                linhas = nivel["primeiro"][selecionados][unicos]
+                valores[unicos] = self.pontos[coluna].iloc[linhas].astype("string").to_numpy()
+                resultado[coluna] = valores
+
+        resultado.attrs["truncado"] = total > limite
+        self.ultima_consulta = {
+            "zoom": zoom,
+            "nivel": "pontos" if nivel is self._pontos else max(zoom, self.zoom_min),
+            "na_area": total,
+            "enviados": len(resultado),
+            "truncado": total > limite,
+        }
+        return resultado
+
+    def info(self):
+        return {
+            "pontos": len(self.pontos),
+            "grupos_por_zoom": {z: len(n["lat"]) for z, n in sorted(self._niveis.items())},
+            "tempo_construcao_s": round(self.tempo_construcao, 3),
+            "ultima_consulta": self.ultima_consulta,
+        }
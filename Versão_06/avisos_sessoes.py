@@ -0,0 +1,65 @@
+"""
+Avisos do servidor para as sessões que estão vendo um conteúdo.
+
+O Streamlit só reexecuta o script quando o navegador pede. Em vez de cada
+sessão redesenhar a aba inteira por tempo, a fonte de dados chama `avisar()`
+quando algo muda de verdade (planilha nova, nuvem nova pronta), o que só
+incrementa `revisao`. Cada sessão guarda no session_state a revisão que
+desenhou, e um fragmento minúsculo com `run_every` (API pública do
+Streamlit) compara as duas: sem mudança ele não desenha nada; com mudança,
+pede o rerun.
+"""
+import threading
+import time
+
+import streamlit as st
+
+CHAVE_SESSAO = "avisos_revisao_exibida"
+
+
+class AvisosSessoes:
+    """Contador de revisões do conteúdo, compartilhado pelas sessões."""
+
+    def __init__(self, chave=CHAVE_SESSAO):
+        self.chave = chave
+        self.revisao = 0
+        self.avisos = 0
+        self.reruns_pedidos = 0
+        self.ultimo_aviso = None
+        self._lock = threading.Lock()
+
+    def avisar(self, *_):
+        """
+        Marca que o conteúdo mudou. Pode ser chamado de qualquer thread (ex.:
+        como callback de `FontePlanilha.ao_mudar`). Retorna a nova revisão.
+        """
+        with self._lock:
+            self.revisao += 1
+            self.avisos += 1
+            self.ultimo_aviso = time.time()
+            return self.revisao
+
+    def marcar_exibida(self, revisao):
+        """Guarda na sessão a revisão lida antes de desenhar o conteúdo."""
+        st.session_state[self.chave] = revisao
+
+    def desatualizada(self):
+        """Se a sessão desenhou uma revisão anterior à atual (custo: uma comparação)."""
+        exibida = st.session_state.get(self.chave)
+        return exibida is not None and exibida != self.revisao
+
+    def verificar(self):
+        """Chamado pelo fragmento vigia: pede o rerun se a sessão está desatualizada."""
+        if self.desatualizada():
+            with self._lock:
+                self.reruns_pedidos += 1
+            st.rerun()
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "revisao": self.revisao,
+            "avisos": self.avisos,
+            "reruns_pedidos": self.reruns_pedidos,
+            "ultimo_aviso_ha_s": None if self.ultimo_aviso is None else round(time.time() - self.ultimo_aviso, 1),
+        }
@@ -0,0 +1,71 @@
+"""
+Benchmark da análise de cobertura (AnaliseCobertura, com poda por bloco)
+contra a força bruta vetorizada (todas as células contra todos os pontos,
+em lotes), com conferência de que as distâncias batem.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_cobertura.py
+    python benchmarks/bench_cobertura.py --pontos 100 1000 10000 --resolucao 50
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cobertura import KM_POR_GRAU, AnaliseCobertura, _distancias_bloco  # noqa: E402
+
+# Região aproximada do município de São Paulo
+REGIAO = (-23.85, -46.83, -23.40, -46.36)
+
+
+def gerar_pontos(n, seed=42):
+    rnd = np.random.default_rng(seed)
+    sul, oeste, norte, leste = REGIAO
+    return pd.DataFrame({
+        "latitude": rnd.uniform(sul, norte, n).astype("float32"),
+        "longitude": rnd.uniform(oeste, leste, n).astype("float32"),
+    })
+
+
+def forca_bruta(analise, pontos):
+    sul, oeste, _, _ = analise.regiao
+    km_lon = KM_POR_GRAU * math.cos(math.radians(analise._lat0))
+    passo_km = analise.resolucao_m / 1000
+    ys, xs = np.meshgrid((np.arange(analise.linhas, dtype=np.float32) + 0.5) * passo_km,
+                         (np.arange(analise.colunas, dtype=np.float32) + 0.5) * passo_km, indexing="ij")
+    pontos_x = ((pontos["longitude"].to_numpy(np.float64) - oeste) * km_lon).astype(np.float32)
+    pontos_y = ((pontos["latitude"].to_numpy(np.float64) - sul) * KM_POR_GRAU).astype(np.float32)
+    return _distancias_bloco(xs.ravel(), ys.ravel(), pontos_x, pontos_y).reshape(analise.distancias.shape)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da análise de cobertura")
+    parser.add_argument("--pontos", type=int, nargs="+", default=[40, 1000, 10_000])
+    parser.add_argument("--resolucao", type=float, default=50, help="metros por célula")
+    args = parser.parse_args()
+
+    print(f"{'pontos':>7} | {'células':>9} | {'blocos (s)':>10} | {'força bruta (s)':>15} | {'ganho':>6} | iguais")
+    print("-" * 72)
+    for n in args.pontos:
+        pontos = gerar_pontos(n)
+        inicio = time.perf_counter()
+        analise = AnaliseCobertura(pontos, resolucao_m=args.resolucao, regiao=REGIAO)
+        t_blocos = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = forca_bruta(analise, pontos)
+        t_bruto = time.perf_counter() - inicio
+
+        iguais = np.allclose(analise.distancias, referencia, atol=1e-4)
+        print(f"{n:>7} | {analise.linhas * analise.colunas:>9} | {t_blocos:10.2f} | {t_bruto:15.2f} | "
+              f"{t_bruto / t_blocos:5.1f}x | {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark do gráfico de frequência por período: recontar as respostas a
+cada rerun contra as contagens por dia do `FrequenciasPorDia`.
+
+Os tokens vêm prontos (como saem do `CacheTokens`), então só a agregação é
+medida. Para cada tamanho são medidos o top-15 de cada período e a
+atualização quando 1% de respostas novas chega na planilha.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_frequencias.py
+    python benchmarks/bench_frequencias.py --tamanhos 10000 100000 --dias 365
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from operator import itemgetter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frequencias_periodo import FrequenciasPorDia  # noqa: E402
+
+VOCABULARIO = [
+    "lixo", "eletrônico", "bateria", "celular", "descarte", "reciclagem", "solo", "água",
+    "saúde", "pilha", "coleta", "ponto", "metal", "pesado", "contaminar", "ambiente",
+    "computador", "lâmpada", "informação", "bairro", "incêndio", "lítio", "rio", "planeta",
+]
+PERIODOS = {"Tudo": None, "Últimos 30 dias": 30, "Últimos 7 dias": 7}
+HOJE = date(2025, 12, 31)
+
+
+def gerar(n, dias, seed=42):
+    """Respostas sintéticas: (dia, texto) e os tokens de cada texto."""
+    rnd = random.Random(seed)
+    linhas, tokens = [], {}
+    for i in range(n):
+        texto = f"resposta {i}"
+        tokens[texto] = [rnd.choice(VOCABULARIO) for _ in range(rnd.randint(3, 12))]
+        linhas.append((HOJE - timedelta(days=rnd.randrange(dias)), texto))
+    return linhas, tokens
+
+
+def recontar(linhas, tokens, dias):
+    """Caminho ingênuo: percorre todas as respostas a cada consulta."""
+    contagem = Counter()
+    for dia, texto in linhas:
+        if dias is None or (HOJE - dia).days < dias:
+            contagem.update(tokens[texto])
+    return heapq.nlargest(15, contagem.items(), key=itemgetter(1))
+
+
+def cronometrar(func, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das frequências por período")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dias", type=int, default=365)
+    args = parser.parse_args()
+
+    print(f"{'respostas':>10} | {'período':<16} | {'recontar (ms)':>13} | {'por dia (ms)':>12} | "
+          f"{'em cache (ms)':>13} | {'+1% (ms)':>9}")
+    print("-" * 90)
+    for n in args.tamanhos:
+        linhas, tokens = gerar(n, args.dias)
+        frequencias = FrequenciasPorDia(k=15)
+        frequencias.atualizar(linhas, tokens.__getitem__, versao=0)
+
+        novas, tokens_novos = gerar(max(1, n // 100), 7, seed=n)
+        novas = [(dia, "nova " + texto) for dia, texto in novas]
+        tokens.update({"nova " + t: v for t, v in tokens_novos.items()})
+        versoes = iter(range(1, 1000))
+
+        def chegar_respostas():
+            # Alterna entre com e sem as respostas novas, para medir sempre uma mudança
+            atual = linhas + novas if next(versoes) % 2 else linhas
+            frequencias.atualizar(atual, tokens.__getitem__, versao=len(atual))
+
+        t_atualizar = cronometrar(chegar_respostas)
+        for nome, dias in PERIODOS.items():
+            t_recontar = cronometrar(lambda: recontar(linhas, tokens, dias))
+            # Primeira consulta depois de uma mudança: monta a janela e o heap
+            frequencias.atualizar(linhas + novas, tokens.__getitem__, versao=-1)
+            frequencias.atualizar(linhas, tokens.__getitem__, versao=-2)
+            frequencias._janelas.clear()
+            t_frio = cronometrar(lambda: frequencias.top(dias, hoje=HOJE), repeticoes=1)
+            t_cache = cronometrar(lambda: frequencias.top(dias, hoje=HOJE))
+            assert [c for _, c in frequencias.top(dias, hoje=HOJE)] == [c for _, c in recontar(linhas, tokens, dias)]
+            print(f"{n:>10} | {nome:<16} | {t_recontar * 1000:13.2f} | {t_frio * 1000:12.3f} | "
+                  f"{t_cache * 1000:13.4f} | {t_atualizar * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
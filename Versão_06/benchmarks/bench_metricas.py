@@ -0,0 +1,74 @@
+"""
+Custo da instrumentação por etapa medida: desligada, ligada só em memória e
+ligada com exportação (Prometheus + JSONL).
+
+Cada medição é um `with metricas.etapa(...)` vazio dentro de um rerun, o
+pior caso (a etapa em si não custa nada). Ao final, o arquivo do Prometheus
+e o JSONL gerados são conferidos.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_metricas.py
+    python benchmarks/bench_metricas.py --medicoes 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metricas import Metricas  # noqa: E402
+
+ETAPAS = ["segredos", "spacy", "planilha", "process_texts", "nuvem", "grafico"]
+
+
+def medir(metricas, medicoes):
+    inicio = time.perf_counter()
+    with metricas.rerun("Opiniões", "sessao01"):
+        for i in range(medicoes):
+            with metricas.etapa(ETAPAS[i % len(ETAPAS)]):
+                pass
+    return (time.perf_counter() - inicio) / medicoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo das métricas por etapa")
+    parser.add_argument("--medicoes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        prometheus = os.path.join(pasta, "ecotech.prom")
+        jsonl = os.path.join(pasta, "ecotech.jsonl")
+        variantes = {
+            "desligada": Metricas(ativo=False),
+            "em memória": Metricas(),
+            "com exportação": Metricas(arquivo_prometheus=prometheus, arquivo_jsonl=jsonl, intervalo=3600),
+        }
+        vazio = time.perf_counter()
+        for _ in range(args.medicoes):
+            pass
+        base = (time.perf_counter() - vazio) / args.medicoes
+
+        print(f"{'instrumentação':<16} | {'por etapa (µs)':>14} | {'acima do laço vazio (µs)':>24}")
+        print("-" * 62)
+        for nome, metricas in variantes.items():
+            t = medir(metricas, args.medicoes)
+            print(f"{nome:<16} | {t * 1e6:14.3f} | {(t - base) * 1e6:24.3f}")
+
+        exportando = variantes["com exportação"]
+        inicio = time.perf_counter()
+        exportando.exportar()
+        t_exportar = time.perf_counter() - inicio
+        with open(prometheus, encoding="utf-8") as f:
+            series = [linha for linha in f if not linha.startswith("#")]
+        with open(jsonl, encoding="utf-8") as f:
+            registros = [json.loads(linha) for linha in f]
+        print(f"\nexportação: {t_exportar * 1000:.1f} ms, {len(series)} séries no Prometheus, "
+              f"{len(registros)} linhas JSONL (buffer de até 10000)")
+        print(f"exemplo JSONL: {registros[-1]}")
+
+
+if __name__ == "__main__":
+    main()
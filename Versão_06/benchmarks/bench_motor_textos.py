@@ -0,0 +1,92 @@
+"""
+Benchmark do MotorTextos (nlp.pipe em lote) contra o caminho antigo, que
+juntava todas as respostas em um único Doc.
+
+O ganho depende do modelo: com pt_core_news_sm/md/lg o caminho antigo passa
+cada resposta pelo parser e pelo NER, que o motor desliga. Com o blank_pt
+(só tokenizador e sentencizer) sobra pouco para economizar e os dois
+caminhos ficam perto de 1x; o que o motor garante ali é a lista de tokens
+por resposta e não ter o limite de nlp.max_length. `--n-process` acima do
+número de núcleos é reduzido pelo próprio motor.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_motor_textos.py
+    python benchmarks/bench_motor_textos.py --tamanhos 1000 10000 --n-process 4 --repeticoes 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recursos_nlp import GerenciadorNLP, MotorTextos, extrair_tokens  # noqa: E402
+
+SUJEITOS = ["O lixo eletrônico", "A bateria de lítio", "O celular velho", "A pilha usada",
+            "O descarte incorreto", "A reciclagem", "O computador antigo", "A lâmpada fluorescente"]
+VERBOS = ["contamina", "prejudica", "polui", "ajuda", "protege", "ameaça", "afeta", "salva"]
+OBJETOS = ["o meio ambiente", "o solo e a água", "a saúde das pessoas", "os rios da cidade",
+           "o planeta", "as próximas gerações", "a natureza", "os animais"]
+COMPLEMENTOS = ["quando jogado no lixo comum.", "se ninguém fizer nada.", "todos os dias.",
+                "e precisamos de mais pontos de coleta.", "por causa dos metais pesados.", ""]
+
+
+def gerar_corpus(n, seed=42):
+    """Respostas sintéticas em português no estilo da planilha."""
+    rnd = random.Random(seed)
+    return [
+        f"{rnd.choice(SUJEITOS)} {rnd.choice(VERBOS)} {rnd.choice(OBJETOS)} {rnd.choice(COMPLEMENTOS)}".strip()
+        for _ in range(n)
+    ]
+
+
+def caminho_antigo(nlp, textos):
+    """Reproduz o process_texts original: um Doc gigante com tudo junto."""
+    return extrair_tokens(nlp(" ".join(textos)))
+
+
+def medir(func, textos, repeticoes=1):
+    """Melhor tempo de `repeticoes` rodadas (a mínima sofre menos com ruído)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func(textos)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do MotorTextos")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    gerenciador = GerenciadorNLP()
+    nlp = gerenciador.obter()
+    print(f"Modelo: {gerenciador.nome_modelo} (carregado em {gerenciador.tempo_carga:.2f}s), "
+          f"componentes: {', '.join(nlp.pipe_names) or '—'}, núcleos: {os.cpu_count()}")
+    motor = MotorTextos(nlp, batch_size=args.batch_size, n_process=args.n_process)
+
+    print(f"{'respostas':>10} | {'antigo (resp/s)':>16} | {'motor (resp/s)':>15} | {'ganho':>6}")
+    print("-" * 58)
+    for n in args.tamanhos:
+        textos = gerar_corpus(n)
+
+        try:
+            t_antigo = medir(lambda t: caminho_antigo(nlp, t), textos, args.repeticoes)
+            antigo = f"{n / t_antigo:16.0f}"
+        except ValueError:
+            # O Doc único passa do nlp.max_length (E088)
+            t_antigo = None
+            antigo = f"{'max_length':>16}"
+
+        t_motor = medir(motor.processar, textos, args.repeticoes)
+        ganho = f"{t_antigo / t_motor:5.1f}x" if t_antigo else f"{'—':>6}"
+        print(f"{n:>10} | {antigo} | {n / t_motor:15.0f} | {ganho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark da correção de digitação: índice de deleções (SymSpell) contra a
+busca ingênua, que calcula a distância de Levenshtein do termo para cada
+palavra do vocabulário.
+
+O vocabulário é o `dados/vocabulario_pt.txt` completado com palavras
+sintéticas (sílabas do português) até cada tamanho pedido. Os termos
+consultados são palavras do vocabulário com 1 ou 2 erros aleatórios
+(troca, inserção, remoção ou inversão de letras), e cada palavra do
+vocabulário aparece de 10 a 100 vezes no corpus simulado. As duas buscas
+usam a mesma distância, as mesmas regras e o mesmo desempate, então devem
+concordar.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_ortografia.py
+    python benchmarks/bench_ortografia.py --tamanhos 1000 10000 --consultas 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_respostas import remover_acentos  # noqa: E402
+from correcao_ortografica import CorretorOrtografico, distancia_edicao, ler_vocabulario  # noqa: E402
+
+SILABAS = ["ba", "ca", "da", "fa", "ga", "la", "ma", "na", "pa", "ra", "sa", "ta", "va", "be", "ce",
+           "de", "fe", "le", "me", "ne", "pe", "re", "se", "te", "bi", "ci", "di", "li", "mi", "ni",
+           "pi", "ri", "si", "ti", "bo", "co", "do", "fo", "lo", "mo", "no", "po", "ro", "so", "to",
+           "bu", "cu", "du", "lu", "mu", "nu", "pu", "ru", "su", "tu", "ção", "gem", "dor", "mente"]
+LETRAS = "abcdefghijlmnopqrstuvxz"
+
+
+def gerar_vocabulario(tamanho, seed=42):
+    rnd = random.Random(seed)
+    palavras = list(dict.fromkeys(ler_vocabulario(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "vocabulario_pt.txt"))))
+    vistas = set(palavras)
+    while len(palavras) < tamanho:
+        palavra = "".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 5)))
+        if palavra not in vistas:
+            vistas.add(palavra)
+            palavras.append(palavra)
+    return palavras[:tamanho]
+
+
+def errar(palavra, rnd):
+    """Aplica 1 ou 2 erros de digitação aleatórios."""
+    letras = list(remover_acentos(palavra))
+    for _ in range(rnd.choice((1, 1, 2))):
+        i = rnd.randrange(len(letras))
+        tipo = rnd.choice(("troca", "insercao", "remocao", "inversao"))
+        if tipo == "troca":
+            letras[i] = rnd.choice(LETRAS)
+        elif tipo == "insercao":
+            letras.insert(i, rnd.choice(LETRAS))
+        elif tipo == "remocao" and len(letras) > 3:
+            del letras[i]
+        elif tipo == "inversao" and i + 1 < len(letras):
+            letras[i], letras[i + 1] = letras[i + 1], letras[i]
+    return "".join(letras)
+
+
+def busca_ingenua(corretor, termo):
+    """Compara o termo com todo o vocabulário (mesmas regras do corretor)."""
+    chave = remover_acentos(termo)
+    if chave in corretor._formas:
+        return corretor._formas[chave]
+    if len(chave) < corretor.tamanho_min:
+        return termo
+    limite = corretor._distancia_para(chave)
+    melhor, melhor_ordem = None, None
+    for candidato in corretor._formas:
+        distancia = distancia_edicao(chave, candidato)
+        if distancia > limite or not corretor._pode_trocar(chave, candidato):
+            continue
+        ordem = (distancia, -(corretor._frequencia[candidato] + corretor._corpus[candidato]), candidato)
+        if melhor_ordem is None or ordem < melhor_ordem:
+            melhor, melhor_ordem = candidato, ordem
+    return corretor._formas[melhor] if melhor is not None else termo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da correção de digitação")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--consultas", type=int, default=2_000)
+    parser.add_argument("--consultas-ingenua", type=int, default=100,
+                        help="a busca ingênua é lenta; só uma amostra é medida")
+    args = parser.parse_args()
+
+    print(f"{'vocabulário':>11} | {'índice (s)':>10} | {'deleções':>9} | {'SymSpell (µs)':>13} | "
+          f"{'ingênua (µs)':>12} | {'ganho':>7} | {'concordância':>12}")
+    print("-" * 94)
+    for tamanho in args.tamanhos:
+        rnd = random.Random(tamanho)
+        vocabulario = gerar_vocabulario(tamanho)
+        consultas = [errar(rnd.choice(vocabulario), rnd) for _ in range(args.consultas)]
+
+        inicio = time.perf_counter()
+        corretor = CorretorOrtografico(vocabulario)
+        t_indice = time.perf_counter() - inicio
+        # Só termos frequentes no corpus viram alvo de correção
+        corretor.aprender(Counter({p: rnd.randint(10, 100) for p in vocabulario}))
+
+        inicio = time.perf_counter()
+        respostas = [corretor.corrigir(t) for t in consultas]
+        t_symspell = (time.perf_counter() - inicio) / len(consultas)
+
+        amostra = consultas[:args.consultas_ingenua]
+        inicio = time.perf_counter()
+        ingenuas = [busca_ingenua(corretor, t) for t in amostra]
+        t_ingenua = (time.perf_counter() - inicio) / len(amostra)
+
+        iguais = sum(a == b for a, b in zip(respostas, ingenuas))
+        print(f"{tamanho:>11} | {t_indice:10.2f} | {len(corretor._indice):>9} | {t_symspell * 1e6:13.1f} | "
+              f"{t_ingenua * 1e6:12.0f} | {t_ingenua / t_symspell:6.0f}x | {iguais:>5}/{len(amostra):<6}")
+
+
+if __name__ == "__main__":
+    main()
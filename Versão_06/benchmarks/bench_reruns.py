@@ -0,0 +1,228 @@
+"""
+Tempo de rerun de cada interação: app inteiro contra só o fragmento.
+
+Sobe o projeto.py num `streamlit run` de verdade (com os substitutos locais
+no lugar da planilha, das imagens e do Gemini) e conversa com ele pelo
+websocket, como o navegador faz. Cada interação é repetida de dois jeitos:
+
+- app inteiro: o rerun que toda interação disparava antes dos fragmentos
+  (imports, segredos, menu, CSS e a aba toda);
+- fragmento: o rerun restrito ao `@st.fragment` da interação.
+
+O tempo medido vai do envio da interação até o servidor avisar que o script
+terminou; também é somado o tamanho das mensagens enviadas ao navegador.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --repeticoes 20 --porta 8599
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from tornado.websocket import websocket_connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import substitutos_locais  # noqa: E402
+
+PERGUNTA = "Tem ponto de coleta perto de Santo Amaro?"
+
+
+class Cliente:
+    """Sessão do navegador reduzida ao mínimo: widgets e reruns."""
+
+    def __init__(self, url):
+        self.url = url
+        self.conexao = None
+        self.estados = {}     # id do widget -> WidgetState (o navegador sempre manda todos)
+        self.widgets = {}     # (tipo, rótulo) -> (id, fragment_id)
+        self.fragmentos = set()   # fragmentos vistos no último rerun
+        self.vigias = {}          # fragmentos com run_every -> intervalo (s)
+
+    async def conectar(self):
+        self.conexao = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def _registrar(self, msg):
+        if msg.WhichOneof("type") == "auto_rerun":
+            self.vigias[msg.auto_rerun.fragment_id] = msg.auto_rerun.interval
+        if msg.WhichOneof("type") != "delta" or msg.delta.WhichOneof("type") != "new_element":
+            return
+        if msg.delta.fragment_id:
+            self.fragmentos.add(msg.delta.fragment_id)
+        elemento = msg.delta.new_element
+        tipo = elemento.WhichOneof("type")
+        proto = getattr(elemento, tipo)
+        if not hasattr(proto, "id") or not getattr(proto, "id", ""):
+            return
+        rotulo = getattr(proto, "label", "") or getattr(proto, "component_name", "") or getattr(proto, "placeholder", "")
+        self.widgets[(tipo, rotulo)] = (proto.id, msg.delta.fragment_id)
+
+    def widget(self, tipo, rotulo):
+        for (t, r), valor in self.widgets.items():
+            if t == tipo and rotulo in r:
+                return valor
+        raise KeyError(f"widget {tipo} '{rotulo}' não encontrado")
+
+    async def rerun(self, fragmento="", gatilho=None, auto=False):
+        """Pede um rerun e espera o script terminar; retorna (segundos, bytes recebidos)."""
+        msg = BackMsg()
+        estados = dict(self.estados)
+        if gatilho is not None:
+            estados[gatilho.id] = gatilho
+        msg.rerun_script.widget_states.widgets.extend(estados.values())
+        msg.rerun_script.fragment_id = fragmento
+        msg.rerun_script.is_auto_rerun = auto
+
+        self.fragmentos = set()
+        recebidos = 0
+        inicio = time.perf_counter()
+        await self.conexao.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            bruto = await self.conexao.read_message()
+            if bruto is None:
+                raise ConnectionError("websocket fechado pelo servidor")
+            recebidos += len(bruto)
+            resposta = ForwardMsg()
+            resposta.ParseFromString(bruto)
+            self._registrar(resposta)
+            if resposta.WhichOneof("type") == "script_finished":
+                return time.perf_counter() - inicio, recebidos
+
+    def definir(self, estado):
+        self.estados[estado.id] = estado
+
+
+def json_widget(id_, valor):
+    estado = WidgetState(id=id_)
+    estado.json_value = json.dumps(valor)
+    return estado
+
+
+def pergunta_widget(id_, texto):
+    estado = WidgetState(id=id_)
+    estado.string_trigger_value.data = texto
+    return estado
+
+
+async def medir(cliente, repeticoes):
+    await cliente.rerun()
+    menu_id, _ = cliente.widget("component_instance", "option_menu")
+
+    async def abrir(aba):
+        cliente.definir(json_widget(menu_id, aba))
+        await cliente.rerun()
+
+    resultados = {}
+
+    async def comparar(nome, acao):
+        medidas = {"app inteiro": [], "fragmento": []}
+        for _ in range(repeticoes):
+            for modo in medidas:
+                medidas[modo].append(await acao(modo == "fragmento"))
+        resultados[nome] = {
+            m: (statistics.median(t for t, _ in v), statistics.median(b for _, b in v))
+            for m, v in medidas.items()
+        }
+
+    # EcoBot: uma pergunta respondida com os dados locais (sem Gemini)
+    await abrir("ChatBot")
+    chat_id, chat_fragmento = cliente.widget("chat_input", "Envie sua pergunta")
+    await comparar("Pergunta ao EcoBot", lambda frag: cliente.rerun(
+        chat_fragmento if frag else "", gatilho=pergunta_widget(chat_id, PERGUNTA)))
+
+    # Opiniões: a verificação periódica de dados novos (o vigia com run_every,
+    # contra o app inteiro que o timer recarregava antes)
+    await abrir("Opiniões")
+    vigia, = cliente.vigias
+    await comparar("Verificação das opiniões", lambda frag: cliente.rerun(
+        vigia if frag else "", auto=frag))
+
+    # Pontos de Coleta: troca do modo do mapa
+    await abrir("Pontos de Coleta")
+    modo_id, mapa_fragmento = cliente.widget("radio", "Modo do mapa")
+
+    async def trocar_modo(frag):
+        cliente.definir(_radio(modo_id, 1))
+        t1, b1 = await cliente.rerun(mapa_fragmento if frag else "")
+        cliente.definir(_radio(modo_id, 0))
+        t2, b2 = await cliente.rerun(mapa_fragmento if frag else "")
+        return (t1 + t2) / 2, (b1 + b2) / 2
+
+    await comparar("Troca do modo do mapa", trocar_modo)
+    return resultados
+
+
+def _radio(id_, indice):
+    estado = WidgetState(id=id_)
+    estado.int_value = indice
+    return estado
+
+
+def esperar_servidor(porta, processo, timeout=60):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("o streamlit encerrou antes de responder")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.3)
+    raise TimeoutError("o streamlit não respondeu a tempo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de rerun: app inteiro x fragmento")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--porta", type=int, default=8599)
+    args = parser.parse_args()
+
+    servidor, _, url = substitutos_locais.iniciar(latencia_planilha=0, latencia_imagem=0, latencia_gemini=0)
+    # Caches em disco numa pasta descartável, fora dos índices do site
+    pasta_cache = tempfile.TemporaryDirectory(prefix="ecotech_reruns_")
+    ambiente = dict(os.environ, ECOTECH_REMOTE_BASE=url, ECOTECH_GEMINI_URL=f"{url}/gemini",
+                    ECOTECH_CACHE_DIR=pasta_cache.name)
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "projeto.py", "--server.headless", "true",
+         "--server.port", str(args.porta), "--browser.gatherUsageStats", "false"],
+        cwd=PASTA_APP, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        esperar_servidor(args.porta, processo)
+        cliente = Cliente(f"ws://127.0.0.1:{args.porta}/_stcore/stream")
+
+        async def rodar():
+            await cliente.conectar()
+            return await medir(cliente, args.repeticoes)
+
+        resultados = asyncio.run(rodar())
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+        servidor.shutdown()
+        pasta_cache.cleanup()
+
+    print(f"{'interação':<26} | {'app inteiro (ms)':>16} | {'fragmento (ms)':>14} | "
+          f"{'app inteiro (KB)':>16} | {'fragmento (KB)':>14}")
+    print("-" * 98)
+    for nome, medidas in resultados.items():
+        (t_inteiro, b_inteiro), (t_fragmento, b_fragmento) = medidas["app inteiro"], medidas["fragmento"]
+        print(f"{nome:<26} | {t_inteiro * 1000:16.1f} | {t_fragmento * 1000:14.1f} | "
+              f"{b_inteiro / 1024:16.1f} | {b_fragmento / 1024:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark da busca de pontos mais próximos (IndicePontos) contra a força
+bruta (distância haversine até todos os pontos), com conferência de que os
+dois devolvem os mesmos pontos.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/bench_vizinhos.py
+    python benchmarks/bench_vizinhos.py --pontos 10000 100000 1000000 --consultas 2000 --k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from busca_espacial import IndicePontos, vizinhos_forca_bruta  # noqa: E402
+
+# Centros urbanos aproximados: a base real é concentrada nas cidades
+CIDADES = [(-23.55, -46.63), (-22.91, -43.17), (-19.92, -43.94), (-15.79, -47.88), (-30.03, -51.23),
+           (-12.97, -38.50), (-8.05, -34.88), (-3.73, -38.52), (-25.43, -49.27), (-3.12, -60.02)]
+CATEGORIAS = ["Linha Verde", "Linha Branca", "Linha Marrom", "Linha Azul",
+              "Linha Verde|Linha Azul", "Linha Verde|Linha Marrom", ""]
+
+
+def gerar_pontos(n, seed=42):
+    rnd = np.random.default_rng(seed)
+    centros = np.array(CIDADES)[rnd.integers(0, len(CIDADES), n)]
+    # 80% nas cidades, 20% espalhados pelo território
+    espalhados = rnd.random(n) < 0.2
+    lats = np.where(espalhados, rnd.uniform(-33, 5, n), centros[:, 0] + rnd.normal(0, 0.15, n))
+    lons = np.where(espalhados, rnd.uniform(-73, -35, n), centros[:, 1] + rnd.normal(0, 0.15, n))
+    return pd.DataFrame({
+        "nome": [f"Ponto {i}" for i in range(n)],
+        "categorias": pd.Categorical(rnd.choice(CATEGORIAS, n)),
+        "latitude": lats.astype("float32"),
+        "longitude": lons.astype("float32"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca de vizinhos")
+    parser.add_argument("--pontos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--consultas", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pontos':>9} | {'índice (ms)':>12} | {'consulta (ms)':>13} | {'força bruta (ms)':>16} | {'ganho':>6} | iguais")
+    print("-" * 80)
+    for n in args.pontos:
+        pontos = gerar_pontos(n)
+        inicio = time.perf_counter()
+        indice = IndicePontos(pontos)
+        t_indice = time.perf_counter() - inicio
+
+        consultas = gerar_pontos(args.consultas, seed=7)[["latitude", "longitude"]].to_numpy(np.float64)
+
+        inicio = time.perf_counter()
+        resultados = [indice.vizinhos(lat, lon, k=args.k).index for lat, lon in consultas]
+        t_rapido = (time.perf_counter() - inicio) / len(consultas)
+
+        inicio = time.perf_counter()
+        referencia = [vizinhos_forca_bruta(pontos, lat, lon, k=args.k).index for lat, lon in consultas]
+        t_bruto = (time.perf_counter() - inicio) / len(consultas)
+
+        iguais = all(list(a) == list(b) for a, b in zip(resultados, referencia))
+        print(f"{n:>9} | {t_indice * 1000:12.1f} | {t_rapido * 1000:13.3f} | {t_bruto * 1000:16.3f} | "
+              f"{t_bruto / t_rapido:5.1f}x | {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Servidor HTTP local que faz o papel dos serviços externos do EcoTech:
+
+- GET  .../export?...       → CSV da planilha de opiniões (com ETag / 304)
+- GET  ....png / ....jpg    → imagens geradas na hora (gráfico e galeria)
+- POST /gemini              → "Gemini" falso, uma linha JSON por pedaço
+
+Cada rota tem latência artificial configurável. Também pode ser executado
+sozinho para testes manuais:
+    python benchmarks/substitutos_locais.py --porta 8765
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from PIL import Image
+
+FRASES = [
+    "O lixo eletrônico contamina o solo e a água",
+    "Precisamos de mais pontos de coleta no bairro",
+    "A bateria de lítio pode causar incêndio",
+    "Reciclar celulares antigos ajuda o meio ambiente",
+    "O descarte incorreto prejudica a saúde das pessoas",
+    "Falta informação sobre onde descartar pilhas",
+]
+
+
+def gerar_csv(linhas, seed=7):
+    rnd = random.Random(seed)
+    inicio = datetime(2025, 9, 1)
+    saida = ["Carimbo de data/hora,O que você pensa sobre o lixo eletrônico?"]
+    for i in range(linhas):
+        data = (inicio + timedelta(hours=i * 3)).strftime("%d/%m/%Y %H:%M:%S")
+        saida.append(f'{data},"{rnd.choice(FRASES)}"')
+    return ("\n".join(saida) + "\n").encode("utf-8")
+
+
+def gerar_imagem(formato, largura=1200, altura=900):
+    buffer = BytesIO()
+    Image.new("RGB", (largura, altura), (46, 139, 87)).save(buffer, format=formato)
+    return buffer.getvalue()
+
+
+class Substitutos:
+    """Configuração e conteúdo servidos pelo servidor local."""
+
+    def __init__(self, latencia_planilha=0.2, latencia_imagem=0.1, latencia_gemini=0.5,
+                 atraso_pedaco=0.03, pedacos=30, linhas_planilha=500):
+        self.latencia_planilha = latencia_planilha
+        self.latencia_imagem = latencia_imagem
+        self.latencia_gemini = latencia_gemini
+        self.atraso_pedaco = atraso_pedaco
+        self.pedacos = pedacos
+        self.csv = gerar_csv(linhas_planilha)
+        self.etag = '"' + hashlib.sha1(self.csv).hexdigest() + '"'
+        self.imagens = {"PNG": gerar_imagem("PNG"), "JPEG": gerar_imagem("JPEG")}
+        self.requisicoes = {"planilha": 0, "imagem": 0, "gemini": 0}
+        self._lock = threading.Lock()
+
+    def trocar_planilha(self, csv):
+        """Publica um novo conteúdo da planilha (com ETag novo)."""
+        with self._lock:
+            self.csv = csv
+            self.etag = '"' + hashlib.sha1(csv).hexdigest() + '"'
+
+    def contar(self, rota):
+        with self._lock:
+            self.requisicoes[rota] += 1
+
+
+def criar_handler(subs):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, corpo=b"", tipo="text/plain", cabecalhos=None):
+            self.send_response(status)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(corpo)))
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            caminho = self.path.lower()
+            if "export" in caminho:
+                subs.contar("planilha")
+                time.sleep(subs.latencia_planilha)
+                if self.headers.get("If-None-Match") == subs.etag:
+                    return self._responder(304)
+                return self._responder(200, subs.csv, "text/csv", {"ETag": subs.etag})
+            if caminho.split("?")[0].endswith((".png", ".jpg", ".jpeg")):
+                subs.contar("imagem")
+                time.sleep(subs.latencia_imagem)
+                formato = "PNG" if caminho.split("?")[0].endswith(".png") else "JPEG"
+                return self._responder(200, subs.imagens[formato], f"image/{formato.lower()}")
+            self._responder(404, b"nao encontrado")
+
+        def do_POST(self):
+            if not self.path.startswith("/gemini"):
+                return self._responder(404, b"nao encontrado")
+            subs.contar("gemini")
+            tamanho = int(self.headers.get("Content-Length", 0))
+            pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+            pergunta = pedido.get("contents", [{}])[-1].get("parts", [""])[0]
+
+            time.sleep(subs.latencia_gemini)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for i in range(subs.pedacos):
+                linha = json.dumps({"text": f"Resposta {i} sobre '{pergunta[:30]}'. "}, ensure_ascii=False)
+                self.wfile.write(linha.encode("utf-8") + b"\n")
+                self.wfile.flush()
+                time.sleep(subs.atraso_pedaco)
+
+    return Handler
+
+
+def iniciar(porta=0, **opcoes):
+    """Sobe o servidor numa thread; retorna `(servidor, substitutos, url_base)`."""
+    subs = Substitutos(**opcoes)
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), criar_handler(subs))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="substitutos", daemon=True).start()
+    return servidor, subs, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substitutos locais dos serviços do EcoTech")
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+    servidor, _, url = iniciar(args.porta)
+    print(f"ECOTECH_REMOTE_BASE={url}")
+    print(f"ECOTECH_GEMINI_URL={url}/gemini")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
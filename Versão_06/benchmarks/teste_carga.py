@@ -0,0 +1,199 @@
+"""
+Teste de carga do projeto.py com várias sessões simultâneas.
+
+Cada sessão é um `AppTest` do Streamlit que percorre as cinco abas do menu e
+faz algumas perguntas ao EcoBot. A planilha, as imagens remotas e o Gemini
+são substituídos pelo servidor local de `substitutos_locais.py`, com
+latência artificial configurável. Ao final são exibidos os percentis de
+latência dos reruns por aba, a memória por sessão e a vazão.
+
+Uso (a partir de Versão_06/):
+    python benchmarks/teste_carga.py --sessoes 50
+    python benchmarks/teste_carga.py --sessoes 200 --concorrencia 50 --latencia-gemini 1.0 --json resultado.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_APP)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import substitutos_locais  # noqa: E402
+from recursos_nlp import memoria_rss_mb  # noqa: E402
+
+ABAS = ["Informações", "Sobre e Entrevistas", "Opiniões", "Pontos de Coleta", "ChatBot"]
+CHAVE_MENU = "menu_teste_carga"
+PERGUNTAS = [
+    "Onde descartar pilha?",
+    "Como descartar bateria de lítio?",
+    "Tem ponto de coleta perto de Santo Amaro?",
+    "Celular velho pode ir no lixo comum?",
+]
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+class Resultados:
+    def __init__(self):
+        self.latencias = defaultdict(list)   # aba -> segundos por rerun
+        self.erros = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def registrar(self, aba, segundos, erro=False):
+        with self._lock:
+            self.latencias[aba].append(segundos)
+            if erro:
+                self.erros[aba] += 1
+
+
+def compartilhar_runtime():
+    """
+    O AppTest cria um Runtime falso a cada `run()` e o apaga no fim, o que
+    quebra sessões rodando em paralelo. Aqui todas passam a usar um único
+    runtime falso, como as sessões de um servidor de verdade.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+
+
+def substituir_menu():
+    """
+    O AppTest não interage com componentes customizados: o `option_menu` vira
+    um `st.radio` com as mesmas opções, que o AppTest sabe selecionar.
+    """
+    import streamlit as st
+    import streamlit_option_menu
+
+    def menu(menu_title, options, default_index=0, **_):
+        return st.radio("Menu", options, index=default_index, key=CHAVE_MENU)
+    streamlit_option_menu.option_menu = menu
+
+
+def simular_sessao(indice, args, resultados, sessoes_vivas):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(PASTA_APP, "projeto.py"), default_timeout=args.timeout)
+    sessoes_vivas.append(at)
+
+    def rerun(rotulo, acao):
+        inicio = time.perf_counter()
+        try:
+            acao()
+            erro = bool(at.exception)
+        except Exception:
+            erro = True
+        resultados.registrar(rotulo, time.perf_counter() - inicio, erro)
+
+    rerun(ABAS[0], at.run)
+    for aba in ABAS[1:]:
+        rerun(aba, lambda: at.radio(key=CHAVE_MENU).set_value(aba).run())
+
+    for turno in range(args.turnos_chat):
+        pergunta = PERGUNTAS[(indice + turno) % len(PERGUNTAS)]
+        rerun("ChatBot (pergunta)", lambda: at.chat_input[0].set_value(pergunta).run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do EcoTech")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--concorrencia", type=int, default=None, help="padrão: igual a --sessoes")
+    parser.add_argument("--turnos-chat", type=int, default=2)
+    parser.add_argument("--latencia-planilha", type=float, default=0.2)
+    parser.add_argument("--latencia-imagem", type=float, default=0.1)
+    parser.add_argument("--latencia-gemini", type=float, default=0.5)
+    parser.add_argument("--atraso-pedaco", type=float, default=0.03)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="grava o relatório neste arquivo")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    servidor, subs, url = substitutos_locais.iniciar(
+        latencia_planilha=args.latencia_planilha,
+        latencia_imagem=args.latencia_imagem,
+        latencia_gemini=args.latencia_gemini,
+        atraso_pedaco=args.atraso_pedaco,
+    )
+    os.environ["ECOTECH_REMOTE_BASE"] = url
+    os.environ["ECOTECH_GEMINI_URL"] = f"{url}/gemini"
+    # secrets.toml é lido com caminho relativo à pasta do app
+    os.chdir(PASTA_APP)
+
+    compartilhar_runtime()
+    substituir_menu()
+    resultados = Resultados()
+    sessoes_vivas = []
+    # Caches em disco numa pasta descartável: as URLs dos substitutos (porta
+    # efêmera) não ficam nos índices do site
+    with tempfile.TemporaryDirectory(prefix="ecotech_carga_") as pasta_cache:
+        os.environ["ECOTECH_CACHE_DIR"] = pasta_cache
+        memoria_inicial = memoria_rss_mb()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concorrencia or args.sessoes) as executor:
+            for futuro in [executor.submit(simular_sessao, i, args, resultados, sessoes_vivas)
+                           for i in range(args.sessoes)]:
+                futuro.result()
+        duracao = time.perf_counter() - inicio
+        memoria_final = memoria_rss_mb()
+        servidor.shutdown()
+
+    total_reruns = sum(len(v) for v in resultados.latencias.values())
+    relatorio = {
+        "sessoes": args.sessoes,
+        "duracao_s": round(duracao, 2),
+        "reruns": total_reruns,
+        "reruns_por_s": round(total_reruns / duracao, 2),
+        "memoria_por_sessao_mb": None if memoria_inicial is None or memoria_final is None
+        else round((memoria_final - memoria_inicial) / args.sessoes, 2),
+        "requisicoes_substitutos": subs.requisicoes,
+        "abas": {
+            aba: {
+                "reruns": len(valores),
+                "erros": resultados.erros[aba],
+                "p50_ms": round(percentil(valores, 50) * 1000, 1),
+                "p90_ms": round(percentil(valores, 90) * 1000, 1),
+                "p99_ms": round(percentil(valores, 99) * 1000, 1),
+            }
+            for aba, valores in resultados.latencias.items()
+        },
+    }
+
+    print(f"{'aba':<22} | {'reruns':>6} | {'erros':>5} | {'p50 ms':>8} | {'p90 ms':>8} | {'p99 ms':>8}")
+    print("-" * 72)
+    for aba, r in relatorio["abas"].items():
+        print(f"{aba:<22} | {r['reruns']:>6} | {r['erros']:>5} | {r['p50_ms']:>8} | {r['p90_ms']:>8} | {r['p99_ms']:>8}")
+    print(f"\nVazão: {relatorio['reruns_por_s']} reruns/s em {relatorio['duracao_s']}s")
+    print(f"Memória por sessão: {relatorio['memoria_por_sessao_mb']} MB")
+    print(f"Requisições aos substitutos: {relatorio['requisicoes_substitutos']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Busca dos pontos de coleta mais próximos de uma coordenada.
+
+Os pontos são distribuídos numa grade regular de células (estilo geohash) e
+a busca percorre anéis de células em volta da coordenada até ter certeza de
+que os k mais próximos foram vistos. Os candidatos são reordenados pela
+distância haversine real, calculada de forma vetorizada com NumPy.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from pontos_coleta import categorias_do_ponto
+
+RAIO_TERRA_KM = 6371.0088
+KM_POR_GRAU = 111.32
+# Acima disso a busca por anéis deixa de compensar e vira força bruta
+MAX_ANEIS = 64
+# Bases pequenas: o cálculo vetorizado sobre todos os pontos já é mais rápido
+FORCA_BRUTA_ATE = 20_000
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Distância em km de (lat, lon) até cada ponto dos arrays."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class IndicePontos:
+    """
+    Índice em grade sobre o DataFrame de pontos (colunas `latitude`,
+    `longitude` e, opcionalmente, `categorias`).
+    """
+
+    def __init__(self, pontos, celula_km=2.0):
+        self.pontos = pontos.reset_index(drop=True)
+        self.lats = self.pontos["latitude"].to_numpy(dtype=np.float64)
+        self.lons = self.pontos["longitude"].to_numpy(dtype=np.float64)
+        self.celula = celula_km / KM_POR_GRAU   # tamanho da célula em graus
+        self._mascaras = {}
+
+        linhas = np.floor(self.lats / self.celula).astype(np.int64)
+        colunas = np.floor(self.lons / self.celula).astype(np.int64)
+        chaves = linhas * 1_000_000 + colunas
+        self._ordem = np.argsort(chaves, kind="stable")
+        unicas, inicios, contagens = np.unique(chaves[self._ordem], return_index=True, return_counts=True)
+        self._celulas = {
+            int(c): (int(i), int(i + n)) for c, i, n in zip(unicas, inicios, contagens)
+        }
+
+    # ---------------------------------------------------------------- #
+    def mascara_categoria(self, categoria, incluir_sem_categoria=True):
+        """Pontos que aceitam `categoria` (calculado uma vez por valor distinto)."""
+        chave = (categoria, incluir_sem_categoria)
+        if chave not in self._mascaras:
+            if "categorias" not in self.pontos.columns:
+                self._mascaras[chave] = np.ones(len(self.pontos), dtype=bool)
+            else:
+                coluna = self.pontos["categorias"].astype("category")
+                aceita = np.array([
+                    categoria in categorias_do_ponto(v) or (incluir_sem_categoria and not categorias_do_ponto(v))
+                    for v in coluna.cat.categories
+                ] + [incluir_sem_categoria], dtype=bool)
+                # código -1 (nulo) cai na última posição
+                self._mascaras[chave] = aceita[coluna.cat.codes.to_numpy()]
+        return self._mascaras[chave]
+
+    def _anel(self, linha, coluna, r):
+        """Índices dos pontos nas células a exatamente `r` células do centro."""
+        partes = []
+        for i in range(linha - r, linha + r + 1):
+            passo = 1 if abs(i - linha) == r else 2 * r
+            for j in range(coluna - r, coluna + r + 1, max(passo, 1)):
+                faixa = self._celulas.get(i * 1_000_000 + j)
+                if faixa is not None:
+                    partes.append(self._ordem[faixa[0]:faixa[1]])
+        return partes
+
+    def vizinhos(self, lat, lon, k=5, categoria=None, incluir_sem_categoria=True, raio_max_km=None):
+        """
+        Os `k` pontos mais próximos de (lat, lon), ordenados, com a coluna
+        `distancia_km`. `categoria` filtra pela linha de lixo aceita.
+        """
+        if len(self.pontos) == 0 or k <= 0:
+            return _mais_proximos(self.pontos, np.array([], dtype=np.int64), np.array([]), 0)
+        mascara = None if categoria is None else self.mascara_categoria(categoria, incluir_sem_categoria)
+
+        linha = math.floor(lat / self.celula)
+        coluna = math.floor(lon / self.celula)
+        candidatos = []
+        total = 0
+        r = 0 if len(self.pontos) > FORCA_BRUTA_ATE else MAX_ANEIS + 1
+        while True:
+            if r > MAX_ANEIS:
+                # Coordenada longe de tudo: mais barato olhar todos os pontos
+                candidatos = [np.arange(len(self.pontos)) if mascara is None else np.flatnonzero(mascara)]
+                break
+            for parte in self._anel(linha, coluna, r):
+                if mascara is not None:
+                    parte = parte[mascara[parte]]
+                candidatos.append(parte)
+                total += len(parte)
+
+            # Qualquer ponto fora dos anéis 0..r está a pelo menos `limite_km`
+            lat_borda = min(89.0, abs(lat) + (r + 1) * self.celula)
+            limite_km = r * self.celula * KM_POR_GRAU * math.cos(math.radians(lat_borda))
+
+            if total >= k:
+                indices = np.concatenate(candidatos)
+                distancias = haversine_km(lat, lon, self.lats[indices], self.lons[indices])
+                if np.partition(distancias, k - 1)[k - 1] <= limite_km:
+                    break
+            if raio_max_km is not None and limite_km >= raio_max_km:
+                break
+            r += 1
+
+        indices = np.concatenate(candidatos) if candidatos else np.array([], dtype=np.int64)
+        distancias = haversine_km(lat, lon, self.lats[indices], self.lons[indices])
+        if raio_max_km is not None:
+            dentro = distancias <= raio_max_km
+            indices, distancias = indices[dentro], distancias[dentro]
+        return _mais_proximos(self.pontos, indices, distancias, k)
+
+
+def _mais_proximos(pontos, indices, distancias, k):
+    n = min(k, len(indices))
+    if n == 0:
+        return pontos.iloc[0:0].assign(distancia_km=pd.Series(dtype="float64"))
+    melhores = np.argpartition(distancias, n - 1)[:n]
+    melhores = melhores[np.argsort(distancias[melhores], kind="stable")]
+    resultado = pontos.iloc[indices[melhores]].copy()
+    resultado["distancia_km"] = distancias[melhores]
+    return resultado
+
+
+def vizinhos_forca_bruta(pontos, lat, lon, k=5):
+    """Referência sem índice: calcula a distância até todos os pontos."""
+    distancias = haversine_km(lat, lon, pontos["latitude"].to_numpy(np.float64),
+                              pontos["longitude"].to_numpy(np.float64))
+    return _mais_proximos(pontos, np.arange(len(distancias)), distancias, k)
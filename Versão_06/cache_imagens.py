@@ -0,0 +1,175 @@
+"""
+Cache local de imagens remotas usadas pelo site.
+
+Cada imagem é baixada uma vez (por uma sessão HTTP com pool de conexões e
+timeouts), validada, transformada e gravada em disco sob o hash do conteúdo
+original. Depois disso os arquivos já prontos são servidos direto (pasta
+static do Streamlit), sem rede e sem decodificar de novo. Se o servidor remoto estiver lento ou fora do ar,
+a cópia em disco continua sendo usada.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from io import BytesIO
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+PASTA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "imagens")
+
+
+def sessao_http(conexoes=8, tentativas=1):
+    """Sessão `requests` com pool de conexões reaproveitado entre chamadas."""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=tentativas)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+def reduzir_largura(largura_max):
+    """Transformação: reduz para `largura_max` mantendo a proporção (nunca amplia)."""
+    def transformar(imagem):
+        largura, altura = imagem.size
+        if largura <= largura_max:
+            return imagem
+        nova_altura = max(1, round(altura * largura_max / largura))
+        return imagem.resize((largura_max, nova_altura), Image.LANCZOS)
+    return transformar
+
+
+class CacheImagens:
+    """
+    Cache em disco de imagens remotas e suas variantes.
+
+    O índice `url|variante -> arquivo` fica em `indice.json` na pasta do
+    cache, então as imagens sobrevivem a reinícios do servidor.
+    """
+
+    def __init__(self, pasta=PASTA_PADRAO, sessao=None, timeout=(3, 10), max_idade=24 * 3600):
+        self.pasta = pasta
+        self.sessao = sessao or sessao_http()
+        self.timeout = timeout
+        self.max_idade = max_idade     # depois disso tenta revalidar (None = nunca)
+        self.downloads = 0
+        self.falhas_rede = 0
+
+        self._lock = threading.Lock()  # só índice e contadores
+        self._locks_url = {}           # url -> lock do download/codificação dessa imagem
+        self._arquivo_indice = os.path.join(pasta, "indice.json")
+        os.makedirs(pasta, exist_ok=True)
+        try:
+            with open(self._arquivo_indice, "r", encoding="utf-8") as f:
+                self._indice = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._indice = {}
+
+    # ---------------------------------------------------------------- #
+    def _salvar_indice(self):
+        temporario = self._arquivo_indice + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self._indice, f)
+        os.replace(temporario, self._arquivo_indice)
+
+    def _baixar(self, url):
+        resposta = self.sessao.get(url, timeout=self.timeout)
+        resposta.raise_for_status()
+        tipo = resposta.headers.get("Content-Type", "image/")
+        if not tipo.startswith("image/"):
+            raise ValueError(f"Conteúdo não é imagem ({tipo})")
+        conteudo = resposta.content
+        # Garante que o arquivo é uma imagem íntegra antes de guardar
+        Image.open(BytesIO(conteudo)).verify()
+        with self._lock:
+            self.downloads += 1
+        return conteudo
+
+    def _gerar_variante(self, conteudo, variante, transformar, formato):
+        hash_conteudo = hashlib.sha1(conteudo).hexdigest()
+        arquivo = f"{hash_conteudo}_{variante}.{formato.lower()}"
+        caminho = os.path.join(self.pasta, arquivo)
+        if not os.path.exists(caminho):
+            imagem = Image.open(BytesIO(conteudo))
+            if imagem.mode != "RGB":
+                imagem = imagem.convert("RGB")
+            if transformar is not None:
+                imagem = transformar(imagem)
+            buffer = BytesIO()
+            imagem.save(buffer, format=formato)
+            # Duas URLs com o mesmo conteúdo podem gerar o mesmo arquivo ao mesmo tempo
+            temporario = f"{caminho}.{threading.get_ident()}.tmp"
+            with open(temporario, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(temporario, caminho)
+        return arquivo
+
+    # ---------------------------------------------------------------- #
+    def _no_indice(self, url, variantes):
+        """Entradas já em disco e, entre elas, as que ainda não passaram de `max_idade`."""
+        with self._lock:
+            encontrados = {}
+            for nome in variantes:
+                entrada = self._indice.get(f"{url}|{nome}")
+                if entrada and os.path.exists(os.path.join(self.pasta, entrada["arquivo"])):
+                    encontrados[nome] = entrada
+        validos = {
+            nome: e["arquivo"] for nome, e in encontrados.items()
+            if self.max_idade is None or time.time() - e["baixado_em"] <= self.max_idade
+        }
+        return encontrados, validos
+
+    def _lock_da_url(self, url):
+        with self._lock:
+            return self._locks_url.setdefault(url, threading.Lock())
+
+    def arquivos(self, url, variantes, formato="PNG"):
+        """
+        Garante em disco as `variantes` ({nome: transformar}) da imagem e
+        retorna {nome: arquivo}. A imagem original é baixada no máximo uma
+        vez para todas as variantes, e só se alguma ainda não estiver no
+        cache ou tiver passado de `max_idade`.
+
+        O download e a codificação acontecem fora do lock do índice: só quem
+        pede a mesma URL espera, e as outras imagens continuam sendo servidas.
+        """
+        encontrados, validos = self._no_indice(url, variantes)
+        if len(validos) == len(variantes):
+            return validos
+
+        with self._lock_da_url(url):
+            # Outra sessão pode ter acabado de baixar enquanto esta esperava
+            encontrados, validos = self._no_indice(url, variantes)
+            if len(validos) == len(variantes):
+                return validos
+
+            try:
+                conteudo = self._baixar(url)
+            except Exception:
+                with self._lock:
+                    self.falhas_rede += 1
+                if len(encontrados) == len(variantes):
+                    # Servidor remoto fora: fica com as cópias antigas
+                    return {nome: e["arquivo"] for nome, e in encontrados.items()}
+                raise
+
+            agora = time.time()
+            resultado = {
+                nome: self._gerar_variante(conteudo, nome, transformar, formato)
+                for nome, transformar in variantes.items()
+            }
+            with self._lock:
+                for nome, arquivo in resultado.items():
+                    self._indice[f"{url}|{nome}"] = {"arquivo": arquivo, "baixado_em": agora}
+                self._salvar_indice()
+            return resultado
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "imagens": len(self._indice),
+            "downloads": self.downloads,
+            "falhas_rede": self.falhas_rede,
+        }
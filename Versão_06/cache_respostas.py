@@ -0,0 +1,80 @@
+"""
+Cache de respostas do EcoBot por pergunta normalizada.
+
+Como o EcoBot só fala de descarte de eletrônicos, as mesmas perguntas se
+repetem muito ("Onde descartar a pilha?", "onde descartar pilha"). A
+pergunta é normalizada (minúsculas, sem acentos, pontuação e artigos) e a
+resposta fica guardada com TTL e descarte LRU, para todas as sessões.
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Artigos não mudam a pergunta ("descartar a pilha" = "descartar pilha");
+# interrogativas, modais e negações ficam sempre na chave.
+ARTIGOS = {"a", "o", "as", "os", "um", "uma", "uns", "umas"}
+
+
+def remover_acentos(texto):
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def normalizar_pergunta(texto):
+    """
+    Forma canônica da pergunta usada como chave do cache: minúsculas, sem
+    acentos, sem pontuação e sem artigos. Não depende do spaCy, então a mesma
+    pergunta tem a mesma chave antes e depois de o modelo carregar.
+    """
+    palavras = "".join(c if c.isalnum() else " " for c in texto.lower()).split()
+    return " ".join(remover_acentos(p) for p in palavras if p not in ARTIGOS)
+
+
+def reproduzir(resposta, tamanho=24):
+    """Divide uma resposta guardada em pedaços, imitando o streaming."""
+    for i in range(0, len(resposta), tamanho):
+        yield resposta[i:i + tamanho]
+
+
+class CacheRespostas:
+    """LRU com TTL das respostas do Gemini, compartilhado entre sessões."""
+
+    def __init__(self, max_itens=256, ttl=6 * 3600):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()   # chave -> (resposta, guardado_em)
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and time.time() - item[1] <= self.ttl:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[0]
+            if item is not None:
+                del self._itens[chave]
+            self.falhas += 1
+            return None
+
+    def guardar(self, chave, resposta):
+        if not chave or not resposta:
+            return
+        with self._lock:
+            self._itens[chave] = (resposta, time.time())
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        total = self.acertos + self.falhas
+        return {
+            "respostas_em_cache": len(self._itens),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 3) if total else None,
+        }
@@ -0,0 +1,186 @@
+"""
+Cache incremental de tokens das respostas da aba Opiniões.
+
+Cada resposta é identificada pelo hash do seu texto (mais o nome do modelo
+spaCy). Os tokens ficam salvos em SQLite, então sobrevivem a reinícios, e a
+cada atualização da planilha só as respostas novas ou editadas passam pelo
+spaCy. O Counter de frequências é ajustado por diferença, sem reconstrução.
+Depois de cada atualização, as linhas de respostas que saíram da planilha
+(editadas ou apagadas) são removidas do disco.
+
+Cada linha do SQLite guarda também o modelo (spaCy + filtro) que a gerou, e
+o arquivo lembra o modelo da última sincronização completa. Só quando uma
+sincronização termina com um modelo diferente desse (a troca está
+confirmada) as linhas dos outros modelos são apagadas, para o arquivo não
+crescer a cada troca do filtro de exclusões.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+ARQUIVO_PADRAO = os.path.join(PASTA_CACHE, "tokens_opinioes.sqlite")
+
+
+def hash_resposta(texto, modelo=""):
+    """Chave estável de uma resposta: muda se o texto ou o modelo mudar."""
+    conteudo = f"{modelo}\x00{texto.strip()}".encode("utf-8")
+    return hashlib.sha1(conteudo).hexdigest()
+
+
+class CacheTokens:
+    """
+    Guarda os tokens de cada resposta e mantém as frequências atuais.
+
+    `processar` recebe uma lista de textos e devolve uma lista de listas de
+    tokens, na mesma ordem (ex.: `process_texts`).
+    """
+
+    def __init__(self, processar, modelo="", caminho=ARQUIVO_PADRAO):
+        self.processar = processar
+        self.modelo = modelo
+        self.caminho = caminho
+        self.frequencias = Counter()
+        self.processadas_ultima = 0   # respostas que passaram pelo spaCy na última atualização
+        self.versao_dados = None      # versão da planilha já sincronizada
+
+        self._linhas = Counter()      # hash -> quantas vezes a resposta aparece na planilha
+        self._tokens = {}             # hash -> lista de tokens
+        self._lock = threading.Lock()
+
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens (hash TEXT PRIMARY KEY, tokens TEXT NOT NULL, modelo TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        colunas = [linha[1] for linha in self._conn.execute("PRAGMA table_info(tokens)")]
+        if "modelo" not in colunas:
+            # Arquivo de antes da coluna: as linhas ficam sem modelo e saem na próxima troca confirmada
+            self._conn.execute("ALTER TABLE tokens ADD COLUMN modelo TEXT")
+        self._conn.commit()
+        self.podadas = 0
+
+    # ---------------------------------------------------------------- #
+    def _buscar_no_disco(self, hashes):
+        encontrados = {}
+        lista = list(hashes)
+        # SQLite limita a quantidade de parâmetros por consulta
+        for i in range(0, len(lista), 500):
+            parte = lista[i:i + 500]
+            marcadores = ",".join("?" * len(parte))
+            cursor = self._conn.execute(
+                f"SELECT hash, tokens FROM tokens WHERE hash IN ({marcadores})", parte
+            )
+            for h, tokens in cursor:
+                encontrados[h] = json.loads(tokens)
+        return encontrados
+
+    def _salvar_no_disco(self, novos):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO tokens (hash, tokens, modelo) VALUES (?, ?, ?)",
+            [(h, json.dumps(t, ensure_ascii=False), self.modelo) for h, t in novos.items()],
+        )
+        self._conn.commit()
+
+    def _podar_ausentes(self, atuais):
+        """Apaga as linhas deste modelo cujas respostas não estão mais na planilha."""
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS atuais (hash TEXT PRIMARY KEY)")
+        self._conn.execute("DELETE FROM atuais")
+        self._conn.executemany("INSERT INTO atuais (hash) VALUES (?)", [(h,) for h in atuais])
+        cursor = self._conn.execute(
+            "DELETE FROM tokens WHERE modelo = ? AND hash NOT IN (SELECT hash FROM atuais)", (self.modelo,)
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def _confirmar_modelo(self):
+        """
+        Chamado ao fim de uma sincronização: se o arquivo ainda aponta para
+        outro modelo, a troca está confirmada e as linhas dos outros modelos
+        são apagadas. Reabrir o cache com o mesmo modelo não apaga nada.
+        """
+        linha = self._conn.execute("SELECT valor FROM meta WHERE chave = 'modelo'").fetchone()
+        if linha is not None and linha[0] == self.modelo:
+            return 0
+        cursor = self._conn.execute("DELETE FROM tokens WHERE modelo IS NOT ?", (self.modelo,))
+        self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('modelo', ?)", (self.modelo,))
+        self._conn.commit()
+        return cursor.rowcount
+
+    # ---------------------------------------------------------------- #
+    def atualizar(self, textos, versao=None):
+        """
+        Sincroniza o cache com a lista atual de respostas e devolve o
+        Counter de frequências atualizado. Se `versao` for a mesma da última
+        chamada, as respostas nem são percorridas.
+        """
+        with self._lock:
+            if versao is not None and versao == self.versao_dados:
+                self.processadas_ultima = 0
+                return self.frequencias
+
+            textos_por_hash = {}
+            linhas_novas = Counter()
+            for texto in textos:
+                h = hash_resposta(texto, self.modelo)
+                textos_por_hash.setdefault(h, texto)
+                linhas_novas[h] += 1
+
+            # Diferença entre o estado anterior e o atual da planilha
+            delta = Counter(linhas_novas)
+            delta.subtract(self._linhas)
+            delta = {h: n for h, n in delta.items() if n != 0}
+
+            if not delta:
+                self.processadas_ultima = 0
+                self.versao_dados = versao
+                return self.frequencias
+
+            faltando = [h for h, n in delta.items() if n > 0 and h not in self._tokens]
+            if faltando:
+                self._tokens.update(self._buscar_no_disco(faltando))
+
+            # Só o que não estava nem em memória nem no disco vai para o spaCy
+            pendentes = [h for h in faltando if h not in self._tokens]
+            self.processadas_ultima = len(pendentes)
+            if pendentes:
+                resultados = self.processar([textos_por_hash[h] for h in pendentes])
+                novos = dict(zip(pendentes, resultados))
+                self._tokens.update(novos)
+                self._salvar_no_disco(novos)
+
+            for h, n in delta.items():
+                for token in self._tokens.get(h, ()):
+                    self.frequencias[token] += n
+
+            # Remove contagens zeradas e esquece respostas que saíram da planilha
+            self.frequencias = +self.frequencias
+            for h, n in delta.items():
+                if n < 0 and linhas_novas[h] == 0:
+                    self._tokens.pop(h, None)
+            self._linhas = linhas_novas
+            self.versao_dados = versao
+            # Respostas editadas ou apagadas na planilha saem também do disco
+            self.podadas += self._podar_ausentes(linhas_novas)
+            self.podadas += self._confirmar_modelo()
+            return self.frequencias
+
+    def tokens(self, texto):
+        """Tokens de uma resposta já sincronizada por `atualizar`."""
+        return self._tokens.get(hash_resposta(texto, self.modelo), [])
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "respostas": sum(self._linhas.values()),
+            "respostas_unicas": len(self._linhas),
+            "processadas_ultima_atualizacao": self.processadas_ultima,
+            "vocabulario": len(self.frequencias),
+            "versao_dados": self.versao_dados,
+            "linhas_podadas": self.podadas,
+        }
@@ -0,0 +1,71 @@
+"""
+Contexto multi-turno do EcoBot com orçamento de tokens.
+
+O histórico da sessão é convertido no formato `contents` do Gemini. Quando
+passa do orçamento, os turnos mais antigos saem do contexto e viram um
+resumo curto (só as perguntas), para que a latência e o custo de cada
+chamada não cresçam com o tamanho da conversa.
+"""
+
+# Aproximação usada para português: ~4 caracteres por token
+CARACTERES_POR_TOKEN = 4
+MAX_CARACTERES_RESUMO = 600
+
+
+def estimar_tokens(texto):
+    """Estimativa barata de tokens, sem chamar a API."""
+    return max(1, len(texto) // CARACTERES_POR_TOKEN) if texto else 0
+
+
+def _turno(role, texto):
+    return {"role": role, "parts": [texto]}
+
+
+def resumir_turnos(turnos):
+    """Resumo extrativo dos turnos descartados: as perguntas do usuário."""
+    perguntas = [t["text"].strip().replace("\n", " ") for t in turnos if t["role"] == "user"]
+    resumo = "; ".join(perguntas)
+    if len(resumo) > MAX_CARACTERES_RESUMO:
+        resumo = "..." + resumo[-MAX_CARACTERES_RESUMO:]
+    return f"Resumo da conversa anterior — o usuário já perguntou: {resumo}"
+
+
+def montar_contexto(historico, prompt, orcamento_tokens=4000):
+    """
+    Monta a lista `contents` para `generate_content` a partir do
+    `historico` ({"role", "text"}) e do novo `prompt`.
+
+    Retorna `(contents, tokens_estimados, turnos_resumidos)`.
+    """
+    usados = estimar_tokens(prompt)
+    mantidos = []
+    # Percorre do mais recente para o mais antigo até estourar o orçamento
+    for i in range(len(historico) - 1, -1, -1):
+        custo = estimar_tokens(historico[i]["text"])
+        if usados + custo > orcamento_tokens:
+            break
+        usados += custo
+        mantidos.append(historico[i])
+    mantidos.reverse()
+
+    # O Gemini espera que a conversa comece com um turno do usuário
+    while mantidos and mantidos[0]["role"] != "user":
+        usados -= estimar_tokens(mantidos.pop(0)["text"])
+
+    descartados = historico[:len(historico) - len(mantidos)]
+    contents = []
+    if descartados:
+        resumo = resumir_turnos(descartados)
+        usados += estimar_tokens(resumo)
+        contents.append(_turno("user", resumo))
+        contents.append(_turno("model", "Entendido."))
+
+    contents.extend(_turno(t["role"], t["text"]) for t in mantidos)
+    contents.append(_turno("user", prompt))
+    return contents, usados, len(descartados)
+
+
+def tokens_do_prompt(resposta):
+    """Contagem real informada pela API, se disponível."""
+    uso = getattr(resposta, "usage_metadata", None)
+    return getattr(uso, "prompt_token_count", None) if uso is not None else None
@@ -0,0 +1,176 @@
+"""
+Análise de cobertura da rede de pontos de coleta.
+
+A região é dividida numa grade regular e, para cada célula, calcula-se a
+distância até o ponto de coleta mais próximo. As contas são feitas num
+plano local (equiretangular em torno do centro da região), o que em escala
+de cidade erra bem menos que o tamanho de uma célula.
+
+Para não comparar cada célula com todos os pontos, a grade é percorrida em
+blocos de `BLOCO_CELULAS` x `BLOCO_CELULAS` células. Para cada bloco só
+entram os pontos que podem ser o mais próximo de alguma célula dele: os que
+estão a no máximo d(centro) + 2·meia-diagonal do centro do bloco. Os blocos
+são processados em lotes, então a memória fica limitada mesmo com milhões
+de células.
+"""
+import base64
+import io
+import math
+import time
+
+import numpy as np
+from PIL import Image
+
+KM_POR_GRAU = 111.32
+BLOCO_CELULAS = 32
+# Elementos (células x pontos) por matriz de distâncias temporária
+MAX_ELEMENTOS = 4_000_000
+# Grades maiores que isso têm a resolução engrossada automaticamente
+MAX_CELULAS = 4_000_000
+MARGEM_KM = 2.0
+# Cores da legenda: perto (verde) → médio (amarelo) → longe (vermelho)
+CORES = np.array([[50, 205, 50], [255, 215, 0], [220, 20, 60]], dtype=np.float32)
+
+
+def regiao_dos_pontos(lats, lons, margem_km=MARGEM_KM):
+    """(sul, oeste, norte, leste) que enquadra os pontos com uma margem."""
+    meio = math.radians(float(np.mean(lats)))
+    margem_lat = margem_km / KM_POR_GRAU
+    margem_lon = margem_km / (KM_POR_GRAU * max(math.cos(meio), 0.01))
+    return (float(np.min(lats)) - margem_lat, float(np.min(lons)) - margem_lon,
+            float(np.max(lats)) + margem_lat, float(np.max(lons)) + margem_lon)
+
+
+def _distancias_bloco(celulas_x, celulas_y, pontos_x, pontos_y):
+    """Distância mínima de cada célula a algum dos pontos (em lotes)."""
+    resultado = np.full(len(celulas_x), np.inf, dtype=np.float32)
+    if len(pontos_x) == 0:
+        return resultado
+    passo = max(1, MAX_ELEMENTOS // len(pontos_x))
+    for i in range(0, len(celulas_x), passo):
+        dx = celulas_x[i:i + passo, None] - pontos_x[None, :]
+        dy = celulas_y[i:i + passo, None] - pontos_y[None, :]
+        resultado[i:i + passo] = np.sqrt((dx * dx + dy * dy).min(axis=1))
+    return resultado
+
+
+class AnaliseCobertura:
+    """
+    Distância (km) de cada célula da grade até o ponto mais próximo.
+    `distancias` tem uma linha por latitude (de sul para norte) e uma coluna
+    por longitude.
+    """
+
+    def __init__(self, pontos, resolucao_m=100, regiao=None):
+        inicio = time.perf_counter()
+        lats = pontos["latitude"].to_numpy(np.float64)
+        lons = pontos["longitude"].to_numpy(np.float64)
+        self.regiao = regiao or regiao_dos_pontos(lats, lons)
+        sul, oeste, norte, leste = self.regiao
+
+        # Plano local em km
+        self._lat0 = (sul + norte) / 2
+        self._km_lon = KM_POR_GRAU * math.cos(math.radians(self._lat0))
+        altura_km = (norte - sul) * KM_POR_GRAU
+        largura_km = (leste - oeste) * self._km_lon
+        self.resolucao_m = float(resolucao_m)
+        while (altura_km * largura_km) / (self.resolucao_m / 1000) ** 2 > MAX_CELULAS:
+            self.resolucao_m *= 2
+        passo_km = self.resolucao_m / 1000
+        self.linhas = max(1, math.ceil(altura_km / passo_km))
+        self.colunas = max(1, math.ceil(largura_km / passo_km))
+
+        pontos_x = ((lons - oeste) * self._km_lon).astype(np.float32)
+        pontos_y = ((lats - sul) * KM_POR_GRAU).astype(np.float32)
+        self.distancias = self._calcular(pontos_x, pontos_y, passo_km)
+        self._imagens = {}
+        self.tempo_calculo = time.perf_counter() - inicio
+
+    def _calcular(self, pontos_x, pontos_y, passo_km):
+        distancias = np.full((self.linhas, self.colunas), np.inf, dtype=np.float32)
+        if len(pontos_x) == 0:
+            return distancias
+
+        # Centros dos blocos e a distância deles ao ponto mais próximo
+        lado_km = BLOCO_CELULAS * passo_km
+        blocos_l = math.ceil(self.linhas / BLOCO_CELULAS)
+        blocos_c = math.ceil(self.colunas / BLOCO_CELULAS)
+        bl, bc = np.meshgrid(np.arange(blocos_l), np.arange(blocos_c), indexing="ij")
+        centros_y = ((bl.ravel() + 0.5) * lado_km).astype(np.float32)
+        centros_x = ((bc.ravel() + 0.5) * lado_km).astype(np.float32)
+        d_centros = _distancias_bloco(centros_x, centros_y, pontos_x, pontos_y)
+        meia_diagonal = lado_km * math.sqrt(2) / 2
+
+        offsets = (np.arange(BLOCO_CELULAS, dtype=np.float32) + 0.5) * passo_km
+        for b in range(len(d_centros)):
+            l0, c0 = int(bl.ravel()[b]) * BLOCO_CELULAS, int(bc.ravel()[b]) * BLOCO_CELULAS
+            l1, c1 = min(l0 + BLOCO_CELULAS, self.linhas), min(c0 + BLOCO_CELULAS, self.colunas)
+
+            # Só os pontos que podem ser o mais próximo de alguma célula do bloco
+            alcance = d_centros[b] + 2 * meia_diagonal
+            dx = pontos_x - centros_x[b]
+            dy = pontos_y - centros_y[b]
+            candidatos = (dx * dx + dy * dy) <= alcance * alcance
+
+            ys, xs = np.meshgrid(l0 * passo_km + offsets[:l1 - l0], c0 * passo_km + offsets[:c1 - c0],
+                                 indexing="ij")
+            distancias[l0:l1, c0:c1] = _distancias_bloco(
+                xs.ravel(), ys.ravel(), pontos_x[candidatos], pontos_y[candidatos]
+            ).reshape(l1 - l0, c1 - c0)
+        return distancias
+
+    # ---------------------------------------------------------------- #
+    def centro_da_celula(self, linha, coluna):
+        """(lat, lon) do centro de uma célula."""
+        sul, oeste, _, _ = self.regiao
+        passo_km = self.resolucao_m / 1000
+        return (sul + (linha + 0.5) * passo_km / KM_POR_GRAU,
+                oeste + (coluna + 0.5) * passo_km / self._km_lon)
+
+    def mais_distante(self):
+        """(lat, lon, distância_km) da célula mais longe de qualquer ponto."""
+        linha, coluna = np.unravel_index(int(np.argmax(self.distancias)), self.distancias.shape)
+        lat, lon = self.centro_da_celula(linha, coluna)
+        return lat, lon, float(self.distancias[linha, coluna])
+
+    def fracao_acima(self, km):
+        """Fração da área a mais de `km` do ponto mais próximo."""
+        return float((self.distancias > km).mean())
+
+    def imagem_png(self, distancia_max_km=5.0, max_lado_px=1000, opacidade=0.55):
+        """
+        PNG (data URL) colorindo as distâncias, para sobrepor ao mapa. Grades
+        maiores que `max_lado_px` são reduzidas pegando o máximo de cada
+        janela, para os vazios não sumirem na redução.
+        """
+        chave = (distancia_max_km, max_lado_px, opacidade)
+        if chave in self._imagens:
+            return self._imagens[chave]
+        d = self.distancias
+        fator = max(1, math.ceil(max(d.shape) / max_lado_px))
+        if fator > 1:
+            linhas, colunas = (d.shape[0] // fator) * fator, (d.shape[1] // fator) * fator
+            d = d[:linhas, :colunas].reshape(linhas // fator, fator, colunas // fator, fator).max(axis=(1, 3))
+
+        t = np.clip(d / distancia_max_km, 0, 1) * (len(CORES) - 1)
+        i = np.minimum(t.astype(np.int64), len(CORES) - 2)
+        frac = (t - i)[..., None]
+        rgb = CORES[i] * (1 - frac) + CORES[i + 1] * frac
+        alfa = np.full(d.shape + (1,), 255 * opacidade, dtype=np.float32)
+        rgba = np.concatenate([rgb, alfa], axis=-1).astype(np.uint8)[::-1]   # norte em cima
+
+        buffer = io.BytesIO()
+        Image.fromarray(rgba, "RGBA").save(buffer, format="PNG", optimize=True)
+        if len(self._imagens) >= 8:
+            self._imagens.pop(next(iter(self._imagens)))
+        self._imagens[chave] = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+        return self._imagens[chave]
+
+    def info(self):
+        return {
+            "regiao": [round(v, 5) for v in self.regiao],
+            "resolucao_m": self.resolucao_m,
+            "celulas": self.linhas * self.colunas,
+            "grade": [self.linhas, self.colunas],
+            "tempo_calculo_s": round(self.tempo_calculo, 3),
+        }
@@ -0,0 +1,30 @@
+"""
+Textos compartilhados entre abas (Informações e EcoBot).
+"""
+
+# (nome, descrição exibida na aba Informações, itens típicos usados pelo EcoBot)
+CATEGORIAS_LIXO = [
+    (
+        "Linha Verde",
+        "Incluindo dispositivos como computadores, laptops, celulares, tablets etc. "
+        "Eles contêm metais preciosos e componentes que necessitam um cuidado especial para evitar impactos ambientais.",
+        ["computador", "laptop", "notebook", "celular", "smartphone", "tablet", "impressora", "monitor", "teclado", "mouse"],
+    ),
+    (
+        "Linha Branca",
+        "Eletrodomésticos de grande porte, como geladeiras, freezers, máquinas de lavar e micro-ondas. "
+        "Esses itens têm componentes recicláveis e precisam ser tratados adequadamente para promover a reciclagem eficiente.",
+        ["geladeira", "freezer", "maquina de lavar", "micro-ondas", "microondas", "fogao", "lava-loucas", "ar-condicionado"],
+    ),
+    (
+        "Linha Marrom",
+        "Refere-se a equipamentos de áudio e vídeo, incluindo televisores, rádios, câmeras e aparelhos de som. "
+        "Muitos desses dispositivos contêm substâncias tóxicas que requerem tratamento específico para evitar o impacto ambiental.",
+        ["televisor", "televisao", "tv", "radio", "camera", "aparelho de som", "caixa de som", "dvd"],
+    ),
+    (
+        "Linha Azul",
+        "Eletrodomésticos de uso geral, como ferramentas elétricas e eletrônicas, brinquedos, dispositivos médicos e de monitoramento.",
+        ["ferramenta", "furadeira", "brinquedo", "dispositivo medico", "liquidificador", "batedeira", "secador", "ferro de passar"],
+    ),
+]
@@ -0,0 +1,240 @@
+"""
+Correção de lemas com erro de digitação nas respostas da aba Opiniões.
+
+Segue a ideia do SymSpell: cada palavra do dicionário é guardada junto com
+todas as formas obtidas apagando até `distancia_max` letras. Para corrigir
+um termo, basta gerar as deleções dele e consultar esse índice; só os poucos
+candidatos encontrados têm a distância de edição calculada, em vez de
+comparar o termo com o vocabulário inteiro.
+
+O dicionário é a lista de palavras em `dados/vocabulario_pt.txt` mais os
+termos frequentes do próprio corpus. As comparações ignoram acentos, então
+"poluicao" e "poluição" caem na mesma forma canônica.
+
+A lista de palavras cobre só o tema, então uma palavra fora dela não é
+necessariamente um erro ("carro", "cabelo"). Por isso um termo só é trocado
+por outro que apareça no corpus pelo menos `razao_min` vezes mais que ele, e
+nunca quando a diferença está só no fim da palavra ("celula" → "celular",
+"pilhar" → "pilha"), que costuma ser outra palavra e não um erro.
+"""
+import os
+import threading
+from collections import Counter
+from itertools import combinations
+
+from cache_respostas import remover_acentos
+
+ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados", "vocabulario_pt.txt")
+
+
+def distancia_edicao(a, b, limite=None):
+    """
+    Distância de Damerau-Levenshtein (transposição de vizinhos conta 1).
+    Com `limite`, devolve `limite + 1` assim que a distância passa dele.
+    """
+    if a == b:
+        return 0
+    if limite is not None and abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        atual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            custo = a[i - 1] != b[j - 1]
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+            if (anterior2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                atual[j] = min(atual[j], anterior2[j - 2] + 1)
+        # A transposição olha duas linhas para trás: só para quando as duas passaram do limite
+        if limite is not None and min(atual) > limite and min(anterior) > limite:
+            return limite + 1
+        anterior2, anterior = anterior, atual
+    return anterior[-1]
+
+
+def delecoes(palavra, distancia_max):
+    """A palavra e todas as formas com até `distancia_max` letras apagadas."""
+    formas = {palavra}
+    for n in range(1, min(distancia_max, len(palavra) - 1) + 1):
+        for posicoes in combinations(range(len(palavra)), n):
+            formas.add("".join(c for i, c in enumerate(palavra) if i not in posicoes))
+    return formas
+
+
+def so_no_fim(a, b):
+    """True se `a` e `b` só diferem no fim (um é prefixo do outro ou só a última letra muda)."""
+    curto, longo = sorted((a, b), key=len)
+    return longo.startswith(curto) or (len(a) == len(b) and a[:-1] == b[:-1])
+
+
+def ler_vocabulario(caminho):
+    """Palavras do arquivo (uma por linha; # comenta), em minúsculas."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        return [p for p in (linha.split("#", 1)[0].strip().lower() for linha in f) if p]
+
+
+class CorretorOrtografico:
+    """
+    Dicionário com índice de deleções e as correções já calculadas.
+
+    `versao` muda sempre que uma palavra nova entra no dicionário (ex.: um
+    termo do corpus que passou de `min_frequencia`) ou que o corpus novo
+    muda alguma correção, para quem guarda tokens já corrigidos saber que
+    precisa refazê-los. Termos cuja forma corrigida está em `excluir`
+    (chaves sem acento) são descartados.
+    """
+
+    def __init__(self, palavras=(), distancia_max=2, tamanho_min=6, min_frequencia=3, razao_min=10,
+                 excluir=frozenset()):
+        self.distancia_max = distancia_max
+        self.tamanho_min = tamanho_min      # termos mais curtos nunca são corrigidos ("carro" e "caro")
+        self.min_frequencia = min_frequencia
+        self.razao_min = razao_min          # o alvo aparece no corpus ao menos tantas vezes mais que o termo
+        self.excluir = frozenset(excluir)
+        self.versao = 0
+        self.corrigidos = Counter()         # correção aplicada -> ocorrências
+
+        self._formas = {}        # chave sem acento -> forma canônica
+        self._frequencia = Counter()   # chave sem acento -> peso no desempate (lista de palavras)
+        self._corpus = Counter()       # chave sem acento -> ocorrências no corpus atual
+        self._indice = {}        # deleção -> conjunto de chaves
+        self._correcoes = {}     # termo -> termo corrigido (cache)
+        self._ultima = None      # ((versão dos dados, origem dos tokens), Counter corrigido)
+        self._lock = threading.Lock()
+
+        for palavra in palavras:
+            self._adicionar(palavra, 1)
+        self.versao = 0
+
+    @classmethod
+    def de_arquivo(cls, caminho=ARQUIVO_PADRAO, **opcoes):
+        return cls(ler_vocabulario(caminho), **opcoes)
+
+    # ---------------------------------------------------------------- #
+    def _adicionar(self, palavra, peso):
+        chave = remover_acentos(palavra)
+        if chave in self._formas:
+            return
+        self._formas[chave] = palavra
+        self._frequencia[chave] = peso
+        for forma in delecoes(chave, self.distancia_max):
+            self._indice.setdefault(forma, set()).add(chave)
+        self.versao += 1
+
+    def aprender(self, frequencias):
+        """Inclui no dicionário os termos do corpus com `min_frequencia` ou mais."""
+        with self._lock:
+            self._aprender(frequencias)
+
+    def _aprender(self, frequencias):
+        corpus = Counter()
+        for termo, n in frequencias.items():
+            corpus[remover_acentos(termo)] += n
+        if corpus == self._corpus:
+            return
+        # As correções dependem das ocorrências no corpus (`razao_min`), não
+        # só do dicionário: refaz as já calculadas e muda `versao` se alguma mudou
+        anteriores, self._correcoes = self._correcoes, {}
+        self._corpus = corpus
+        versao = self.versao
+        for termo, n in frequencias.items():
+            if corpus[remover_acentos(termo)] >= self.min_frequencia:
+                self._adicionar(termo, 0)
+        if self.versao == versao and any(self._corrigir(t) != c for t, c in anteriores.items()):
+            self.versao += 1
+
+    # ---------------------------------------------------------------- #
+    def _distancia_para(self, termo):
+        # Palavras de até 7 letras têm muitos vizinhos válidos a 2 edições ("cabelo" e "cabo")
+        return 1 if len(termo) <= 7 else self.distancia_max
+
+    def _pode_trocar(self, chave, candidato):
+        """Se `chave` (fora do dicionário) pode virar `candidato`."""
+        ocorrencias = self._corpus[candidato]
+        return (ocorrencias >= self.min_frequencia
+                and ocorrencias >= self.razao_min * max(1, self._corpus[chave])
+                and not so_no_fim(chave, candidato))
+
+    def corrigir(self, termo):
+        """
+        Forma canônica de `termo` (ele mesmo se nada próximo for encontrado),
+        ou None se ela estiver entre os termos excluídos.
+        """
+        with self._lock:
+            return self._corrigir(termo)
+
+    def _corrigir(self, termo):
+        # Só com `_lock`: `aprender` troca o corpus e estende o índice
+        if termo in self._correcoes:
+            return self._correcoes[termo]
+
+        chave = remover_acentos(termo)
+        if chave in self._formas:
+            corrigido = self._formas[chave]
+        elif len(chave) < self.tamanho_min:
+            corrigido = termo
+        else:
+            limite = self._distancia_para(chave)
+            candidatos = set()
+            for forma in delecoes(chave, limite):
+                candidatos.update(self._indice.get(forma, ()))
+            melhor, melhor_ordem = None, None
+            for candidato in candidatos:
+                distancia = distancia_edicao(chave, candidato, limite)
+                if distancia > limite or not self._pode_trocar(chave, candidato):
+                    continue
+                peso = self._frequencia[candidato] + self._corpus[candidato]
+                ordem = (distancia, -peso, candidato)
+                if melhor_ordem is None or ordem < melhor_ordem:
+                    melhor, melhor_ordem = candidato, ordem
+            corrigido = self._formas[melhor] if melhor is not None else termo
+
+        if remover_acentos(corrigido) in self.excluir:
+            corrigido = None
+        self._correcoes[termo] = corrigido
+        return corrigido
+
+    def corrigir_tokens(self, tokens):
+        with self._lock:
+            corrigidos = [self._corrigir(t) for t in tokens]
+        return [t for t in corrigidos if t is not None]
+
+    def normalizar(self, frequencias, versao_dados=None, origem=None):
+        """
+        Aprende com o corpus e devolve um novo Counter com as variantes
+        somadas na forma canônica. Para a mesma `versao_dados` e a mesma
+        `origem` dos tokens (modelo spaCy + filtro), devolve o resultado
+        anterior sem percorrer o vocabulário.
+        """
+        chave = (versao_dados, origem)
+        # Tudo sob o lock: o resultado sai de um único corpus e um único dicionário
+        with self._lock:
+            ultima = self._ultima
+            if versao_dados is not None and ultima is not None and ultima[0] == chave:
+                return ultima[1]
+            self._aprender(frequencias)
+            resultado = Counter()
+            corrigidos = Counter()
+            for termo, n in frequencias.items():
+                canonico = self._corrigir(termo)
+                if canonico is None:
+                    continue
+                resultado[canonico] += n
+                if canonico != termo:
+                    corrigidos[f"{termo} → {canonico}"] += n
+            self.corrigidos = corrigidos
+            self._ultima = (chave, resultado)
+        return resultado
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "dicionario": len(self._formas),
+            "delecoes_indexadas": len(self._indice),
+            "versao_dicionario": self.versao,
+            "correcoes_em_cache": len(self._correcoes),
+            "variantes_corrigidas": len(self.corrigidos),
+            "ocorrencias_corrigidas": sum(self.corrigidos.values()),
+            "principais_correcoes": dict(self.corrigidos.most_common(10)),
+        }
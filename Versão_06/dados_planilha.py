@@ -0,0 +1,159 @@
+"""
+Ingestão da planilha de opiniões (export CSV do Google Sheets).
+
+Uma thread em segundo plano consulta a planilha periodicamente usando
+ETag/Last-Modified e, se o servidor não os enviar, um hash do conteúdo, para
+não reprocessar exports iguais. As sessões sempre recebem na hora o último
+DataFrame bom, junto com a versão dos dados, que os caches seguintes usam
+para saber se algo realmente mudou.
+"""
+import hashlib
+import threading
+import time
+from io import BytesIO
+
+import pandas as pd
+import requests
+
+
+def preparar_opinioes(df):
+    """Padroniza a coluna de respostas da planilha como `percepcao`."""
+    if len(df.columns) > 1:
+        original = df.columns[1]
+        df = df.rename(columns={original: "percepcao"})
+    return df
+
+
+class FontePlanilha:
+    """
+    Dono do DataFrame da planilha para o processo inteiro.
+
+    `versao` é o hash do conteúdo CSV aceito por último; ele só muda quando
+    os bytes exportados mudam.
+    """
+
+    def __init__(self, url, preparar=preparar_opinioes, intervalo=30, timeout=10, sessao=None):
+        self.url = url
+        self.preparar = preparar
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.sessao = sessao or requests.Session()
+
+        self.dados = None
+        self.versao = None
+        self.atualizado_em = None     # última consulta bem-sucedida
+        self.alterado_em = None       # última vez que os dados mudaram
+        self.ultimo_erro = None
+        self.consultas = 0
+        self.nao_modificados = 0
+
+        self._etag = None
+        self._last_modified = None
+        self._lock = threading.Lock()
+        self._lock_consulta = threading.Lock()   # uma consulta por vez (thread e primeira carga)
+        self._parar = threading.Event()
+        self._thread = None
+        self._ouvintes = []
+
+    # ---------------------------------------------------------------- #
+    def ao_mudar(self, callback):
+        """Registra `callback(dados, versao)`, chamado quando a versão muda."""
+        self._ouvintes.append(callback)
+
+    def atualizar(self):
+        """
+        Consulta a planilha uma vez. Retorna True se os dados mudaram.
+        Erros ficam em `ultimo_erro` e o último DataFrame bom é mantido.
+        """
+        with self._lock_consulta:
+            return self._consultar()
+
+    def _consultar(self):
+        cabecalhos = {}
+        if self._etag:
+            cabecalhos["If-None-Match"] = self._etag
+        if self._last_modified:
+            cabecalhos["If-Modified-Since"] = self._last_modified
+
+        self.consultas += 1
+        try:
+            resposta = self.sessao.get(self.url, headers=cabecalhos, timeout=self.timeout)
+            if resposta.status_code == 304:
+                self.nao_modificados += 1
+                self.atualizado_em = time.time()
+                self.ultimo_erro = None
+                return False
+            resposta.raise_for_status()
+
+            conteudo = resposta.content
+            versao = hashlib.sha1(conteudo).hexdigest()[:12]
+            if versao != self.versao:
+                dados = self.preparar(pd.read_csv(BytesIO(conteudo)))
+        except Exception as e:
+            self.ultimo_erro = e
+            return False
+
+        # Validadores só depois de um parse bom: senão um CSV quebrado
+        # responderia 304 para sempre e nunca seria reprocessado
+        self._etag = resposta.headers.get("ETag")
+        self._last_modified = resposta.headers.get("Last-Modified")
+        self.atualizado_em = time.time()
+        self.ultimo_erro = None
+        if versao == self.versao:
+            self.nao_modificados += 1
+            return False
+
+        with self._lock:
+            self.dados = dados
+            self.versao = versao
+            self.alterado_em = time.time()
+        for callback in list(self._ouvintes):
+            try:
+                callback(dados, versao)
+            except Exception:
+                pass
+        return True
+
+    # ---------------------------------------------------------------- #
+    def _loop(self):
+        while not self._parar.wait(self.intervalo):
+            self.atualizar()
+
+    def iniciar(self):
+        """Inicia o polling em segundo plano (idempotente)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(target=self._loop, name="planilha", daemon=True)
+                self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def obter(self):
+        """
+        Retorna `(dados, versao)` imediatamente. Só espera pela rede na
+        primeira chamada, quando ainda não existe nenhum dado carregado;
+        se essa primeira carga falhar, a exceção é propagada.
+        """
+        if self.dados is None:
+            # Sessões que chegam juntas esperam a mesma carga em vez de baixar cada uma
+            with self._lock_consulta:
+                if self.dados is None:
+                    self._consultar()
+                    if self.dados is None:
+                        raise self.ultimo_erro or RuntimeError("Planilha vazia")
+        self.iniciar()
+        # Lidos juntos: a thread troca os dois sob o mesmo lock
+        with self._lock:
+            return self.dados, self.versao
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "versao": self.versao,
+            "consultas": self.consultas,
+            "nao_modificados": self.nao_modificados,
+            "atualizado_ha_s": None if self.atualizado_em is None else round(time.time() - self.atualizado_em, 1),
+            "ultimo_erro": None if self.ultimo_erro is None else str(self.ultimo_erro),
+        }
@@ -0,0 +1,149 @@
+"""
+Filtro de termos excluídos da nuvem e do gráfico da aba Opiniões.
+
+As exclusões vêm de um arquivo de texto (uma entrada por linha). Palavras
+soltas vão para um frozenset normalizado (minúsculas, sem acentos), testado
+contra o texto e o lema de cada token; entradas com mais de uma palavra são
+frases, procuradas com o `PhraseMatcher` do spaCy. O filtro é um componente
+do próprio pipeline: os tokens excluídos ficam marcados no Doc e
+`extrair_tokens` nunca os transforma em lemas.
+
+O componente roda por último e sobrescreve o `norm_` dos tokens com a forma
+normalizada, que é o atributo comparado pelo `PhraseMatcher`.
+"""
+import hashlib
+import os
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from spacy.language import Language
+from spacy.matcher import PhraseMatcher
+
+from cache_respostas import remover_acentos
+
+NOME_COMPONENTE = "filtro_lexico"
+ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados", "exclusoes_opinioes.txt")
+
+# Chaves em Doc.user_data (sobrevivem ao nlp.pipe com n_process > 1)
+EXCLUIDOS = "filtro_lexico_excluidos"   # índices dos tokens excluídos
+ACERTOS = "filtro_lexico_acertos"       # entradas do arquivo que casaram
+
+_lock_instalacao = threading.Lock()
+
+
+@lru_cache(maxsize=65536)
+def normalizar_termo(texto):
+    """Minúsculas e sem acentos (cache, já que o vocabulário se repete)."""
+    return remover_acentos(texto.strip().lower())
+
+
+def ler_exclusoes(caminho):
+    """Entradas normalizadas do arquivo: (palavras, frases). Ignora # e linhas vazias."""
+    palavras, frases = set(), set()
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            entrada = " ".join(normalizar_termo(linha.split("#", 1)[0]).split())
+            if not entrada:
+                continue
+            (frases if " " in entrada else palavras).add(entrada)
+    return frozenset(palavras), frozenset(frases)
+
+
+class FiltroLexico:
+    """Componente spaCy que marca os tokens excluídos de cada Doc."""
+
+    def __init__(self, nlp, caminho=ARQUIVO_PADRAO):
+        self.nlp = nlp
+        self.acertos = Counter()
+        self._lock = threading.Lock()
+        self.carregar(caminho)
+
+    def carregar(self, caminho):
+        """(Re)lê o arquivo de exclusões; troca o filtro de uma vez só."""
+        mtime = os.path.getmtime(caminho)
+        palavras, frases = ler_exclusoes(caminho)
+        matcher = PhraseMatcher(self.nlp.vocab, attr="NORM")
+        for frase in frases:
+            padrao = self.nlp.make_doc(frase)
+            for token in padrao:
+                token.norm_ = normalizar_termo(token.text)
+            matcher.add(frase, [padrao])
+
+        conteudo = "\n".join(sorted(palavras) + ["--"] + sorted(frases))
+        assinatura = hashlib.sha1(conteudo.encode("utf-8")).hexdigest()[:8]
+        # Um único atributo, para quem estiver no meio de um Doc ver o filtro antigo ou o novo
+        self._estado = (palavras, matcher)
+        self.caminho, self.mtime = caminho, mtime
+        self.palavras, self.frases = palavras, frases
+        self.assinatura = assinatura
+
+    def recarregar_se_mudou(self):
+        try:
+            if os.path.getmtime(self.caminho) != self.mtime:
+                self.carregar(self.caminho)
+        except OSError:
+            pass   # arquivo sumiu: continua com o último filtro carregado
+
+    def __call__(self, doc):
+        palavras, matcher = self._estado
+        excluidos, acertos = set(), []
+        for token in doc:
+            forma = normalizar_termo(token.text)
+            token.norm_ = forma
+            if forma in palavras:
+                excluidos.add(token.i)
+                acertos.append(forma)
+            elif token.lemma_ and normalizar_termo(token.lemma_) in palavras:
+                excluidos.add(token.i)
+                acertos.append(normalizar_termo(token.lemma_))
+
+        for match_id, inicio, fim in matcher(doc):
+            excluidos.update(range(inicio, fim))
+            acertos.append(self.nlp.vocab.strings[match_id])
+
+        if excluidos:
+            doc.user_data[EXCLUIDOS] = sorted(excluidos)
+            doc.user_data[ACERTOS] = acertos
+        return doc
+
+    def contar(self, doc):
+        """Soma os acertos de um Doc já processado (no processo principal)."""
+        acertos = doc.user_data.get(ACERTOS)
+        if acertos:
+            with self._lock:
+                self.acertos.update(acertos)
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        with self._lock:
+            acertos = dict(self.acertos.most_common())
+        return {
+            "arquivo": os.path.basename(self.caminho),
+            "assinatura": self.assinatura,
+            "palavras": len(self.palavras),
+            "frases": len(self.frases),
+            "exclusoes": sum(acertos.values()),
+            "acertos": acertos,
+        }
+
+
+@Language.factory(NOME_COMPONENTE, default_config={"caminho": ARQUIVO_PADRAO})
+def criar_filtro_lexico(nlp, name, caminho):
+    return FiltroLexico(nlp, caminho)
+
+
+def instalar_filtro(nlp, caminho=ARQUIVO_PADRAO):
+    """
+    Garante o filtro no fim do pipeline (idempotente) e o relê se o arquivo
+    mudou. Retorna o componente.
+    """
+    with _lock_instalacao:
+        if NOME_COMPONENTE not in nlp.pipe_names:
+            nlp.add_pipe(NOME_COMPONENTE, last=True, config={"caminho": caminho})
+    filtro = nlp.get_pipe(NOME_COMPONENTE)
+    if filtro.caminho != caminho:
+        filtro.carregar(caminho)
+    else:
+        filtro.recarregar_se_mudou()
+    return filtro
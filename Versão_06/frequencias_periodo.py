@@ -0,0 +1,161 @@
+"""
+Frequências de termos das opiniões por dia, para o gráfico da aba Opiniões.
+
+Cada resposta entra no dia do seu carimbo de data/hora. Quando a planilha
+muda, só as respostas que entraram ou saíram ajustam os contadores do dia,
+o total e as janelas (últimos N dias) já montadas. O top-k de cada janela
+sai de um heap (`heapq.nlargest`) e fica guardado até a janela mudar, então
+trocar o período do gráfico não percorre as respostas de novo.
+"""
+import heapq
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from operator import itemgetter
+
+import pandas as pd
+
+
+def dias_e_textos(df, coluna_data=0, coluna_texto="percepcao"):
+    """
+    Pares (dia, texto) das respostas da planilha, na ordem das linhas.
+    `dia` é None quando o carimbo não pode ser lido. É um gerador: a coluna
+    de datas só é convertida se alguém percorrer o resultado.
+    """
+    if coluna_texto not in df.columns or len(df.columns) < 2:
+        return
+    respostas = df.dropna(subset=[coluna_texto])
+    datas = pd.to_datetime(respostas.iloc[:, coluna_data], dayfirst=True, errors="coerce")
+    for momento, texto in zip(datas, respostas[coluna_texto].astype(str)):
+        yield (momento.date() if pd.notna(momento) else None), texto
+
+
+class FrequenciasPorDia:
+    """
+    Contagem de tokens por dia, com total e janelas mantidos por diferença.
+
+    `atualizar` recebe os pares (dia, texto) atuais e uma função que devolve
+    os tokens de um texto (ex.: `CacheTokens.tokens`).
+    """
+
+    def __init__(self, k=15):
+        self.k = k
+        self.total = Counter()
+        self.versao_dados = None
+        self.alteradas_ultima = 0     # respostas que entraram/saíram na última atualização
+        self.consultas = 0
+        self.consultas_em_cache = 0
+
+        self._linhas = Counter()      # (dia, texto) -> quantas vezes aparece na planilha
+        self._tokens = {}             # texto -> lista de tokens
+        self._por_dia = {}            # dia -> Counter de tokens
+        self._janelas = {}            # (dias, fim) -> Counter de tokens
+        self._top = {}                # (dias, fim, k, excluir) -> [(token, n), ...]
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- #
+    def atualizar(self, linhas, tokens_de, versao=None):
+        """
+        Sincroniza com as respostas atuais. Se `versao` for a mesma da última
+        chamada, `linhas` nem é percorrido.
+        """
+        with self._lock:
+            if versao is not None and versao == self.versao_dados:
+                self.alteradas_ultima = 0
+                return
+
+            novas = Counter(linhas)
+            delta = Counter(novas)
+            delta.subtract(self._linhas)
+            delta = {chave: n for chave, n in delta.items() if n != 0}
+
+            for (dia, texto), n in delta.items():
+                tokens = self._tokens.get(texto)
+                if tokens is None:
+                    tokens = self._tokens[texto] = tokens_de(texto)
+                self._aplicar(dia, tokens, n)
+
+            # Esquece textos que saíram da planilha
+            if any(n < 0 for n in delta.values()):
+                presentes = {texto for _, texto in novas}
+                self._tokens = {t: v for t, v in self._tokens.items() if t in presentes}
+
+            self.alteradas_ultima = sum(abs(n) for n in delta.values())
+            self._linhas = novas
+            self.versao_dados = versao
+
+    def _aplicar(self, dia, tokens, n):
+        contagem = Counter(tokens)
+        if n != 1:
+            contagem = Counter({t: c * n for t, c in contagem.items()})
+
+        alvos = [self.total]
+        if dia is not None:
+            alvos.append(self._por_dia.setdefault(dia, Counter()))
+            alvos.extend(janela for (dias, fim), janela in self._janelas.items()
+                         if fim - timedelta(days=dias - 1) <= dia <= fim)
+        for alvo in alvos:
+            alvo.update(contagem)
+            for token in contagem:
+                if alvo[token] <= 0:
+                    del alvo[token]
+
+        if dia is not None and not self._por_dia[dia]:
+            del self._por_dia[dia]
+
+        # O top-k do total e das janelas que contêm o dia precisa ser refeito
+        def afetado(chave):
+            dias, fim = chave[0], chave[1]
+            return dias is None or (dia is not None and fim - timedelta(days=dias - 1) <= dia <= fim)
+
+        self._top = {chave: top for chave, top in self._top.items() if not afetado(chave)}
+
+    # ---------------------------------------------------------------- #
+    def _janela(self, dias, fim):
+        chave = (dias, fim)
+        janela = self._janelas.get(chave)
+        if janela is None:
+            # Janelas de dias anteriores não voltam a ser usadas
+            for antiga in [c for c in self._janelas if c[1] != fim]:
+                del self._janelas[antiga]
+            janela = Counter()
+            for i in range(dias):
+                janela.update(self._por_dia.get(fim - timedelta(days=i), {}))
+            self._janelas[chave] = janela
+        return janela
+
+    def top(self, dias=None, k=None, excluir=frozenset(), hoje=None):
+        """
+        Os `k` termos mais frequentes, como lista de (token, n). `dias=None`
+        usa todas as respostas; senão, os últimos `dias` dias até `hoje`.
+        """
+        k = k or self.k
+        fim = hoje or date.today()
+        chave = (dias, fim if dias is not None else None, k, excluir)
+        with self._lock:
+            self.consultas += 1
+            top = self._top.get(chave)
+            if top is not None:
+                self.consultas_em_cache += 1
+                return top
+            if dias is not None:
+                for antiga in [c for c in self._top if c[0] is not None and c[1] != fim]:
+                    del self._top[antiga]
+            contagem = self.total if dias is None else self._janela(dias, fim)
+            top = heapq.nlargest(k, ((t, n) for t, n in contagem.items() if t not in excluir),
+                                 key=itemgetter(1))
+            self._top[chave] = top
+            return top
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "respostas": sum(self._linhas.values()),
+            "dias": len(self._por_dia),
+            "primeiro_dia": str(min(self._por_dia)) if self._por_dia else None,
+            "ultimo_dia": str(max(self._por_dia)) if self._por_dia else None,
+            "alteradas_ultima_atualizacao": self.alteradas_ultima,
+            "janelas_montadas": len(self._janelas),
+            "consultas": self.consultas,
+            "consultas_em_cache": self.consultas_em_cache,
+        }
@@ -0,0 +1,133 @@
+"""
+Geocodificador local de CEP e bairro, sem acesso à rede.
+
+Lê `dados/localidades.csv`, uma lista de prefixos de CEP e de bairros com
+coordenadas aproximadas (o centro da região):
+
+    tipo, chave, nome, cidade, uf, latitude, longitude
+
+`tipo` é "cep" (com o prefixo em `chave`, de 1 a 5 dígitos) ou "bairro".
+As chaves ficam em listas ordenadas e as buscas por prefixo usam `bisect`
+(O(log n)), tanto para o autocompletar quanto para achar o prefixo de CEP
+mais longo que cobre um CEP digitado. Da faixa encontrada só os `limite`
+melhores são ordenados (`heapq`), não a faixa inteira.
+"""
+import bisect
+import heapq
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from cache_respostas import remover_acentos
+from pontos_coleta import PASTA_DADOS
+
+ARQUIVO_LOCALIDADES = os.path.join(PASTA_DADOS, "localidades.csv")
+MAX_SUGESTOES = 8
+# Maior caractere possível: fecha a faixa de chaves que começam com um prefixo
+FIM_FAIXA = "\U0010ffff"
+# Texto com cara de CEP: só dígitos, hífen, ponto e espaços
+PADRAO_CEP = re.compile(r"^[\d\s.\-]+$")
+
+
+def normalizar_local(texto):
+    return " ".join(remover_acentos(texto.lower()).split())
+
+
+class Geocodificador:
+    """Índices ordenados de prefixos de CEP e de nomes de bairro."""
+
+    def __init__(self, caminho=ARQUIVO_LOCALIDADES):
+        df = pd.read_csv(caminho, dtype=str, keep_default_na=False)
+        df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+        df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+        df = df[df["latitude"].between(-90, 90) & df["longitude"].between(-180, 180)].reset_index(drop=True)
+
+        self.lats = df["latitude"].to_numpy(np.float32)
+        self.lons = df["longitude"].to_numpy(np.float32)
+        self.tipos = df["tipo"].tolist()
+        self.rotulos = [
+            f"CEP {c}… – {n}, {cid}/{uf}" if t == "cep" else f"{n}, {cid}/{uf}"
+            for t, c, n, cid, uf in zip(df["tipo"], df["chave"], df["nome"], df["cidade"], df["uf"])
+        ]
+
+        # CEP: prefixo -> linha (ordenado)
+        ceps = sorted((re.sub(r"\D", "", c), i) for i, (t, c) in enumerate(zip(df["tipo"], df["chave"]))
+                      if t == "cep" and re.sub(r"\D", "", c))
+        self._ceps = [c for c, _ in ceps]
+        self._linhas_cep = [i for _, i in ceps]
+
+        # Bairro: cada início de palavra vira uma chave ("jardim sao luis",
+        # "sao luis", "luis"), para "luis" também sugerir Jardim São Luís
+        nomes = []
+        for i, (t, nome) in enumerate(zip(df["tipo"], df["nome"])):
+            if t != "bairro":
+                continue
+            partes = normalizar_local(nome).split()
+            for k in range(len(partes)):
+                nomes.append((" ".join(partes[k:]), k, i))
+        nomes.sort()
+        self._nomes = [n for n, _, _ in nomes]
+        self._linhas_nome = [(k, i) for _, k, i in nomes]
+
+    # ---------------------------------------------------------------- #
+    def _local(self, linha, precisao):
+        return {
+            "rotulo": self.rotulos[linha],
+            "latitude": float(self.lats[linha]),
+            "longitude": float(self.lons[linha]),
+            "tipo": self.tipos[linha],
+            "precisao": precisao,
+        }
+
+    def _cep_mais_longo(self, digitos):
+        """Linha do maior prefixo cadastrado que cobre `digitos`."""
+        for n in range(min(len(digitos), 8), 0, -1):
+            i = bisect.bisect_left(self._ceps, digitos[:n])
+            if i < len(self._ceps) and self._ceps[i] == digitos[:n]:
+                return self._linhas_cep[i], n
+        return None, 0
+
+    def sugerir(self, texto, limite=MAX_SUGESTOES):
+        """Localidades que começam com `texto` (CEP ou nome de bairro)."""
+        texto = texto.strip()
+        # Sem letra nem dígito ("-", ".") a faixa seria o índice inteiro
+        if not any(c.isalnum() for c in texto):
+            return []
+
+        if PADRAO_CEP.match(texto):
+            digitos = re.sub(r"\D", "", texto)
+            inicio = bisect.bisect_left(self._ceps, digitos)
+            fim = bisect.bisect_left(self._ceps, digitos + FIM_FAIXA)
+            # Prefixos mais curtos primeiro: região antes do bairro
+            faixa = heapq.nsmallest(limite, range(inicio, fim), key=lambda j: (len(self._ceps[j]), self._ceps[j]))
+            sugestoes = [self._local(self._linhas_cep[j], f"prefixo {self._ceps[j]}") for j in faixa]
+            if not sugestoes:
+                linha, n = self._cep_mais_longo(digitos)
+                if linha is not None:
+                    sugestoes = [self._local(linha, f"prefixo {digitos[:n]}")]
+            return sugestoes
+
+        chave = normalizar_local(texto)
+        inicio = bisect.bisect_left(self._nomes, chave)
+        fim = bisect.bisect_left(self._nomes, chave + FIM_FAIXA)
+        # Quem começa pelo texto digitado vem antes de quem só contém a palavra;
+        # o heap só desempilha até juntar `limite` bairros diferentes
+        encontrados = self._linhas_nome[inicio:fim]
+        heapq.heapify(encontrados)
+        vistos = set()
+        sugestoes = []
+        while encontrados and len(sugestoes) < limite:
+            _, linha = heapq.heappop(encontrados)
+            if linha not in vistos:
+                vistos.add(linha)
+                sugestoes.append(self._local(linha, "bairro"))
+        return sugestoes
+
+    def info(self):
+        return {
+            "localidades": len(self.rotulos),
+            "prefixos_cep": len(self._ceps),
+            "chaves_bairro": len(self._nomes),
+        }
@@ -0,0 +1,159 @@
+"""
+Memória das conversas do EcoBot, limitada e compartilhada pelo servidor.
+
+Cada sessão tem um `HistoricoChat` com limite de turnos e de bytes: ao
+passar de um deles, os turnos mais antigos saem. Os turnos são guardados
+como tuplas com o texto em UTF-8 (comprimido com zlib quando compensa), em
+vez de dicts com str.
+
+Os históricos ficam num `MemoriaChat` único do servidor e a sessão do
+Streamlit guarda só o id da conversa. Uma thread em segundo plano descarta
+as conversas paradas há mais de `ocioso_s`, mesmo que o usuário nunca
+volte para disparar um rerun.
+"""
+import threading
+import time
+import uuid
+import zlib
+
+# Textos menores que isso não compensam a compressão
+MIN_COMPRIMIR = 256
+PAPEIS = {"user": "u", "model": "m"}
+PAPEIS_INV = {v: k for k, v in PAPEIS.items()}
+
+
+def _empacotar(texto):
+    bruto = texto.encode("utf-8")
+    if len(bruto) >= MIN_COMPRIMIR:
+        comprimido = zlib.compress(bruto, 6)
+        if len(comprimido) < len(bruto):
+            return comprimido, True
+    return bruto, False
+
+
+def _desempacotar(dados, comprimido):
+    return (zlib.decompress(dados) if comprimido else dados).decode("utf-8")
+
+
+class HistoricoChat:
+    """
+    Turnos de uma conversa. Iterar devolve dicts {"role", "text",
+    "tokens_enviados"}, o formato usado por `montar_contexto`.
+    """
+
+    def __init__(self, max_turnos=40, max_bytes=64 * 1024):
+        self.max_turnos = max_turnos
+        self.max_bytes = max_bytes
+        self._turnos = []   # (papel, dados, comprimido, tokens_enviados, tamanho_original)
+        self.bytes = 0
+        self.bytes_originais = 0
+        self.descartados = 0
+        self._lock = threading.Lock()
+
+    def adicionar(self, role, texto, tokens_enviados=0):
+        dados, comprimido = _empacotar(texto)
+        tamanho = len(texto.encode("utf-8"))
+        with self._lock:
+            self._turnos.append((PAPEIS[role], dados, comprimido, tokens_enviados, tamanho))
+            self.bytes += len(dados)
+            self.bytes_originais += tamanho
+            # Sempre sobra pelo menos o turno que acabou de entrar
+            while len(self._turnos) > 1 and (len(self._turnos) > self.max_turnos or self.bytes > self.max_bytes):
+                _, antigo, _, _, tamanho_antigo = self._turnos.pop(0)
+                self.bytes -= len(antigo)
+                self.bytes_originais -= tamanho_antigo
+                self.descartados += 1
+
+    def limpar(self):
+        with self._lock:
+            self._turnos = []
+            self.bytes = self.bytes_originais = 0
+
+    def __iter__(self):
+        with self._lock:
+            turnos = list(self._turnos)
+        for papel, dados, comprimido, tokens, _ in turnos:
+            yield {"role": PAPEIS_INV[papel], "text": _desempacotar(dados, comprimido), "tokens_enviados": tokens}
+
+    def __len__(self):
+        return len(self._turnos)
+
+
+class MemoriaChat:
+    """Históricos de todas as sessões, com varredura das conversas paradas."""
+
+    def __init__(self, ocioso_s=15 * 60, intervalo_varredura=60, max_turnos=40, max_bytes=64 * 1024):
+        self.ocioso_s = ocioso_s
+        self.intervalo_varredura = intervalo_varredura
+        self.max_turnos = max_turnos
+        self.max_bytes = max_bytes
+        self._sessoes = {}   # id -> [HistoricoChat, último acesso]
+        self.expiradas = 0
+        self.varreduras = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def nova_conversa(self):
+        return uuid.uuid4().hex
+
+    def obter(self, conversa):
+        """Histórico da conversa (criado vazio se não existir ou tiver expirado)."""
+        self.iniciar()
+        with self._lock:
+            sessao = self._sessoes.get(conversa)
+            if sessao is None:
+                sessao = self._sessoes[conversa] = [HistoricoChat(self.max_turnos, self.max_bytes), 0.0]
+            sessao[1] = time.time()
+            return sessao[0]
+
+    def descartar(self, conversa):
+        with self._lock:
+            sessao = self._sessoes.pop(conversa, None)
+        if sessao is not None:
+            sessao[0].limpar()
+
+    def varrer(self):
+        """Descarta as conversas paradas há mais de `ocioso_s`. Retorna quantas."""
+        limite = time.time() - self.ocioso_s
+        with self._lock:
+            paradas = [c for c, (_, acesso) in self._sessoes.items() if acesso < limite]
+            historicos = [self._sessoes.pop(c)[0] for c in paradas]
+            self.expiradas += len(paradas)
+            self.varreduras += 1
+        # Limpa também o objeto, caso a sessão do Streamlit ainda o referencie
+        for historico in historicos:
+            historico.limpar()
+        return len(paradas)
+
+    # ---------------------------------------------------------------- #
+    def _loop(self):
+        while not self._parar.wait(self.intervalo_varredura):
+            self.varrer()
+
+    def iniciar(self):
+        """Inicia a varredura em segundo plano (idempotente)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(target=self._loop, name="memoria-chat", daemon=True)
+                self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        with self._lock:
+            historicos = [h for h, _ in self._sessoes.values()]
+        return {
+            "conversas": len(historicos),
+            "turnos": sum(len(h) for h in historicos),
+            "bytes": sum(h.bytes for h in historicos),
+            "bytes_sem_compressao": sum(h.bytes_originais for h in historicos),
+            "turnos_descartados_por_limite": sum(h.descartados for h in historicos),
+            "conversas_expiradas": self.expiradas,
+            "varreduras": self.varreduras,
+        }
@@ -0,0 +1,216 @@
+"""
+Tempos das etapas de cada rerun (segredos, spaCy, planilha, tokens, nuvem,
+gráfico, primeiro token do Gemini...) e contadores, por aba e sessão.
+
+Cada etapa guarda as últimas `janela` durações por (etapa, aba), de onde
+saem os percentis mostrados no painel de depuração. Opcionalmente, uma
+thread em segundo plano grava a cada `intervalo` segundos:
+
+- um arquivo no formato texto do Prometheus (para o textfile collector do
+  node_exporter ou qualquer raspador local), trocado de forma atômica;
+- um log JSONL com uma linha por medição (etapa, aba, sessão, segundos).
+
+Desligado (`ativo=False`), `etapa()` e `rerun()` devolvem um único
+`nullcontext` e nada é medido nem guardado.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+
+SEM_ABA = "-"
+PERCENTIS = (0.5, 0.9, 0.99)
+_NULO = nullcontext()
+
+
+def percentil(ordenados, p):
+    """Percentil por posição mais próxima de uma lista já ordenada."""
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, max(0, round(p * len(ordenados)) - 1))]
+
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class Metricas:
+    """Registro de tempos e contadores do processo, compartilhado pelas sessões."""
+
+    def __init__(self, ativo=True, janela=500, arquivo_prometheus=None, arquivo_jsonl=None, intervalo=15):
+        self.ativo = ativo
+        self.janela = janela
+        self.arquivo_prometheus = arquivo_prometheus
+        self.arquivo_jsonl = arquivo_jsonl
+        self.intervalo = intervalo
+        self.exportacoes = 0
+        self.ultimo_erro = None
+
+        self._duracoes = {}              # (etapa, aba) -> deque das últimas durações
+        self._totais = Counter()         # (etapa, aba) -> soma de todas as durações
+        self._quantidades = Counter()    # (etapa, aba) -> quantas medições
+        self._contadores = Counter()     # (nome, aba) -> valor
+        self._pendentes = deque(maxlen=10_000)   # linhas JSONL ainda não gravadas
+        self._local = threading.local()  # aba e sessão do rerun desta thread
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+        if ativo and (arquivo_prometheus or arquivo_jsonl):
+            self._thread = threading.Thread(target=self._loop, name="metricas", daemon=True)
+            self._thread.start()
+
+    # ---------------------------------------------------------------- #
+    def registrar(self, etapa, segundos, aba=None):
+        """Guarda uma duração já medida (ex.: tempo até o primeiro token)."""
+        if not self.ativo:
+            return
+        aba = aba or getattr(self._local, "aba", SEM_ABA)
+        chave = (etapa, aba)
+        with self._lock:
+            duracoes = self._duracoes.get(chave)
+            if duracoes is None:
+                duracoes = self._duracoes[chave] = deque(maxlen=self.janela)
+            duracoes.append(segundos)
+            self._totais[chave] += segundos
+            self._quantidades[chave] += 1
+        if self.arquivo_jsonl:
+            self._pendentes.append({
+                "ts": round(time.time(), 3), "etapa": etapa, "aba": aba,
+                "sessao": getattr(self._local, "sessao", None), "s": round(segundos, 6),
+            })
+
+    def contar(self, nome, n=1, aba=None):
+        if not self.ativo:
+            return
+        aba = aba or getattr(self._local, "aba", SEM_ABA)
+        with self._lock:
+            self._contadores[(nome, aba)] += n
+
+    @contextmanager
+    def _medir(self, etapa, aba):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio, aba)
+
+    def etapa(self, nome, aba=None):
+        """`with metricas.etapa("spacy"): ...` mede o bloco."""
+        if not self.ativo:
+            return _NULO
+        return self._medir(nome, aba)
+
+    def cronometrar(self, nome, funcao, aba=None):
+        """Embrulha `funcao` para medir cada chamada (ex.: a renderização da nuvem)."""
+        if not self.ativo:
+            return funcao
+
+        def medida(*args, **kwargs):
+            with self._medir(nome, aba):
+                return funcao(*args, **kwargs)
+        return medida
+
+    @contextmanager
+    def _no_rerun(self, aba, sessao, nome):
+        anterior = (getattr(self._local, "aba", SEM_ABA), getattr(self._local, "sessao", None))
+        self._local.aba, self._local.sessao = aba, sessao
+        try:
+            with self._medir(nome, aba):
+                yield
+        finally:
+            self._local.aba, self._local.sessao = anterior
+
+    def rerun(self, aba, sessao=None, nome="rerun"):
+        """
+        Marca a aba e a sessão das etapas medidas dentro do bloco (na mesma
+        thread) e mede o bloco inteiro como `nome`.
+        """
+        if not self.ativo:
+            return _NULO
+        return self._no_rerun(aba, sessao, nome)
+
+    # ---------------------------------------------------------------- #
+    def resumo(self, aba=None):
+        """Uma linha por (etapa, aba) com contagem e percentis em ms."""
+        with self._lock:
+            itens = [(chave, sorted(d), self._quantidades[chave], self._totais[chave])
+                     for chave, d in self._duracoes.items() if aba is None or chave[1] == aba]
+        linhas = []
+        for (etapa, aba_etapa), ordenados, quantidade, total in sorted(itens):
+            linha = {"etapa": etapa, "aba": aba_etapa, "medicoes": quantidade,
+                     "media_ms": round(total / quantidade * 1000, 2)}
+            for p in PERCENTIS:
+                linha[f"p{round(p * 100)}_ms"] = round(percentil(ordenados, p) * 1000, 2)
+            linhas.append(linha)
+        return linhas
+
+    def contadores(self, aba=None):
+        with self._lock:
+            return {f"{nome} [{a}]": n for (nome, a), n in sorted(self._contadores.items())
+                    if aba is None or a == aba}
+
+    def texto_prometheus(self):
+        """Resumos e contadores no formato de exposição texto do Prometheus."""
+        with self._lock:
+            itens = [(chave, sorted(d), self._quantidades[chave], self._totais[chave])
+                     for chave, d in self._duracoes.items()]
+            contadores = dict(self._contadores)
+        linhas = [
+            "# HELP ecotech_etapa_segundos Duração das etapas dos reruns (percentis das últimas medições).",
+            "# TYPE ecotech_etapa_segundos summary",
+        ]
+        for (etapa, aba), ordenados, quantidade, total in sorted(itens):
+            rotulos = f'etapa="{_rotulo(etapa)}",aba="{_rotulo(aba)}"'
+            for p in PERCENTIS:
+                linhas.append(f'ecotech_etapa_segundos{{{rotulos},quantile="{p}"}} {percentil(ordenados, p):.6f}')
+            linhas.append(f"ecotech_etapa_segundos_sum{{{rotulos}}} {total:.6f}")
+            linhas.append(f"ecotech_etapa_segundos_count{{{rotulos}}} {quantidade}")
+        linhas += [
+            "# HELP ecotech_eventos_total Contadores de eventos do app.",
+            "# TYPE ecotech_eventos_total counter",
+        ]
+        for (nome, aba), n in sorted(contadores.items()):
+            linhas.append(f'ecotech_eventos_total{{evento="{_rotulo(nome)}",aba="{_rotulo(aba)}"}} {n}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self):
+        """Grava o arquivo do Prometheus e as linhas JSONL pendentes."""
+        try:
+            if self.arquivo_prometheus:
+                temporario = f"{self.arquivo_prometheus}.tmp"
+                with open(temporario, "w", encoding="utf-8") as f:
+                    f.write(self.texto_prometheus())
+                os.replace(temporario, self.arquivo_prometheus)
+            if self.arquivo_jsonl and self._pendentes:
+                registros = []
+                while self._pendentes:
+                    registros.append(self._pendentes.popleft())
+                with open(self.arquivo_jsonl, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+            self.exportacoes += 1
+            self.ultimo_erro = None
+        except OSError as e:
+            self.ultimo_erro = str(e)
+
+    def _loop(self):
+        while not self._parar.wait(self.intervalo):
+            self.exportar()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self.exportar()
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "ativo": self.ativo,
+            "etapas": len(self._duracoes),
+            "prometheus": self.arquivo_prometheus,
+            "jsonl": self.arquivo_jsonl,
+            "exportacoes": self.exportacoes,
+            "ultimo_erro": self.ultimo_erro,
+        }
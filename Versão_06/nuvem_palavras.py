@@ -0,0 +1,138 @@
+"""
+Cache de renderização da nuvem de palavras da aba Opiniões.
+
+As imagens ficam guardadas como bytes PNG/WebP, indexadas por uma impressão
+digital das 100 palavras mais frequentes mais os parâmetros do WordCloud.
+Quando as frequências mudam, um worker em segundo plano gera a nova imagem e,
+enquanto isso, a interface continua mostrando a última imagem pronta; quando
+ela fica pronta, os ouvintes de `ao_renderizar` são avisados para redesenhar.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from wordcloud import WordCloud
+
+PARAMETROS_PADRAO = {
+    "width": 600,
+    "height": 600,
+    "background_color": "white",
+    "colormap": "viridis",
+    "max_words": 100,
+}
+
+
+def top_frequencias(freq, max_words=100):
+    """Top-N em ordem estável (contagem desc., depois palavra)."""
+    return sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:max_words]
+
+
+def impressao_digital(freq, parametros, formato):
+    """Hash estável da tabela top-N + parâmetros de renderização."""
+    top = top_frequencias(freq, parametros.get("max_words", 100))
+    conteudo = json.dumps([top, sorted(parametros.items()), formato], ensure_ascii=False)
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def renderizar_nuvem(top, parametros, formato="PNG"):
+    """Gera a nuvem e devolve a imagem já codificada."""
+    wc = WordCloud(**parametros)
+    wc.generate_from_frequencies(dict(top))
+    imagem = wc.to_image()
+    if imagem.mode != "RGB":
+        imagem = imagem.convert("RGB")
+    buffer = BytesIO()
+    imagem.save(buffer, format=formato)
+    return buffer.getvalue()
+
+
+class CacheNuvem:
+    """
+    LRU de nuvens renderizadas, compartilhado entre sessões.
+
+    `obter()` nunca espera por uma renderização se já existir alguma imagem
+    pronta: devolve a última e agenda a nova no worker.
+    """
+
+    def __init__(self, parametros=None, formato="PNG", max_itens=16, renderizar=renderizar_nuvem):
+        self.parametros = dict(PARAMETROS_PADRAO, **(parametros or {}))
+        self.renderizar = renderizar   # ex.: renderizar_nuvem medido pelas métricas
+        self.formato = formato
+        self.max_itens = max_itens
+        self.acertos = 0
+        self.falhas = 0
+
+        self._imagens = OrderedDict()   # chave -> bytes
+        self._ultima = None             # última imagem pronta
+        self._pendentes = set()
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nuvem")
+        self._ouvintes = []
+
+    def ao_renderizar(self, callback):
+        """Registra `callback(chave)`, chamado quando uma nuvem do worker fica pronta."""
+        self._ouvintes.append(callback)
+
+    def _guardar(self, chave, imagem):
+        with self._lock:
+            self._imagens[chave] = imagem
+            self._imagens.move_to_end(chave)
+            while len(self._imagens) > self.max_itens:
+                self._imagens.popitem(last=False)
+            self._ultima = imagem
+            self._pendentes.discard(chave)
+
+    def _renderizar(self, chave, top):
+        try:
+            self._guardar(chave, self.renderizar(top, self.parametros, self.formato))
+        except Exception:
+            with self._lock:
+                self._pendentes.discard(chave)
+            raise
+        # Quem está vendo a imagem anterior não faz rerun sozinho
+        for callback in list(self._ouvintes):
+            try:
+                callback(chave)
+            except Exception:
+                pass
+
+    def obter(self, freq):
+        """
+        Retorna `(imagem, atualizada)`. `atualizada` é False quando a imagem
+        devolvida é a anterior e a nova ainda está sendo gerada.
+        """
+        if not freq:
+            return None, True
+
+        chave = impressao_digital(freq, self.parametros, self.formato)
+        with self._lock:
+            if chave in self._imagens:
+                self._imagens.move_to_end(chave)
+                self._ultima = self._imagens[chave]
+                self.acertos += 1
+                return self._ultima, True
+
+            self.falhas += 1
+            top = top_frequencias(freq, self.parametros.get("max_words", 100))
+            if self._ultima is not None:
+                if chave not in self._pendentes:
+                    self._pendentes.add(chave)
+                    self._worker.submit(self._renderizar, chave, top)
+                return self._ultima, False
+
+        # Primeira nuvem do processo: não há o que mostrar, então renderiza aqui
+        imagem = self.renderizar(top, self.parametros, self.formato)
+        self._guardar(chave, imagem)
+        return imagem, True
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "imagens_em_cache": len(self._imagens),
+            "renderizando": len(self._pendentes),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+        }
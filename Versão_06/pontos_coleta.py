@@ -0,0 +1,110 @@
+"""
+Base de pontos de coleta de lixo eletrônico (mapa e EcoBot).
+
+Os pontos ficam em `dados/pontos_coleta.csv` (ou numa versão `.parquet`
+do mesmo arquivo), uma linha por ponto:
+
+    nome, endereco, cidade, uf, categorias, latitude, longitude
+
+`categorias` lista as linhas aceitas separadas por "|" (ex.:
+"Linha Verde|Linha Azul"); vazio significa que não foi informado. A carga
+valida e remove duplicados, e usa tipos compactos (float32 nas coordenadas
+e categorical nos campos repetidos) para aguentar a base nacional.
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+ARQUIVO_PADRAO = os.path.join(PASTA_DADOS, "pontos_coleta.csv")
+
+# Versão do formato do arquivo; mude ao alterar as colunas
+VERSAO_ESQUEMA = 1
+COLUNAS_OBRIGATORIAS = ["nome", "latitude", "longitude"]
+COLUNAS_OPCIONAIS = ["endereco", "cidade", "uf", "categorias"]
+TIPOS = {
+    "nome": "string",
+    "endereco": "string",
+    "cidade": "category",
+    "uf": "category",
+    "categorias": "category",
+    "latitude": "float32",
+    "longitude": "float32",
+}
+SEPARADOR_CATEGORIAS = "|"
+
+
+def assinatura_arquivo(caminho=ARQUIVO_PADRAO):
+    """(mtime, tamanho): barato o bastante para conferir a cada rerun."""
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
+
+
+def versao_arquivo(caminho=ARQUIVO_PADRAO):
+    """Hash curto do conteúdo do arquivo (muda a cada edição da base)."""
+    sha = hashlib.sha1(f"v{VERSAO_ESQUEMA}".encode())
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            sha.update(bloco)
+    return sha.hexdigest()[:12]
+
+
+def _ler(caminho):
+    if caminho.endswith(".parquet"):
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho, dtype={c: t for c, t in TIPOS.items() if t != "float32"},
+                       keep_default_na=False, na_values={"latitude": [""], "longitude": [""]})
+
+
+def validar_pontos(df):
+    """
+    Confere colunas, descarta linhas sem nome ou com coordenadas inválidas
+    e remove duplicados (mesmo nome e mesma posição). Retorna
+    `(df_limpo, descartadas)`.
+    """
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes na base de pontos: {faltando}")
+    for coluna in COLUNAS_OPCIONAIS:
+        if coluna not in df.columns:
+            df[coluna] = ""
+
+    total = len(df)
+    df["nome"] = df["nome"].astype("string").str.strip()
+    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+    validas = (
+        df["nome"].fillna("").ne("")
+        & df["latitude"].between(-90, 90)
+        & df["longitude"].between(-180, 180)
+    )
+    df = df[validas]
+
+    chave = pd.DataFrame({
+        "nome": df["nome"].str.lower(),
+        "lat": df["latitude"].round(5),
+        "lon": df["longitude"].round(5),
+    })
+    df = df[~chave.duplicated()]
+    return df, total - len(df)
+
+
+def carregar_pontos(caminho=ARQUIVO_PADRAO):
+    """
+    DataFrame validado com todas as colunas da base. `df.attrs` traz a
+    `versao` do arquivo e quantas linhas foram `descartadas`.
+    """
+    df, descartadas = validar_pontos(_ler(caminho))
+    df = df[COLUNAS_OBRIGATORIAS[:1] + COLUNAS_OPCIONAIS + COLUNAS_OBRIGATORIAS[1:]]
+    df = df.astype(TIPOS).reset_index(drop=True)
+    df.attrs["versao"] = versao_arquivo(caminho)
+    df.attrs["descartadas"] = descartadas
+    return df
+
+
+def categorias_do_ponto(valor):
+    """"Linha Verde|Linha Azul" → ["Linha Verde", "Linha Azul"]."""
+    if not isinstance(valor, str) or not valor:
+        return []
+    return [c.strip() for c in valor.split(SEPARADOR_CATEGORIAS) if c.strip()]
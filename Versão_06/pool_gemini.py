@@ -0,0 +1,271 @@
+"""
+Pool de requisições ao Gemini compartilhado por todas as sessões.
+
+- limite global de chamadas simultâneas (threads do pool);
+- balde de tokens dimensionado para a cota da API;
+- novas tentativas com backoff exponencial e jitter em 429/5xx;
+- prompts idênticos em andamento viram uma única chamada (single-flight),
+  e todos os usuários recebem o mesmo streaming.
+
+Quem está na fila recebe a sua posição em vez de um erro. A função que
+chama o modelo é injetada, então o pool pode ser testado contra um
+servidor falso local.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Códigos HTTP que valem nova tentativa
+CODIGOS_TEMPORARIOS = {408, 429, 500, 502, 503, 504}
+
+
+def _erros_de_rede():
+    """Falhas de rede/transporte das bibliotecas instaladas, sem status HTTP."""
+    erros = [TimeoutError, ConnectionError]
+    try:
+        import requests
+        erros.append(requests.RequestException)
+    except ImportError:
+        pass
+    try:
+        from google.api_core import exceptions as api_core
+        erros += [api_core.ServiceUnavailable, api_core.DeadlineExceeded]
+    except ImportError:
+        pass
+    try:
+        from google.auth.exceptions import TransportError
+        erros.append(TransportError)
+    except ImportError:
+        pass
+    return tuple(erros)
+
+
+ERROS_DE_REDE = _erros_de_rede()
+
+
+def erro_temporario(erro):
+    """
+    429/5xx da API (google.api_core expõe o status em `.code`, o requests em
+    `.response.status_code`) ou falha de rede sem resposta. Um erro com
+    status HTTP decide pelo status; URL inválida (ValueError) nunca é repetida.
+    """
+    codigo = getattr(erro, "code", None)
+    if callable(codigo):
+        codigo = None
+    if codigo is None:
+        codigo = getattr(getattr(erro, "response", None), "status_code", None)
+    if codigo is not None:
+        return codigo in CODIGOS_TEMPORARIOS
+    return isinstance(erro, ERROS_DE_REDE) and not isinstance(erro, ValueError)
+
+
+def gerador_http(url, timeout=60, sessao=None):
+    """
+    `gerar` que envia `contents` por POST a um servidor local compatível
+    (ex.: o Gemini falso dos testes de carga), que responde uma linha JSON
+    `{"text": ...}` por pedaço.
+    """
+    import requests
+    sessao = sessao or requests.Session()
+
+    def gerar(contents):
+        resposta = sessao.post(url, json={"contents": contents}, stream=True, timeout=timeout)
+        resposta.raise_for_status()
+        for linha in resposta.iter_lines(decode_unicode=True):
+            if linha:
+                yield json.loads(linha)["text"]
+    return gerar
+
+
+def chave_prompt(contents):
+    conteudo = json.dumps(contents, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+class BaldeTokens:
+    """Token bucket: `taxa` requisições por segundo, rajadas até `capacidade`."""
+
+    def __init__(self, por_minuto, capacidade=None):
+        self.taxa = por_minuto / 60.0
+        self.capacidade = capacidade or max(1, por_minuto // 6)
+        self._tokens = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Bloqueia até haver um token disponível."""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            time.sleep(espera)
+
+
+class _Voo:
+    """Uma chamada em andamento, lida por um ou mais usuários."""
+
+    def __init__(self, chave):
+        self.chave = chave
+        self.pedacos = []
+        self.resposta = None
+        self.erro = None
+        self.iniciado = False
+        self.terminado = False
+        self.leitores = 1
+        self.cond = threading.Condition()
+
+    def publicar(self, pedaco):
+        with self.cond:
+            self.pedacos.append(pedaco)
+            self.cond.notify_all()
+
+    def encerrar(self, erro=None):
+        with self.cond:
+            self.erro = erro
+            self.terminado = True
+            self.cond.notify_all()
+
+
+class Fluxo:
+    """Iterador de texto entregue a cada sessão; `resposta` é o objeto da API."""
+
+    def __init__(self, pool, voo, compartilhado):
+        self._pool = pool
+        self._voo = voo
+        self.compartilhado = compartilhado
+        self.ao_esperar = None   # callback(posicao) enquanto aguarda na fila
+
+    @property
+    def resposta(self):
+        return self._voo.resposta
+
+    def __iter__(self):
+        voo = self._voo
+        lidos = 0
+        ultima_posicao = None
+        while True:
+            if not voo.iniciado and self.ao_esperar is not None:
+                posicao = self._pool.posicao(voo)
+                if posicao and posicao != ultima_posicao:
+                    self.ao_esperar(posicao)
+                    ultima_posicao = posicao
+            with voo.cond:
+                if lidos >= len(voo.pedacos) and not voo.terminado:
+                    voo.cond.wait(timeout=0.5)
+                novos = voo.pedacos[lidos:]
+                terminado = voo.terminado
+            for pedaco in novos:
+                yield pedaco
+            lidos += len(novos)
+            if terminado and lidos >= len(voo.pedacos):
+                if voo.erro is not None:
+                    raise voo.erro
+                return
+
+
+class PoolGemini:
+    """
+    `gerar(contents)` deve devolver um iterável de pedaços (objetos com
+    `.text` ou strings), como `modelo.generate_content(..., stream=True)`.
+    """
+
+    def __init__(self, gerar, max_concorrencia=4, requisicoes_por_minuto=60,
+                 tentativas=4, backoff_base=1.0, backoff_max=20.0):
+        self.gerar = gerar
+        self.max_concorrencia = max_concorrencia
+        self.tentativas = tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.balde = BaldeTokens(requisicoes_por_minuto)
+
+        self.chamadas = 0
+        self.compartilhadas = 0
+        self.novas_tentativas = 0
+        self.falhas = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix="gemini")
+        self._voos = {}     # chave -> _Voo em andamento
+        self._fila = []     # voos aguardando uma thread livre
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- #
+    def transmitir(self, contents):
+        """Enfileira (ou reaproveita) a chamada e devolve um `Fluxo`."""
+        chave = chave_prompt(contents)
+        with self._lock:
+            voo = self._voos.get(chave)
+            if voo is not None:
+                voo.leitores += 1
+                self.compartilhadas += 1
+                return Fluxo(self, voo, compartilhado=True)
+            voo = _Voo(chave)
+            self._voos[chave] = voo
+            self._fila.append(voo)
+        self._executor.submit(self._executar, voo, contents)
+        return Fluxo(self, voo, compartilhado=False)
+
+    def posicao(self, voo):
+        """Posição (1 = próximo) do voo na fila, ou None se já começou."""
+        with self._lock:
+            try:
+                return self._fila.index(voo) + 1
+            except ValueError:
+                return None
+
+    # ---------------------------------------------------------------- #
+    def _espera_backoff(self, tentativa):
+        teto = min(self.backoff_max, self.backoff_base * (2 ** tentativa))
+        return random.uniform(0, teto)   # "full jitter"
+
+    def _executar(self, voo, contents):
+        with self._lock:
+            self._fila.remove(voo)
+        voo.iniciado = True
+        erro = None
+        try:
+            for tentativa in range(self.tentativas):
+                self.balde.adquirir()
+                with self._lock:
+                    self.chamadas += 1
+                try:
+                    voo.resposta = self.gerar(contents)
+                    for pedaco in voo.resposta:
+                        texto = getattr(pedaco, "text", pedaco)
+                        if texto:
+                            voo.publicar(texto)
+                    break
+                except Exception as e:
+                    # Depois que o texto começou a sair não dá para repetir
+                    if voo.pedacos or not erro_temporario(e) or tentativa == self.tentativas - 1:
+                        raise
+                    with self._lock:
+                        self.novas_tentativas += 1
+                    time.sleep(self._espera_backoff(tentativa))
+        except Exception as e:
+            erro = e
+            with self._lock:
+                self.falhas += 1
+        finally:
+            with self._lock:
+                self._voos.pop(voo.chave, None)
+            voo.encerrar(erro)
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        with self._lock:
+            return {
+                "em_andamento": len(self._voos) - len(self._fila),
+                "na_fila": len(self._fila),
+                "chamadas": self.chamadas,
+                "compartilhadas": self.compartilhadas,
+                "novas_tentativas": self.novas_tentativas,
+                "falhas": self.falhas,
+            }
@@ -1,5 +1,6 @@
 import os
 import time
+import functools
 import logging
 import toml
 import streamlit as st
@@ -7,26 +8,39 @@ import google.generativeai as genai
 import plotly.express as px
 from streamlit_option_menu import option_menu
 import pandas as pd
-import spacy
-from wordcloud import WordCloud
 from collections import Counter
-from streamlit_autorefresh import st_autorefresh
 import folium
 from folium.plugins import MarkerCluster
 from streamlit_folium import st_folium
 from streamlit_extras.switch_page_button import switch_page
-from PIL import Image
 import numpy as np
 
-try:
-    nlp = spacy.load("pt_core_news_sm")
-except OSError:
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "pt_core_news_sm"])
-    nlp = spacy.load("pt_core_news_sm")
-
-# --- Agora você já pode usar o nlp normalmente ---
-doc = nlp("Exemplo de texto em português")
+from recursos_nlp import GerenciadorNLP, MotorTextos
+from filtro_lexico import ARQUIVO_PADRAO as EXCLUSIONS_FILE, instalar_filtro
+from cache_tokens import CacheTokens
+from frequencias_periodo import FrequenciasPorDia, dias_e_textos
+from correcao_ortografica import ARQUIVO_PADRAO as VOCABULARY_FILE, CorretorOrtografico
+from nuvem_palavras import CacheNuvem, renderizar_nuvem
+from dados_planilha import FontePlanilha
+from cache_imagens import CacheImagens, reduzir_largura
+from chat_sessao import montar_contexto, tokens_do_prompt
+from cache_respostas import CacheRespostas, normalizar_pergunta, reproduzir
+from conteudo import CATEGORIAS_LIXO
+from pontos_coleta import ARQUIVO_PADRAO as POINTS_FILE, assinatura_arquivo, carregar_pontos
+from roteador_intencoes import RoteadorIntencoes
+from busca_espacial import IndicePontos
+from agrupamento_mapa import PiramideClusters, area_em_volta
+from geocodificador import Geocodificador
+from cobertura import AnaliseCobertura
+from streaming import RenderizadorStreaming
+from pool_gemini import PoolGemini, gerador_http
+from memoria_chat import MemoriaChat
+from avisos_sessoes import AvisosSessoes
+from metricas import Metricas
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Início do rerun, para o tempo total do script (ver o fim do arquivo)
+RERUN_START = time.perf_counter()
 
 
 # ====================== CONFIGURAÇÕES GERAIS ========================= #
@@ -40,16 +54,52 @@ st.set_page_config(
 # 1. LER OS SEGREDOS DO ST.SECRETS
 SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
 
+
+# Lido do disco só quando o arquivo muda, não a cada rerun
+@st.cache_data(show_spinner=False)
+def read_secrets(caminho, mtime):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return toml.load(f)
+
+
 try:
     # Lê o arquivo TOML local
-    with open(SECRETS_FILE, 'r', encoding='utf-8') as f:
-        config = toml.load(f)
+    secrets_start = time.perf_counter()
+    config = read_secrets(SECRETS_FILE, os.path.getmtime(SECRETS_FILE))
+    SECRETS_SECONDS = time.perf_counter() - secrets_start
 
     # Pega as chaves
     API_KEY = config["gemini_api_key"]
     MODEL_NAME = config["modelo_gemini"]
     SYSTEM_INSTRUCTION = config["system_instruction"]
 
+    # Lotes do spaCy na aba Opiniões (opcionais)
+    NLP_BATCH_SIZE = int(config.get("nlp_batch_size", 256))
+    NLP_N_PROCESS = int(config.get("nlp_n_process", 1))
+
+    # Termos e frases excluídos da nuvem e do gráfico (opcional)
+    NLP_EXCLUSIONS_FILE = config.get("nlp_arquivo_exclusoes", EXCLUSIONS_FILE)
+
+    # Lista de palavras usada na correção de erros de digitação (opcional)
+    NLP_VOCABULARY_FILE = config.get("nlp_arquivo_vocabulario", VOCABULARY_FILE)
+
+    # Orçamento de tokens do histórico enviado ao EcoBot (opcional)
+    CHAT_TOKEN_BUDGET = int(config.get("chat_token_budget", 4000))
+
+    # Limites do pool compartilhado de chamadas ao Gemini (opcionais)
+    GEMINI_MAX_CONCURRENCY = int(config.get("gemini_max_concorrencia", 4))
+    GEMINI_RPM = int(config.get("gemini_requisicoes_por_minuto", 15))
+
+    # Limites do histórico guardado por conversa do EcoBot (opcionais)
+    CHAT_MAX_TURNS = int(config.get("chat_max_turnos", 40))
+    CHAT_MAX_KB = int(config.get("chat_max_kb", 64))
+
+    # Tempos das etapas de cada rerun (opcionais): desligados com metricas = false;
+    # com os caminhos, também gravados para o Prometheus e/ou em JSONL
+    METRICS_ENABLED = bool(config.get("metricas", True))
+    METRICS_PROMETHEUS_FILE = config.get("metricas_prometheus")
+    METRICS_JSONL_FILE = config.get("metricas_jsonl")
+
 except FileNotFoundError:
     st.error(f"Erro: Arquivo de segredos não encontrado em '{SECRETS_FILE}'.")
     st.stop()
@@ -59,6 +109,67 @@ except KeyError as e:
     st.stop()
 
 
+# 🔹 Substitutos locais (usados pelo teste de carga em benchmarks/teste_carga.py)
+# ECOTECH_REMOTE_BASE: prefixo para onde as URLs remotas são redirecionadas
+# ECOTECH_GEMINI_URL: servidor falso que faz o papel do Gemini
+# ECOTECH_CACHE_DIR: pasta dos caches em disco (tokens, miniaturas), para os
+#   testes não misturarem entradas dos substitutos com as do site
+REMOTE_BASE = os.environ.get("ECOTECH_REMOTE_BASE")
+GEMINI_URL = os.environ.get("ECOTECH_GEMINI_URL")
+CACHE_DIR = os.environ.get("ECOTECH_CACHE_DIR")
+
+
+def remote_url(url):
+    """https://host/caminho → {REMOTE_BASE}/host/caminho quando houver substituto."""
+    if not REMOTE_BASE:
+        return url
+    return REMOTE_BASE.rstrip("/") + "/" + url.split("://", 1)[-1]
+
+
+# 🔹 Tempos e contadores das etapas, compartilhados por todas as sessões
+@st.cache_resource
+def get_metrics(ativo, arquivo_prometheus, arquivo_jsonl):
+    return Metricas(ativo=ativo, arquivo_prometheus=arquivo_prometheus, arquivo_jsonl=arquivo_jsonl)
+
+
+# Uma consulta ao cache por rerun; os fragmentos usam a do último rerun completo
+METRICS = get_metrics(METRICS_ENABLED, METRICS_PROMETHEUS_FILE, METRICS_JSONL_FILE)
+
+
+def current_session():
+    ctx = get_script_run_ctx()
+    return ctx.session_id[:8] if ctx is not None else None
+
+
+def in_fragment_rerun():
+    """True quando só um fragmento está sendo reexecutado, não o app inteiro."""
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def measured_fragment(aba):
+    """Mede o fragmento e marca as etapas dele com a aba e a sessão."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medido(*args, **kwargs):
+            with METRICS.rerun(aba, current_session(), nome=f"fragmento_{funcao.__name__}"):
+                return funcao(*args, **kwargs)
+        return medido
+    return decorador
+
+
+def show_metrics(aba):
+    """Percentis das etapas desta aba, para os painéis de depuração."""
+    if not METRICS.ativo:
+        return
+    st.write("##### Tempos das etapas (últimas medições):")
+    resumo = METRICS.resumo(aba)
+    if resumo:
+        st.dataframe(pd.DataFrame(resumo), hide_index=True)
+    st.write(METRICS.contadores(aba))
+    st.write(METRICS.info())
+
+
 # ✅ FUNÇÃO CORRETA — sem Client(), que não existe
 @st.cache_resource
 def get_gemini_model():
@@ -86,19 +197,175 @@ def get_gemini_model():
 modelo = get_gemini_model()
 
 
+# 🔹 Todas as sessões passam pelo mesmo pool: limite de concorrência,
+#    limite de taxa, novas tentativas e junção de prompts idênticos
+@st.cache_resource
+def get_gemini_pool():
+    if GEMINI_URL:
+        gerar = gerador_http(GEMINI_URL)
+    else:
+        gerar = lambda contents: modelo.generate_content(contents, stream=True)
+    return PoolGemini(
+        gerar,
+        max_concorrencia=GEMINI_MAX_CONCURRENCY,
+        requisicoes_por_minuto=GEMINI_RPM,
+    )
+
+
+# 🔹 Históricos do EcoBot de todas as sessões, com limite e expiração no servidor
+@st.cache_resource
+def get_chat_memory(ocioso_s):
+    return MemoriaChat(ocioso_s=ocioso_s, max_turnos=CHAT_MAX_TURNS, max_bytes=CHAT_MAX_KB * 1024)
+
+
+# 🔹 spaCy compartilhado por todas as sessões (carregado só quando alguma aba precisar)
+@st.cache_resource
+def get_nlp_manager():
+    return GerenciadorNLP()
+
+
+# 🔹 Pontos de coleta (mapa e EcoBot): carregados uma vez por versão do arquivo
+#    e compartilhados entre sessões (sem cópia por rerun)
+@st.cache_resource(max_entries=2)
+def _load_collection_points(caminho, assinatura):
+    return carregar_pontos(caminho)
+
+
+def load_collection_points():
+    return _load_collection_points(POINTS_FILE, assinatura_arquivo(POINTS_FILE))
+
+
+# 🔹 Índice espacial dos pontos (um por versão da base)
+@st.cache_resource(max_entries=2)
+def _get_points_index(versao_pontos):
+    return IndicePontos(load_collection_points())
+
+
+def get_points_index():
+    return _get_points_index(load_collection_points().attrs["versao"])
+
+
+# 🔹 Pirâmide de agrupamentos do mapa (uma por versão da base)
+@st.cache_resource(max_entries=2)
+def _get_map_pyramid(versao_pontos):
+    return PiramideClusters(load_collection_points())
+
+
+def get_map_pyramid():
+    return _get_map_pyramid(load_collection_points().attrs["versao"])
+
+
+# 🔹 Distância até o ponto mais próximo numa grade (uma por versão da base e resolução)
+@st.cache_resource(max_entries=4)
+def _get_coverage(versao_pontos, resolucao_m):
+    return AnaliseCobertura(load_collection_points(), resolucao_m=resolucao_m)
+
+
+def get_coverage(resolucao_m):
+    return _get_coverage(load_collection_points().attrs["versao"], resolucao_m)
+
+
+# 🔹 Geocodificador local de CEP e bairro (sem rede)
+@st.cache_resource
+def get_geocoder():
+    return Geocodificador()
+
+
+# 🔹 Perguntas sobre pontos de coleta e categorias respondidas sem o Gemini
+@st.cache_resource(max_entries=2)
+def _get_intent_router(versao_pontos):
+    return RoteadorIntencoes(load_collection_points(), CATEGORIAS_LIXO)
+
+
+def get_intent_router():
+    return _get_intent_router(load_collection_points().attrs["versao"])
+
+
+# 🔹 Respostas do EcoBot por pergunta normalizada, compartilhadas entre sessões
+@st.cache_resource
+def get_response_cache():
+    return CacheRespostas(max_itens=256, ttl=6 * 3600)
+
+
+# 🔹 Tokens por resposta, persistidos em disco e compartilhados entre sessões;
+#    só o modelo atual (e o anterior, durante a troca) fica em memória
+@st.cache_resource(max_entries=2)
+def get_token_cache(modelo_spacy, _processar):
+    if CACHE_DIR:
+        return CacheTokens(_processar, modelo=modelo_spacy, caminho=os.path.join(CACHE_DIR, "tokens_opinioes.sqlite"))
+    return CacheTokens(_processar, modelo=modelo_spacy)
+
+
+# 🔹 Correção de lemas com erro de digitação (índice de deleções do dicionário)
+@st.cache_resource
+def get_spell_corrector(caminho, excluir):
+    return CorretorOrtografico.de_arquivo(caminho, excluir=excluir)
+
+
+# 🔹 Frequências por dia das opiniões (gráfico e filtros de período); refeitas
+#    quando o dicionário ou as correções mudam (`versao` do corretor)
+@st.cache_resource(max_entries=2)
+def get_daily_frequencies(modelo_spacy, versao_dicionario):
+    return FrequenciasPorDia(k=15)
+
+
+# 🔹 Nuvens de palavras já renderizadas (PNG), reaproveitadas entre reruns
+@st.cache_resource
+def get_wordcloud_cache():
+    cache = CacheNuvem(renderizar=METRICS.cronometrar("nuvem", renderizar_nuvem, aba="Opiniões"))
+    # Nuvem nova pronta em segundo plano: redesenha a aba de quem está nela
+    cache.ao_renderizar(get_opinion_notifier().avisar)
+    return cache
+
+
+# 🔹 Revisão das opiniões, incrementada quando a planilha muda ou uma nuvem
+#    nova fica pronta; cada sessão compara com a que desenhou
+@st.cache_resource
+def get_opinion_notifier():
+    return AvisosSessoes()
+
+
+# 🔹 Planilha de opiniões: uma thread por processo, sempre com o último dado bom
+@st.cache_resource
+def get_sheet_source(csv_url):
+    fonte = FontePlanilha(csv_url, intervalo=30)
+    fonte.ao_mudar(get_opinion_notifier().avisar)
+    return fonte
+
+
+# 🔹 Miniaturas WebP da galeria, servidas pelo Streamlit em app/static/miniaturas
+THUMB_WIDTHS = (240, 480, 960)
+THUMB_DIR = (os.path.join(CACHE_DIR, "miniaturas") if CACHE_DIR
+             else os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "miniaturas"))
+
+
+@st.cache_resource
+def get_thumbnail_cache():
+    return CacheImagens(pasta=THUMB_DIR, max_idade=None)
+
+
+@st.cache_data(show_spinner=False)
+def thumbnail_srcset(img_url):
+    variantes = {f"w{w}": reduzir_largura(w) for w in THUMB_WIDTHS}
+    arquivos = get_thumbnail_cache().arquivos(remote_url(img_url), variantes, formato="WEBP")
+    return [(f"app/static/miniaturas/{arquivos[f'w{w}']}", w) for w in THUMB_WIDTHS]
+
+
 # ==================================================================== #
 # ======================== MENU LATERAL ============================== #
+MENU_OPTIONS = ["Informações", "Sobre e Entrevistas", "Opiniões", "Pontos de Coleta", "ChatBot"]
+
 with st.sidebar:
     selected = option_menu(
         menu_title=None,
-        options=["Informações", "Sobre e Entrevistas", "Opiniões", "Pontos de Coleta", "ChatBot"],
+        options=MENU_OPTIONS,
         icons=["none","none","none","none", "none"],
         default_index=0,
     )
 
 # ==================================================================== #
 # ======================= ABA INFORMAÇÕES ============================ #
-if selected == "Informações":
+def page_info():
     st.markdown("""
             <style>
             .divider-red {
@@ -142,13 +409,7 @@ if selected == "Informações":
     st.markdown(
         "### Tipos de Lixo Eletrônico:\n"
         "O lixo eletrônico é classificado em quatro (4) categorias diferentes:\n\n"
-        "- **Linha Verde:** Incluindo dispositivos como computadores, laptops, celulares, tablets etc. "
-        "Eles contêm metais preciosos e componentes que necessitam um cuidado especial para evitar impactos ambientais.\n"
-        "- **Linha Branca:** Eletrodomésticos de grande porte, como geladeiras, freezers, máquinas de lavar e micro-ondas. "
-        "Esses itens têm componentes recicláveis e precisam ser tratados adequadamente para promover a reciclagem eficiente.\n"
-        "- **Linha Marrom:** Refere-se a equipamentos de áudio e vídeo, incluindo televisores, rádios, câmeras e aparelhos de som. "
-        "Muitos desses dispositivos contêm substâncias tóxicas que requerem tratamento específico para evitar o impacto ambiental.\n"
-        "- **Linha Azul:** Eletrodomésticos de uso geral, como ferramentas elétricas e eletrônicas, brinquedos, dispositivos médicos e de monitoramento."
+        + "\n".join(f"- **{nome}:** {descricao}" for nome, descricao, _ in CATEGORIAS_LIXO)
     )
 
     # Imagem 1
@@ -229,7 +490,7 @@ if selected == "Informações":
 
 # ==================================================================== #
 # =========================== ABA SOBRE ============================== #
-elif selected == "Sobre e Entrevistas":
+def page_about():
     st.markdown("""
     <style>
     .divider-red {
@@ -386,14 +647,25 @@ elif selected == "Sobre e Entrevistas":
         ]
     ]
 
+    # Mesmas quebras do CSS acima: 5 colunas, 3 em telas médias, 1 no celular
+    tamanhos = "(max-width: 768px) 100vw, (max-width: 1200px) 33vw, 20vw"
+
     # Criando colunas
     cols = st.columns(5)
     for i, col in enumerate(cols):
         for img_url, caption in colunas_imagens[i]:
+            try:
+                variantes = thumbnail_srcset(img_url)
+                srcset = ", ".join(f"{src} {w}w" for src, w in variantes)
+                img_tag = (f'<img src="{variantes[1][0]}" srcset="{srcset}" sizes="{tamanhos}" '
+                           f'loading="lazy" decoding="async" class="fixed-img" alt="{caption}">')
+            except Exception:
+                # Sem miniatura (ex.: postimg fora do ar): usa a imagem remota mesmo
+                img_tag = f'<img src="{img_url}" loading="lazy" class="fixed-img" alt="{caption}">'
             with col:
                 st.markdown(f"""
                 <div>
-                    <img src="{img_url}" class="fixed-img">
+                    <a href="{img_url}" target="_blank" rel="noopener">{img_tag}</a>
                     <p class="caption">{caption}</p>
                 </div>
                 """, unsafe_allow_html=True)
@@ -401,7 +673,7 @@ elif selected == "Sobre e Entrevistas":
 
 # ==================================================================== #
 # =========================== ABA OPINIÕES =========================== #
-elif selected == "Opiniões":
+def page_opinions():
     st.markdown("""
             <style>
             .divider-red {
@@ -442,103 +714,118 @@ elif selected == "Opiniões":
         """, unsafe_allow_html=True
     )
 
-    st_autorefresh(interval=5120000, key="data_refresh")
-
     # ================================
     # 🔹 CARREGAMENTO DO SPACY
     # ================================
-    @st.cache_resource
-    def load_spacy_pt():
-        try: return spacy.load("pt_core_news_sm"), "pt_core_news_sm"
-        except: 
-            try: return spacy.load("pt_core_news_md"), "pt_core_news_md"
-            except: 
-                try: return spacy.load("pt_core_news_lg"), "pt_core_news_lg"
-                except: 
-                    from spacy.lang.pt import Portuguese
-                    nlp_blank = Portuguese()
-                    if "sentencizer" not in nlp_blank.pipe_names:
-                        nlp_blank.add_pipe("sentencizer")
-                    return nlp_blank, "blank_pt"
-
-    nlp, MODEL_SPACY = load_spacy_pt()
-    st.info(f"Modelo spaCy carregado: **{MODEL_SPACY}**")
+    nlp_manager = get_nlp_manager()
+    with METRICS.etapa("spacy"):
+        nlp_manager.obter()
+    st.info(f"Modelo spaCy carregado: **{nlp_manager.nome_modelo}**")
+
+    opinions_board(nlp_manager)
+    opinions_watcher()
+
+
+# 🔹 Períodos do gráfico de frequência (None = todas as respostas)
+PERIODOS_FREQUENCIA = {"Tudo": None, "Últimos 30 dias": 30, "Últimos 7 dias": 7}
+
+
+# 🔹 Vigia das opiniões: um fragmento vazio que, a cada OPINIONS_CHECK_SECONDS,
+#    só compara a revisão desenhada com a atual. O quadro (imagem e gráfico)
+#    só é redesenhado quando a planilha ou a nuvem mudaram de verdade.
+OPINIONS_CHECK_SECONDS = 5
+
+
+@st.fragment(run_every=OPINIONS_CHECK_SECONDS)
+def opinions_watcher():
+    get_opinion_notifier().verificar()
+
+
+# 🔹 Dados, nuvem e gráfico das opiniões
+@st.fragment
+@measured_fragment("Opiniões")
+def opinions_board(nlp_manager):
+    nlp = nlp_manager.obter()
+    # Filtro de exclusões no fim do pipeline; a assinatura entra na chave dos
+    # caches de tokens, então mudar o arquivo reprocessa as respostas
+    lexical_filter = instalar_filtro(nlp, NLP_EXCLUSIONS_FILE)
+    MODEL_SPACY = f"{nlp_manager.nome_modelo}+{lexical_filter.assinatura}"
 
     # ================================
     # 🔹 CARREGAR DADOS
     # ================================
-    @st.cache_data(ttl=30)
-    def load_data(csv_url):
-        df = pd.read_csv(csv_url)
-        if len(df.columns) > 1:
-            original = df.columns[1]
-            df.rename(columns={original: "percepcao"}, inplace=True)
-        return df
-
     csv_url = "https://docs.google.com/spreadsheets/d/1dsAaDSCpLYts8Y9P6Jbd62yLaHTjvUN_B3H8XBH-JbQ/export?format=csv&id=1dsAaDSCpLYts8Y9P6Jbd62yLaHTjvUN_B3H8XBH-JbQ&gid=1585034273"
 
-    try: data = load_data(csv_url)
+    sheet_source = get_sheet_source(remote_url(csv_url))
+    try:
+        with METRICS.etapa("planilha"):
+            data, data_version = sheet_source.obter()
     except Exception as e:
+        METRICS.contar("planilha_erro")
         st.error(f"Erro ao carregar dados: {e}")
         st.stop()
 
+    # Revisão lida antes de desenhar: um aviso depois daqui faz o vigia pedir o rerun
+    opinion_notifier = get_opinion_notifier()
+    opinion_notifier.marcar_exibida(opinion_notifier.revisao)
+
+    if sheet_source.ultimo_erro is not None:
+        METRICS.contar("planilha_desatualizada")
+        st.warning("Não foi possível atualizar a planilha agora; exibindo os últimos dados carregados.")
+
     # ================================
     # 🔹 PROCESSAMENTO DE TEXTO
     # ================================
-    def process_texts(texts):
-        doc = nlp(" ".join(texts))
-        tokens_list = []
-        for token in doc:
-            if not token.is_alpha: continue
-            if getattr(token, "is_stop", False): continue
-            lemma = token.lemma_.lower() if hasattr(token, "lemma_") else token.text.lower()
-            if hasattr(token, "pos_") and token.pos_:
-                if token.pos_ in ("VERB", "NOUN", "PROPN", "ADJ"):
-                    tokens_list.append(lemma)
-            else:
-                if len(lemma) > 2: tokens_list.append(lemma)
-        return tokens_list
-
-    exclude_words = [
-        "ruim", "radiação", "cabos", "Poluição", "Acúmulo", "contaminavel",
-        "Perigo", "sujeira", "Sistentabily", "Reversão", "Utópico",
-        "Se o mundo comessase q descartar corretamente, o meio ambiente vai ter a oportunidade de se regenerar"
-    ]
+    # Um Doc por resposta via nlp.pipe, sem parser/NER
+    motor = MotorTextos(nlp, batch_size=NLP_BATCH_SIZE, n_process=NLP_N_PROCESS)
+    process_texts = METRICS.cronometrar("process_texts", motor.processar)
 
-    tokens = []
+    freq = Counter()
     wordcloud_image = None
+    wordcloud_atualizada = True
+    wordcloud_cache = get_wordcloud_cache()
+    token_cache = get_token_cache(MODEL_SPACY, process_texts)
+    spell_corrector = get_spell_corrector(NLP_VOCABULARY_FILE, lexical_filter.palavras)
 
     if "percepcao" in data.columns and not data["percepcao"].dropna().empty:
-        texts = data["percepcao"].dropna().tolist()
-        tokens = process_texts(texts)
-        tokens = [t for t in tokens if t not in exclude_words]
-
-        if tokens:
+        texts = data["percepcao"].dropna().astype(str).tolist()
+        # Só respostas novas ou editadas passam pelo spaCy; depois as variantes
+        # com erro de digitação são somadas na forma correta
+        with METRICS.etapa("frequencias"):
+            freq = spell_corrector.normalizar(
+                Counter(token_cache.atualizar(texts, data_version)), data_version, origem=MODEL_SPACY
+            )
+
+        if freq:
             # ================================
             # 🔹 WORDCLOUD
             # ================================
-            freq = Counter(tokens)
-            wc = WordCloud(width=600, height=600, background_color="white",
-                           colormap="viridis", max_words=100)
-            wc.generate_from_frequencies(freq)
-            wordcloud_image = wc.to_array()
+            # Mesmas frequências → mesma imagem do cache; se mudaram, a nova
+            # é gerada em segundo plano e a anterior continua na tela
+            wordcloud_image, wordcloud_atualizada = wordcloud_cache.obter(freq)
+
+    # Contagens por dia ajustadas só pelas respostas que mudaram
+    daily_freq = get_daily_frequencies(MODEL_SPACY, spell_corrector.versao)
+    if freq:
+        with METRICS.etapa("frequencias_dia"):
+            daily_freq.atualizar(
+                dias_e_textos(data),
+                lambda texto: spell_corrector.corrigir_tokens(token_cache.tokens(texto)),
+                data_version,
+            )
 
     # ================================
     # 🔹 EXIBIÇÃO LADO A LADO
     # ================================
-    import requests
-    from io import BytesIO
-
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("<div class='centered'>", unsafe_allow_html=True)
         st.markdown("###### :bust_in_silhouette: Opiniões — E-lixo")
-        if wordcloud_image is not None and isinstance(wordcloud_image, np.ndarray):
-            img_wc = Image.fromarray(wordcloud_image)
-            if img_wc.mode != "RGB":
-                img_wc = img_wc.convert("RGB")
-            st.image(img_wc, use_column_width=True)
+        if wordcloud_image is not None:
+            st.image(wordcloud_image, use_column_width=True)
+            if not wordcloud_atualizada:
+                st.caption("Atualizando a nuvem com as respostas novas...")
         else:
             st.write("Sem nuvem de palavras disponível.")
         st.markdown("</div>", unsafe_allow_html=True)
@@ -546,22 +833,25 @@ elif selected == "Opiniões":
     with col2:
         st.markdown("<div class='centered'>", unsafe_allow_html=True)
         st.markdown("###### :bust_in_silhouette: Gráfico de Frequência")
-        try:
-            url_grafico = "https://i.postimg.cc/xT7t7szV/Grafico-Nuvem-de-Palavras.png"
-            response = requests.get(url_grafico)
-            response.raise_for_status()
-            grafico_img = Image.open(BytesIO(response.content))
-            if grafico_img.mode != "RGB":
-                grafico_img = grafico_img.convert("RGB")
-            
-            # Redimensiona a imagem: largura mantém a coluna, altura aumenta 20%
-            largura, altura = grafico_img.size
-            nova_altura = int(altura * 1.2)  # aumenta 20% verticalmente
-            grafico_img = grafico_img.resize((largura, nova_altura))
-            
-            st.image(grafico_img, use_column_width=True)  # mantém largura automática
-        except Exception as e:
-            st.write(f"Não foi possível carregar a imagem: {e}")
+        periodo = st.radio(
+            "Período", list(PERIODOS_FREQUENCIA), horizontal=True,
+            key="periodo_frequencias", label_visibility="collapsed",
+        )
+        with METRICS.etapa("grafico"):
+            top_termos = daily_freq.top(PERIODOS_FREQUENCIA[periodo]) if freq else []
+            if top_termos:
+                grafico = px.bar(
+                    pd.DataFrame(top_termos, columns=["termo", "frequência"]),
+                    x="frequência", y="termo", orientation="h",
+                    color_discrete_sequence=["#2e8b57"],
+                )
+                grafico.update_layout(
+                    yaxis={"categoryorder": "total ascending", "title": None},
+                    height=480, margin={"l": 0, "r": 10, "t": 10, "b": 0},
+                )
+                st.plotly_chart(grafico, use_container_width=True)
+            else:
+                st.write("Sem respostas nesse período.")
         st.markdown("</div>", unsafe_allow_html=True)
 
     # ================================
@@ -571,16 +861,28 @@ elif selected == "Opiniões":
     with st.expander("Informações de Depuração"):
         st.write("##### Colunas do DataFrame:")
         st.write(data.columns.tolist())
+        st.write(sheet_source.info())
+        st.write(get_opinion_notifier().info())
         st.write("##### Primeiras 5 linhas:")
         st.dataframe(data.head())
-        if tokens:
-            st.write(f"Tokens extraídos: {len(tokens)}")
-            st.write(tokens[:15])
+        if freq:
+            st.write(f"Tokens extraídos: {sum(freq.values())}")
+            st.write(freq.most_common(15))
+            st.write(token_cache.info())
+            st.write(wordcloud_cache.info())
+            st.write(daily_freq.info())
+            st.write("##### Correção de digitação:")
+            st.write(spell_corrector.info())
+            st.write("##### Filtro de exclusões:")
+            st.write(lexical_filter.info())
         else:
             st.write("Nenhum token extraído.")
+        st.write("##### Modelo spaCy:")
+        st.write(nlp_manager.info())
+        show_metrics("Opiniões")
 # =================================================================== #
 # ======================== Pontos de Coleta ========================= #
-elif selected == "Pontos de Coleta":
+def page_collection_points():
     st.markdown("""
             <style>
             .divider-red {
@@ -613,152 +915,168 @@ elif selected == "Pontos de Coleta":
     Você pode ampliar, arrastar e visualizar todos os locais cadastrados.
     """)
 
-    # 🔹 Exemplo com alguns pontos reais — substitua/adicione conforme precisar
-    data = {
-        "nome": [
-                "SENAI",
-                "Droga Raia 1",
-                "KLR Comercial",
-                "Sam'S Club - Santo Amaro",
-                "C&A - Shopping Boavista",
-                "RAIA / DROGASIL - Vila Cruzeiro",
-                "Raia - Jardim Santo Amaro",
-                "RAIA / DROGASIL - Santo Amaro",
-                "Assaí Atacadista",
-                "Parque Burle Marx",
-                "Pão De Açúcar - Vila Sofia",
-                "RAIA / DROGASIL - Chácara Santo Antônio (Zona Sul)",
-                "Senac Santo Amaro",
-                "Raia - Santo Amaro",
-                "Carrefour - Spp - Pinheiros",
-                "Carrefour - Spg - Giovani Gronchi",
-                "Pão De Açúcar - Panamby",
-                "Raia - Chácara Santo Antônio (Zona Sul)",
-                "Droga Raia 2",
-                "Droga Raia 3",
-                "Raia - Vila Andrade",
-                "Raia - Santo Amaro",
-                "Atacadão Santo Amaro",
-                "C&A Shopping Jardim Sul",
-                "Pão De Açúcar - Borba Gato",
-                "Vivo- Shopping SP Market",
-                "Droga Raia 4",
-                "Droga Raia 5",
-                "RAIA / DROGASIL - 1",
-                "RAIA / DROGASIL - 2",
-                "C&A - Shopping Morumbi",
-                "Droga Raia 6",
-                "Assaí - Nações Unidas",
-                "Assaí - Interlagos",
-                "Raia - Jardim Londrina",
-                "RAIA / DROGASIL - Jardim das Acácias",
-                "Raia - Jardim Petrópolis",
-                "Droga Raia 7"
-
-                                                            
-        ],
-        "latitude": [
-                -23.652254,
-                -23.651935,
-                -23.678624,
-                -23.660990,
-                -23.654716,
-                -23.638702,
-                -23.649145,
-                -23.644094,
-                -23.647029,
-                -23.633298,
-                -23.655671,
-                -23.631401,
-                -23.670898,
-                -23.653114,
-                -23.629325,
-                -23.641981,
-                -23.633971,
-                -23.636550,
-                -23.633270,
-                -23.627236,
-                -23.633477,
-                -23.629175,
-                -23.668748,
-                -23.631175,
-                -23.630455,
-                -23.679594,
-                -23.677809,
-                -23.630984,
-                -23.662978,
-                -23.622684,
-                -23.622772,
-                -23.623087,
-                -23.677859,
-                -23.662512,
-                -23.625727,
-                -23.622064,
-                -23.633093,
-                -23.617437
-
-
-
-
-        ],
-        "longitude": [
-                -46.712653,
-                -46.707097,
-                -46.698675,
-                -46.709342,
-                -46.700985,
-                -46.711948,
-                -46.698876,
-                -46.701105,
-                -46.729072,
-                -46.722187,
-                -46.691897,
-                -46.710498,
-                -46.699282,
-                -46.689223,
-                -46.711517,
-                -46.734659,
-                -46.728947,
-                -46.693645,
-                -46.730673,
-                -46.716777,
-                -46.735245,
-                -46.695190,
-                -46.736683,
-                -46.735928,
-                -46.690856,
-                -46.699739,
-                -46.698803,
-                -46.735952,
-                -46.681876,
-                -46.698564,
-                -46.698878,
-                -46.698878,
-                -46.695300,
-                -46.680043,
-                -46.736358,
-                -46.699050,
-                -46.679999,
-                -46.705690
-
-        ]
-    }
-
-    df = pd.DataFrame(data)
+    with METRICS.etapa("pontos"):
+        df = load_collection_points()
 
     # 🔹 Mostra o DataFrame na tela (opcional)
     with st.expander("📄 Ver tabela de pontos"):
         st.dataframe(df)
 
-    # 🔹 Mapa com st.map()
-    st.map(df, latitude="latitude", longitude="longitude", size=120, color="#32CD32")
+    # 🔹 Busca por CEP ou bairro: centraliza o mapa e a busca de pontos próximos
+    st.session_state.setdefault("lat_busca", float(df["latitude"].mean()))
+    st.session_state.setdefault("lon_busca", float(df["longitude"].mean()))
+    busca_local = st.text_input("🔎 CEP ou bairro", placeholder="Ex.: 04753-010 ou Santo Amaro")
+    sugestoes = get_geocoder().sugerir(busca_local) if busca_local.strip() else []
+    if busca_local.strip() and not sugestoes:
+        st.warning("Nenhuma localidade encontrada para esse CEP ou bairro.")
+    if sugestoes:
+        por_rotulo = {l["rotulo"]: l for l in sugestoes}
+        local = por_rotulo[st.selectbox("Localidade", list(por_rotulo))]
+        if st.session_state.get("local_escolhido") != local["rotulo"]:
+            st.session_state.local_escolhido = local["rotulo"]
+            st.session_state.lat_busca = local["latitude"]
+            st.session_state.lon_busca = local["longitude"]
+            st.session_state.centro_mapa = (local["latitude"], local["longitude"])
+            st.session_state.vista_mapa = (area_em_volta(local["latitude"], local["longitude"], 14), 14)
+        st.caption(f"Posição aproximada ({local['precisao']}).")
+
+    # 🔹 Mapa: arrastar, ampliar ou trocar o modo reexecuta só o mapa
+    points_map(df)
 
     st.success(f"Total de pontos de coleta exibidos: {len(df)}")
+    if df.attrs.get("descartadas"):
+        st.caption(f"{df.attrs['descartadas']} linha(s) inválida(s) ou duplicada(s) ignorada(s) na base.")
+
+    # 🔹 Pontos mais próximos de uma coordenada
+    st.markdown("#### 📍 Pontos mais próximos de você")
+    col_lat, col_lon, col_k, col_cat = st.columns(4)
+    with col_lat:
+        lat_busca = st.number_input("Latitude", key="lat_busca", format="%.6f")
+    with col_lon:
+        lon_busca = st.number_input("Longitude", key="lon_busca", format="%.6f")
+    with col_k:
+        k_busca = st.number_input("Quantos pontos", min_value=1, max_value=50, value=5)
+    with col_cat:
+        categoria_busca = st.selectbox(
+            "Categoria", ["Todas"] + [nome for nome, _, _ in CATEGORIAS_LIXO]
+        )
+
+    proximos = get_points_index().vizinhos(
+        lat_busca, lon_busca, k=int(k_busca),
+        categoria=None if categoria_busca == "Todas" else categoria_busca,
+    )
+    st.dataframe(
+        proximos[["nome", "endereco", "cidade", "categorias", "distancia_km"]].round({"distancia_km": 2}),
+        hide_index=True,
+    )
+
+    with st.expander("Informações de Depuração"):
+        st.write(get_map_pyramid().info())
+        st.write(get_geocoder().info())
+        if st.session_state.get("modo_mapa") == "Cobertura":
+            st.write(get_coverage(st.session_state.resolucao_cobertura).info())
+        show_metrics("Pontos de Coleta")
+
+
+# 🔹 Mapa: agrupado no servidor (só o que está na tela), com todos os pontos
+#    ou de cobertura
+@st.fragment
+@measured_fragment("Pontos de Coleta")
+def points_map(df):
+    modo_mapa = st.radio(
+        "Modo do mapa", ["Agrupado", "Todos os pontos", "Cobertura"], horizontal=True, key="modo_mapa",
+        help="No modo agrupado só os grupos e pontos da área visível são enviados ao navegador. "
+             "Cobertura mostra a distância de cada área até o ponto de coleta mais próximo.",
+    )
+    if modo_mapa == "Todos os pontos":
+        st.map(df, latitude="latitude", longitude="longitude", size=120, color="#32CD32")
+    elif modo_mapa == "Cobertura":
+        col_res, col_max = st.columns(2)
+        with col_res:
+            resolucao = st.select_slider("Resolução da grade (m)", [25, 50, 100, 200, 500], value=100,
+                                         key="resolucao_cobertura")
+        with col_max:
+            distancia_max = st.slider("Distância em vermelho (km)", 1.0, 20.0, 3.0, step=0.5)
+        with st.spinner("Calculando a cobertura..."):
+            analise = get_coverage(resolucao)
+
+        sul, oeste, norte, leste = analise.regiao
+        piramide = get_map_pyramid()
+        mapa = folium.Map(location=[(sul + norte) / 2, (oeste + leste) / 2], zoom_start=piramide.zoom_inicial())
+        folium.raster_layers.ImageOverlay(
+            image=analise.imagem_png(distancia_max_km=distancia_max),
+            bounds=[[sul, oeste], [norte, leste]], name="Distância ao ponto mais próximo",
+        ).add_to(mapa)
+        lat_vazio, lon_vazio, dist_vazio = analise.mais_distante()
+        folium.Marker([lat_vazio, lon_vazio], tooltip=f"Maior vazio: {dist_vazio:.1f} km",
+                      icon=folium.Icon(color="red", icon="info-sign")).add_to(mapa)
+        for item in piramide.visiveis(*piramide.vista_inicial(), piramide.zoom_inicial()).itertuples(index=False):
+            folium.CircleMarker([item.latitude, item.longitude], radius=4, color="#1E5631",
+                                fill=True, fill_opacity=1, tooltip=item.nome).add_to(mapa)
+        st_folium(mapa, key="mapa_cobertura", returned_objects=[], height=500, use_container_width=True)
+
+        st.caption(f"🟢 perto → 🟡 → 🔴 a {distancia_max:g} km ou mais do ponto mais próximo. "
+                   f"Grade de {analise.linhas} x {analise.colunas} células de {analise.resolucao_m:g} m.")
+        col_1, col_2, col_3 = st.columns(3)
+        col_1.metric("Área a mais de 1 km", f"{analise.fracao_acima(1):.0%}")
+        col_2.metric(f"Área a mais de {distancia_max:g} km", f"{analise.fracao_acima(distancia_max):.0%}")
+        col_3.metric("Maior distância", f"{dist_vazio:.1f} km")
+    else:
+        piramide = get_map_pyramid()
+        # Última vista (área e zoom) devolvida pelo st_folium nesta sessão
+        area, zoom_atual = st.session_state.get("vista_mapa") or (piramide.vista_inicial(), piramide.zoom_inicial())
+
+        visiveis = piramide.visiveis(*area, zoom_atual)
+        camada = folium.FeatureGroup(name="Pontos de coleta")
+        for item in visiveis.itertuples(index=False):
+            if item.quantidade == 1:
+                folium.CircleMarker(
+                    [item.latitude, item.longitude], radius=7, color="#228B22",
+                    fill=True, fill_color="#32CD32", fill_opacity=0.9,
+                    tooltip=item.nome,
+                    popup=folium.Popup(f"<b>{item.nome}</b><br>{item.endereco or ''}", max_width=250),
+                ).add_to(camada)
+            else:
+                tamanho = 28 + min(int(np.log10(item.quantidade) * 8), 24)
+                folium.Marker(
+                    [item.latitude, item.longitude],
+                    tooltip=f"{item.quantidade} pontos",
+                    icon=folium.DivIcon(
+                        icon_size=(tamanho, tamanho),
+                        icon_anchor=(tamanho // 2, tamanho // 2),
+                        html=(f'<div style="width:{tamanho}px;height:{tamanho}px;line-height:{tamanho}px;'
+                              f'border-radius:50%;background:rgba(50,205,50,0.8);color:white;'
+                              f'text-align:center;font-weight:bold;">{item.quantidade}</div>'),
+                    ),
+                ).add_to(camada)
+
+        sul, oeste, norte, leste = piramide.vista_inicial()
+        mapa = folium.Map(location=[(sul + norte) / 2, (oeste + leste) / 2],
+                          zoom_start=piramide.zoom_inicial())
+        centro = st.session_state.get("centro_mapa")
+        saida = st_folium(mapa, key="mapa_pontos", feature_group_to_add=camada,
+                          center=centro, zoom=14 if centro else None,
+                          returned_objects=["bounds", "zoom"], height=500, use_container_width=True)
+        limites = (saida or {}).get("bounds") or {}
+        # Num rerun do app inteiro (ex.: CEP escolhido) a vista foi definida pelo
+        # código e o mapa ainda devolve os limites antigos: não há o que acompanhar
+        if (in_fragment_rerun() and limites.get("_southWest")
+                and limites["_southWest"].get("lat") is not None):
+            nova_vista = ((limites["_southWest"]["lat"], limites["_southWest"]["lng"],
+                           limites["_northEast"]["lat"], limites["_northEast"]["lng"]),
+                          saida.get("zoom") or zoom_atual)
+            # O mapa foi arrastado ou ampliado: refaz só a camada de marcadores
+            if nova_vista != (tuple(area), zoom_atual):
+                st.session_state.vista_mapa = nova_vista
+                st.rerun(scope="fragment")
+        if visiveis.attrs["truncado"]:
+            st.caption("Muitos pontos nesta área: aproxime o mapa para ver todos.")
+
 
 # ==================================================================== #
 # =========================== ABA CHATBOT ============================ #
 
-elif selected == "ChatBot":
+def page_chatbot():
     chatbot_name = "EcoBot"
     st.markdown("""
             <style>
@@ -787,36 +1105,48 @@ elif selected == "ChatBot":
     
     st.markdown("Fale com nosso assistente virtual especializado **apenas sobre descarte eletrônico e reciclagem tecnológica.**")
     
-    TIMEOUT_MINUTES = 15
-    TIMEOUT_SECONDS = TIMEOUT_MINUTES * 60
-
     # --- ESTADOS ---
-    if "historico" not in st.session_state:
-        st.session_state.historico = []  # lista de {"role":"user/model", "text":""}
-
     if "last_activity_time" not in st.session_state:
         st.session_state.last_activity_time = time.time()
 
+    if "metricas_chat" not in st.session_state:
+        st.session_state.metricas_chat = []  # métricas de streaming de cada resposta
+
+    # Mensagens e "Limpar conversa" reexecutam só a caixa de chat
+    chat_box()
+
+
+TIMEOUT_MINUTES = 15
+TIMEOUT_SECONDS = TIMEOUT_MINUTES * 60
+MAX_CHAT_METRICS = 50
+
+
+@st.fragment
+@measured_fragment("ChatBot")
+def chat_box():
+    # O histórico fica na memória do servidor; a sessão guarda só o id da conversa
+    chat_memory = get_chat_memory(TIMEOUT_SECONDS)
+    if "conversa_id" not in st.session_state:
+        st.session_state.conversa_id = chat_memory.nova_conversa()
+
     # --- TIMEOUT ---
     current_time = time.time()
     elapsed_time = current_time - st.session_state.last_activity_time
 
     if elapsed_time >= TIMEOUT_SECONDS:
-        st.session_state.historico = []
+        chat_memory.descartar(st.session_state.conversa_id)
         st.session_state.last_activity_time = current_time
         st.warning(f"Sessão expirada após {TIMEOUT_MINUTES} minutos. Conversa limpa.")
-        st.rerun()
 
-    # --- MODELO ---
-    model = genai.GenerativeModel(
-        model_name=MODEL_NAME,  
-        system_instruction=SYSTEM_INSTRUCTION
-    )
+    historico = chat_memory.obter(st.session_state.conversa_id)
+    turnos = list(historico)  # lista de {"role":"user/model", "text":""}
 
     # --- EXIBIR HISTÓRICO ---
-    for msg in st.session_state.historico:
+    for msg in turnos:
         with st.chat_message("assistant" if msg["role"] == "model" else "user"):
             st.markdown(msg["text"])
+            if msg.get("tokens_enviados"):
+                st.caption(f"Tokens enviados: {msg['tokens_enviados']}")
 
     # --- INPUT ---
     prompt = st.chat_input("Envie sua pergunta sobre descarte eletrônico...")
@@ -824,36 +1154,106 @@ elif selected == "ChatBot":
     if prompt:
         st.session_state.last_activity_time = time.time()
 
+        # contexto = histórico anterior (dentro do orçamento) + pergunta nova
+        contents, tokens_estimados, turnos_resumidos = montar_contexto(
+            turnos, prompt, CHAT_TOKEN_BUDGET
+        )
+
+        # Pontos de coleta e categorias: respondidos pelos dados do próprio site
+        rota = get_intent_router().responder(prompt)
+
+        # Só perguntas sem conversa anterior usam o cache: com histórico, a
+        # resposta depende do contexto e não pode ser reaproveitada
+        response_cache = get_response_cache()
+        cache_key = None
+        if rota is None and not turnos:
+            cache_key = normalizar_pergunta(prompt)
+        resposta_cache = response_cache.obter(cache_key) if cache_key else None
+
         # registra user
-        st.session_state.historico.append({"role": "user", "text": prompt})
+        historico.adicionar("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
 
         # gera resposta com streaming
         with st.chat_message("assistant"):
             placeholder = st.empty()
-            resposta = ""
+            # agrupa as atualizações da tela e mede o tempo até o 1º token
+            renderizador = RenderizadorStreaming(placeholder)
             try:
-                stream = model.generate_content(
-                    prompt,
-                    stream=True
-                )
-
-                for chunk in stream:
-                    if chunk.text:
-                        resposta += chunk.text
-                        placeholder.markdown(resposta + "▌")
-
-                placeholder.markdown(resposta)
+                if rota is not None:
+                    stream, origem = None, "local"
+                    chunks = reproduzir(rota[1])
+                elif resposta_cache is not None:
+                    # acerto no cache: reaproveita a resposta no mesmo placeholder
+                    stream, origem = None, "cache"
+                    chunks = reproduzir(resposta_cache)
+                else:
+                    origem = "gemini"
+                    # usa o modelo em cache (get_gemini_model) através do pool
+                    stream = get_gemini_pool().transmitir(contents)
+                    stream.ao_esperar = lambda posicao: placeholder.markdown(
+                        f"⏳ Muitas perguntas ao mesmo tempo — você é o {posicao}º da fila..."
+                    )
+                    chunks = stream
+
+                for texto in chunks:
+                    renderizador.adicionar(texto)
+
+                resposta = renderizador.finalizar()
+                METRICS.contar(f"resposta_{origem}")
+                if origem == "gemini" and renderizador.primeiro_token is not None:
+                    METRICS.registrar("gemini_primeiro_token", renderizador.primeiro_token - renderizador.inicio)
+                st.session_state.metricas_chat.append(dict(renderizador.metricas(), origem=origem))
+                del st.session_state.metricas_chat[:-MAX_CHAT_METRICS]
+                if rota is not None:
+                    st.caption("Respondido com os dados do EcoTech (sem consultar o Gemini).")
+                if stream is None:
+                    tokens_enviados = 0
+                else:
+                    tokens_enviados = tokens_do_prompt(stream.resposta) or tokens_estimados
+                    response_cache.guardar(cache_key, resposta)
+                st.caption(f"Tokens enviados: {tokens_enviados}"
+                           + (f" ({turnos_resumidos} turnos antigos resumidos)" if turnos_resumidos else ""))
 
                 # registra modelo
-                st.session_state.historico.append({"role": "model", "text": resposta})
+                historico.adicionar("model", resposta, tokens_enviados=tokens_enviados)
 
             except Exception as e:
+                METRICS.contar("resposta_erro")
                 st.error(f"Erro ao gerar resposta: {e}")
 
+    # --- DEPURAÇÃO ---
+    with st.expander("Informações de Depuração"):
+        st.write("##### Cache de respostas:")
+        st.write(get_response_cache().info())
+        st.write("##### Pool do Gemini:")
+        st.write(get_gemini_pool().info())
+        st.write("##### Memória das conversas (todas as sessões):")
+        st.write(chat_memory.info())
+        if st.session_state.metricas_chat:
+            st.write("##### Streaming das respostas desta sessão:")
+            st.dataframe(pd.DataFrame(st.session_state.metricas_chat))
+        show_metrics("ChatBot")
+
     # --- LIMPAR ---
     if st.button("🧹 Limpar conversa"):
-        st.session_state.historico = []
+        historico.limpar()
+        st.session_state.metricas_chat = []
         st.session_state.last_activity_time = time.time()
-        st.rerun()
\ No newline at end of file
+        st.rerun(scope="fragment")
+
+# ==================================================================== #
+# ========================== ABA SELECIONADA ========================= #
+PAGES = {
+    "Informações": page_info,
+    "Sobre e Entrevistas": page_about,
+    "Opiniões": page_opinions,
+    "Pontos de Coleta": page_collection_points,
+    "ChatBot": page_chatbot,
+}
+# Etapas medidas dentro da aba ficam marcadas com ela e com a sessão
+with METRICS.rerun(selected, current_session(), nome="pagina"):
+    METRICS.registrar("segredos", SECRETS_SECONDS)
+    PAGES[selected]()
+METRICS.registrar("script", time.perf_counter() - RERUN_START, aba=selected)
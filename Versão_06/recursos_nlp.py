@@ -0,0 +1,157 @@
+"""
+Gerenciador do pipeline spaCy compartilhado pelo EcoTech.
+
+O modelo é carregado uma única vez por processo, na primeira vez que alguma
+aba realmente precisa de NLP, e depois reaproveitado por todas as sessões.
+"""
+import os
+import threading
+import time
+
+import spacy
+
+from filtro_lexico import EXCLUIDOS, NOME_COMPONENTE as NOME_FILTRO
+
+# Ordem de preferência dos modelos em português
+MODELOS_PT = ("pt_core_news_sm", "pt_core_news_md", "pt_core_news_lg")
+
+# Classes gramaticais mantidas na nuvem de palavras
+CLASSES_MANTIDAS = ("VERB", "NOUN", "PROPN", "ADJ")
+
+# Componentes que o filtro de lemas nunca usa (nem a divisão em frases)
+COMPONENTES_DESNECESSARIOS = ("parser", "ner", "senter", "sentencizer")
+
+
+def carregar_spacy_pt(modelos=MODELOS_PT):
+    """
+    Tenta carregar os modelos na ordem (sm → md → lg) e, se nenhum estiver
+    instalado, devolve um pipeline em branco só com o sentencizer.
+    """
+    for nome in modelos:
+        try:
+            return spacy.load(nome), nome
+        except Exception:
+            continue
+
+    from spacy.lang.pt import Portuguese
+    nlp_blank = Portuguese()
+    if "sentencizer" not in nlp_blank.pipe_names:
+        nlp_blank.add_pipe("sentencizer")
+    return nlp_blank, "blank_pt"
+
+
+def memoria_rss_mb():
+    """Memória residente atual do processo em MB (None se indisponível)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            paginas = int(f.read().split()[1])
+        import resource
+        return paginas * resource.getpagesize() / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class GerenciadorNLP:
+    """
+    Guarda uma única instância do spaCy para o processo inteiro.
+    O carregamento é preguiçoso e protegido por lock, então várias sessões
+    pedindo o modelo ao mesmo tempo disparam uma carga só.
+    """
+
+    def __init__(self, modelos=MODELOS_PT):
+        self.modelos = modelos
+        self.nome_modelo = None
+        self.tempo_carga = None   # segundos
+        self.memoria_mb = None    # aumento de RSS durante a carga
+        self._nlp = None
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self):
+        return self._nlp is not None
+
+    def obter(self):
+        """Retorna o pipeline, carregando-o na primeira chamada."""
+        if self._nlp is None:
+            with self._lock:
+                if self._nlp is None:
+                    self._carregar()
+        return self._nlp
+
+    def _carregar(self):
+        mem_antes = memoria_rss_mb()
+        inicio = time.perf_counter()
+
+        nlp, nome = carregar_spacy_pt(self.modelos)
+
+        self.tempo_carga = time.perf_counter() - inicio
+        mem_depois = memoria_rss_mb()
+        if mem_antes is not None and mem_depois is not None:
+            self.memoria_mb = max(mem_depois - mem_antes, 0.0)
+        self.nome_modelo = nome
+        self._nlp = nlp
+
+    def info(self):
+        """Resumo para o painel de depuração."""
+        return {
+            "modelo": self.nome_modelo,
+            "carregado": self.carregado,
+            "tempo_carga_s": None if self.tempo_carga is None else round(self.tempo_carga, 3),
+            "memoria_mb": None if self.memoria_mb is None else round(self.memoria_mb, 1),
+        }
+
+
+def extrair_tokens(doc):
+    """Lemas relevantes de um Doc (mesmo filtro usado na aba Opiniões)."""
+    # Tokens marcados pelo filtro_lexico (termos e frases excluídos)
+    excluidos = doc.user_data.get(EXCLUIDOS)
+    excluidos = set(excluidos) if excluidos else ()
+    tokens_list = []
+    for token in doc:
+        if token.i in excluidos: continue
+        if not token.is_alpha: continue
+        if getattr(token, "is_stop", False): continue
+        lemma = token.lemma_.lower() if hasattr(token, "lemma_") else token.text.lower()
+        if hasattr(token, "pos_") and token.pos_:
+            if token.pos_ in CLASSES_MANTIDAS:
+                tokens_list.append(lemma)
+        else:
+            if len(lemma) > 2: tokens_list.append(lemma)
+    return tokens_list
+
+
+class MotorTextos:
+    """
+    Processa as respostas em lote com `nlp.pipe`, um Doc por resposta,
+    sem o parser, o NER e a divisão em frases. Devolve uma lista de tokens
+    por resposta.
+    """
+
+    def __init__(self, nlp, batch_size=256, n_process=1):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.desativados = [c for c in COMPONENTES_DESNECESSARIOS if c in nlp.pipe_names]
+
+    def processar(self, textos):
+        textos = list(textos)
+        if not textos:
+            return []
+        # Abrir processos só compensa quando há lotes para todos eles e
+        # núcleos livres: acima de os.cpu_count() eles só disputam a CPU
+        n_process = min(self.n_process, os.cpu_count() or 1)
+        if len(textos) < self.batch_size * n_process:
+            n_process = 1
+        docs = self.nlp.pipe(
+            textos,
+            batch_size=self.batch_size,
+            n_process=n_process,
+            disable=self.desativados,
+        )
+        filtro = self.nlp.get_pipe(NOME_FILTRO) if NOME_FILTRO in self.nlp.pipe_names else None
+        resultados = []
+        for doc in docs:
+            resultados.append(extrair_tokens(doc))
+            if filtro is not None:
+                filtro.contar(doc)
+        return resultados
@@ -0,0 +1,130 @@
+"""
+Roteador de intenções do EcoBot.
+
+Perguntas sobre pontos de coleta ("tem ponto de coleta perto de Santo
+Amaro?") e sobre as categorias de lixo eletrônico ("em que linha entra a
+geladeira?") são respondidas direto dos dados do site, em milissegundos.
+Só o que não se encaixa nessas intenções segue para o Gemini.
+"""
+import re
+from collections import defaultdict
+
+from cache_respostas import remover_acentos
+
+# Palavras que não identificam um local dentro do nome de um ponto
+PALAVRAS_GENERICAS = {
+    "de", "da", "do", "das", "dos", "e", "a", "o", "zona", "s", "club",
+}
+
+TERMOS_PONTO = {"ponto", "pontos", "coleta", "ecoponto", "ecopontos"}
+# Pedem uma localização mesmo sem citar um lugar conhecido
+TERMOS_LOCAL = {"onde", "perto", "proximo", "proxima", "proximos", "endereco", "lista", "bairro"}
+TERMOS_CATEGORIA = {"linha", "categoria", "categorias", "tipo", "tipos", "classificacao", "classifica"}
+
+MAX_PONTOS_RESPOSTA = 8
+
+
+def normalizar(texto):
+    return remover_acentos(texto.lower())
+
+
+def palavras(texto):
+    return re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", normalizar(texto))
+
+
+def singular(palavra):
+    """Plural simples do português → singular (celulares → celular)."""
+    if len(palavra) > 4 and palavra.endswith("es") and palavra[-3] in "rsz":
+        return palavra[:-2]
+    if len(palavra) > 3 and palavra.endswith("s"):
+        return palavra[:-1]
+    return palavra
+
+
+class RoteadorIntencoes:
+    """
+    Índices em memória sobre os pontos de coleta e as categorias.
+    `responder()` devolve `(intencao, texto)` ou None para cair no modelo.
+    """
+
+    def __init__(self, pontos, categorias):
+        self.pontos = pontos.reset_index(drop=True)
+        self.categorias = categorias
+
+        # palavra do nome → índices dos pontos que a contêm
+        self._indice_local = defaultdict(set)
+        for i, nome in enumerate(self.pontos["nome"]):
+            for p in palavras(nome):
+                if p not in PALAVRAS_GENERICAS and not p.isdigit() and len(p) > 1:
+                    self._indice_local[singular(p)].add(i)
+
+        # item (uma ou mais palavras) → nome da categoria
+        self._indice_itens = {}
+        for nome, _, itens in categorias:
+            for item in itens:
+                self._indice_itens[tuple(singular(p) for p in palavras(item))] = nome
+            cor = palavras(nome)[-1]
+            self._indice_itens[("linha", cor)] = nome
+
+    # ---------------------------------------------------------------- #
+    def _pontos_citados(self, termos):
+        pontuacao = defaultdict(int)
+        for termo in termos:
+            for i in self._indice_local.get(termo, ()):
+                pontuacao[i] += 1
+        if not pontuacao:
+            return []
+        melhor = max(pontuacao.values())
+        return sorted((i for i, n in pontuacao.items() if n == melhor),
+                      key=lambda i: self.pontos.at[i, "nome"])
+
+    def _categorias_citadas(self, termos):
+        encontradas = []
+        for chave, nome in self._indice_itens.items():
+            n = len(chave)
+            if any(tuple(termos[i:i + n]) == chave for i in range(len(termos) - n + 1)):
+                if nome not in encontradas:
+                    encontradas.append(nome)
+        return encontradas
+
+    def _responder_local(self, indices):
+        if not indices:
+            return (
+                f"Temos **{len(self.pontos)} pontos de coleta** cadastrados. "
+                "Diga um bairro ou estabelecimento (ex.: *Santo Amaro*, *Raia*, *Carrefour*) "
+                "ou veja todos no mapa da aba **Pontos de Coleta**."
+            )
+        linhas = [
+            f"- **{self.pontos.at[i, 'nome']}** ({self.pontos.at[i, 'latitude']:.5f}, "
+            f"{self.pontos.at[i, 'longitude']:.5f})"
+            for i in indices[:MAX_PONTOS_RESPOSTA]
+        ]
+        extra = len(indices) - MAX_PONTOS_RESPOSTA
+        if extra > 0:
+            linhas.append(f"- ... e mais {extra} ponto(s).")
+        return (
+            f"Encontrei **{len(indices)} ponto(s) de coleta** relacionados à sua busca:\n\n"
+            + "\n".join(linhas)
+            + "\n\nVocê pode ver todos no mapa da aba **Pontos de Coleta**."
+        )
+
+    def _responder_categoria(self, nomes):
+        descricoes = {nome: descricao for nome, descricao, _ in self.categorias}
+        return "\n\n".join(f"**{nome}:** {descricoes[nome]}" for nome in nomes)
+
+    def responder(self, pergunta):
+        brutas = palavras(pergunta)
+        termos = [singular(p) for p in brutas]
+        conjunto = set(brutas) | set(termos)
+
+        if conjunto & TERMOS_PONTO:
+            indices = self._pontos_citados(termos)
+            if indices or conjunto & TERMOS_LOCAL:
+                return "pontos_coleta", self._responder_local(indices)
+
+        if conjunto & TERMOS_CATEGORIA:
+            nomes = self._categorias_citadas(termos)
+            if nomes:
+                return "categoria", self._responder_categoria(nomes)
+
+        return None
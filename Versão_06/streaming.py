@@ -0,0 +1,72 @@
+"""
+Renderização do streaming do EcoBot com atualizações agrupadas.
+
+Cada `placeholder.markdown()` reenvia o texto inteiro pelo websocket, então
+atualizar a cada pedaço custa bytes quadráticos numa resposta longa. Aqui
+os pedaços são acumulados e a tela só é atualizada a cada `intervalo`
+segundos ou `max_caracteres` novos, com um envio final garantido. As
+métricas de cada resposta ficam em `metricas()`.
+"""
+import time
+
+
+class RenderizadorStreaming:
+    """Acumula o texto recebido e atualiza o placeholder em ritmo fixo."""
+
+    def __init__(self, placeholder, intervalo=0.08, max_caracteres=400, cursor="▌"):
+        self.placeholder = placeholder
+        self.intervalo = intervalo
+        self.max_caracteres = max_caracteres
+        self.cursor = cursor
+
+        self.texto = ""
+        self.inicio = time.perf_counter()
+        self.primeiro_token = None
+        self.fim = None
+        self.chunks = 0
+        self.atualizacoes = 0
+        self.bytes_enviados = 0
+
+        self._ultima_atualizacao = self.inicio
+        self._pendentes = 0   # caracteres ainda não enviados
+
+    def _enviar(self, conteudo):
+        self.placeholder.markdown(conteudo)
+        self.atualizacoes += 1
+        self.bytes_enviados += len(conteudo.encode("utf-8"))
+        self._ultima_atualizacao = time.perf_counter()
+        self._pendentes = 0
+
+    def adicionar(self, pedaco):
+        if not pedaco:
+            return
+        agora = time.perf_counter()
+        if self.primeiro_token is None:
+            self.primeiro_token = agora
+        self.chunks += 1
+        self.texto += pedaco
+        self._pendentes += len(pedaco)
+
+        # Primeiro pedaço sai na hora; os demais esperam o intervalo ou o limite
+        if (self.atualizacoes == 0
+                or agora - self._ultima_atualizacao >= self.intervalo
+                or self._pendentes >= self.max_caracteres):
+            self._enviar(self.texto + self.cursor)
+
+    def finalizar(self):
+        """Envia o texto final (sem cursor) e fecha as métricas."""
+        self._enviar(self.texto)
+        self.fim = time.perf_counter()
+        return self.texto
+
+    def metricas(self):
+        fim = self.fim or time.perf_counter()
+        return {
+            "tempo_primeiro_token_s": None if self.primeiro_token is None
+            else round(self.primeiro_token - self.inicio, 3),
+            "tempo_total_s": round(fim - self.inicio, 3),
+            "chunks": self.chunks,
+            "atualizacoes": self.atualizacoes,
+            "bytes_enviados": self.bytes_enviados,
+            "caracteres": len(self.texto),
+        }
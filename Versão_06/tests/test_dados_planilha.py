@@ -0,0 +1,78 @@
+"""
+FontePlanilha contra o substituto local da planilha (CSV com ETag / 304):
+revalidação condicional e validadores guardados só depois de um parse bom.
+
+Uso (a partir de Versão_06/):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_APP)
+sys.path.insert(0, os.path.join(PASTA_APP, "benchmarks"))
+
+import substitutos_locais  # noqa: E402
+from dados_planilha import FontePlanilha  # noqa: E402
+
+CSV_QUEBRADO = b'Carimbo de data/hora,Opiniao\n"aspas sem fechar,1\n'
+
+
+@pytest.fixture
+def planilha():
+    servidor, subs, url = substitutos_locais.iniciar(latencia_planilha=0, linhas_planilha=20)
+    yield subs, f"{url}/export?format=csv"
+    servidor.shutdown()
+
+
+def test_304_mantem_os_dados(planilha):
+    subs, url = planilha
+    fonte = FontePlanilha(url)
+    assert fonte.atualizar()
+    dados, versao = fonte.dados, fonte.versao
+    assert "percepcao" in dados.columns and len(dados) == 20
+
+    # Mesmo export: o servidor responde 304 ao If-None-Match
+    assert not fonte.atualizar()
+    assert fonte.nao_modificados == 1 and fonte.ultimo_erro is None
+    assert fonte.dados is dados and fonte.versao == versao
+    assert subs.requisicoes["planilha"] == 2
+
+
+def test_planilha_nova_troca_a_versao_e_avisa(planilha):
+    subs, url = planilha
+    fonte = FontePlanilha(url)
+    avisos = []
+    fonte.ao_mudar(lambda dados, versao: avisos.append(versao))
+    fonte.atualizar()
+    primeira = fonte.versao
+
+    subs.trocar_planilha(substitutos_locais.gerar_csv(30, seed=1))
+    assert fonte.atualizar()
+    assert len(fonte.dados) == 30
+    assert avisos == [primeira, fonte.versao] and primeira != fonte.versao
+
+
+def test_csv_quebrado_nao_guarda_os_validadores(planilha):
+    subs, url = planilha
+    fonte = FontePlanilha(url)
+    fonte.atualizar()
+    dados, versao, etag = fonte.dados, fonte.versao, fonte._etag
+
+    subs.trocar_planilha(CSV_QUEBRADO)
+    assert not fonte.atualizar()
+    assert fonte.ultimo_erro is not None
+    assert fonte.dados is dados and fonte.versao == versao
+    # O ETag do CSV quebrado não foi guardado: a próxima consulta baixa de
+    # novo em vez de receber 304 para sempre
+    assert fonte._etag == etag != subs.etag
+    assert not fonte.atualizar()
+    assert fonte.nao_modificados == 0
+
+    # Corrigido na origem, entra na próxima consulta
+    subs.trocar_planilha(substitutos_locais.gerar_csv(25))
+    assert fonte.atualizar()
+    assert len(fonte.dados) == 25 and fonte.ultimo_erro is None
+    assert fonte._etag == subs.etag
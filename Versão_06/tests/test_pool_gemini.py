@@ -0,0 +1,194 @@
+"""
+Pool do Gemini: quais erros valem nova tentativa e o comportamento do pool
+(single-flight, limite de concorrência, backoff, taxa e fila) contra um
+cliente falso.
+
+Uso (a partir de Versão_06/):
+    python -m pytest -q tests
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from google.api_core import exceptions as api_core
+from google.auth.exceptions import TransportError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pool_gemini  # noqa: E402
+from pool_gemini import BaldeTokens, PoolGemini, erro_temporario  # noqa: E402
+
+
+def resposta_http(status):
+    resposta = requests.Response()
+    resposta.status_code = status
+    return resposta
+
+
+@pytest.mark.parametrize("erro", [
+    TimeoutError(),
+    ConnectionError(),
+    requests.ConnectionError(),
+    requests.Timeout(),
+    requests.exceptions.ChunkedEncodingError(),
+    requests.HTTPError(response=resposta_http(503)),
+    requests.HTTPError(response=resposta_http(429)),
+    api_core.ServiceUnavailable("indisponível"),
+    api_core.DeadlineExceeded("prazo"),
+    api_core.TooManyRequests("cota"),
+    api_core.InternalServerError("interno"),
+    TransportError("rede"),
+], ids=lambda erro: type(erro).__name__)
+def test_erros_temporarios(erro):
+    assert erro_temporario(erro)
+
+
+@pytest.mark.parametrize("erro", [
+    ValueError(),
+    requests.HTTPError(response=resposta_http(400)),
+    requests.HTTPError(response=resposta_http(404)),
+    requests.exceptions.MissingSchema(),
+    requests.exceptions.InvalidURL(),
+    api_core.InvalidArgument("pedido inválido"),
+    api_core.PermissionDenied("chave"),
+], ids=lambda erro: type(erro).__name__)
+def test_erros_definitivos(erro):
+    assert not erro_temporario(erro)
+
+
+# -------------------------------------------------------------------- #
+# PoolGemini contra um cliente falso (sem rede)
+
+class ClienteFalso:
+    """`gerar` que conta as chamadas e pode segurar a resposta até ser liberado."""
+
+    def __init__(self, pedacos=("olá", " mundo"), falhas=()):
+        self.pedacos = pedacos
+        self.falhas = list(falhas)    # exceções levantadas nas primeiras chamadas
+        self.liberar = threading.Event()
+        self.liberar.set()
+        self.chamadas = []
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, contents):
+        with self._lock:
+            self.chamadas.append(contents)
+            falha = self.falhas.pop(0) if self.falhas else None
+        if falha is not None:
+            raise falha
+        return self._gerar()
+
+    def _gerar(self):
+        with self._lock:
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+        try:
+            assert self.liberar.wait(5)
+            yield from self.pedacos
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+
+
+def ler(fluxo):
+    return "".join(fluxo)
+
+
+def test_prompts_iguais_viram_uma_chamada():
+    cliente = ClienteFalso()
+    cliente.liberar.clear()
+    pool = PoolGemini(cliente, requisicoes_por_minuto=6000)
+    contents = [{"role": "user", "parts": ["onde descartar pilha?"]}]
+    primeiro = pool.transmitir(contents)
+    segundo = pool.transmitir(list(contents))
+    assert not primeiro.compartilhado and segundo.compartilhado
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leituras = [executor.submit(ler, primeiro), executor.submit(ler, segundo)]
+        cliente.liberar.set()
+        assert [f.result(timeout=5) for f in leituras] == ["olá mundo", "olá mundo"]
+    assert len(cliente.chamadas) == 1
+    assert pool.info()["compartilhadas"] == 1
+
+
+def test_max_concorrencia_limita_chamadas_simultaneas():
+    cliente = ClienteFalso()
+    cliente.liberar.clear()
+    pool = PoolGemini(cliente, max_concorrencia=2, requisicoes_por_minuto=6000)
+    fluxos = [pool.transmitir([f"pergunta {i}"]) for i in range(6)]
+    time.sleep(0.2)
+    assert cliente.max_simultaneas == 2
+    assert pool.info()["na_fila"] == 4
+
+    cliente.liberar.set()
+    assert [ler(f) for f in fluxos] == ["olá mundo"] * 6
+    assert cliente.max_simultaneas == 2
+
+
+def test_erro_temporario_repete_com_backoff(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(pool_gemini.time, "sleep", esperas.append)
+    cliente = ClienteFalso(falhas=[ConnectionError(), api_core.ServiceUnavailable("503")])
+    pool = PoolGemini(cliente, requisicoes_por_minuto=6000, backoff_base=1.0, backoff_max=20.0)
+
+    assert ler(pool.transmitir(["pilha"])) == "olá mundo"
+    assert len(cliente.chamadas) == 3
+    assert len(esperas) == 2
+    assert 0 <= esperas[0] <= 1.0 and 0 <= esperas[1] <= 2.0
+    info = pool.info()
+    assert info["novas_tentativas"] == 2 and info["falhas"] == 0
+
+
+def test_erro_definitivo_nao_repete():
+    cliente = ClienteFalso(falhas=[api_core.InvalidArgument("pedido inválido")])
+    pool = PoolGemini(cliente, requisicoes_por_minuto=6000)
+    with pytest.raises(api_core.InvalidArgument):
+        ler(pool.transmitir(["pilha"]))
+    assert len(cliente.chamadas) == 1
+    assert pool.info()["falhas"] == 1
+
+
+def test_backoff_full_jitter(monkeypatch):
+    sorteios = []
+
+    def uniform(a, b):
+        sorteios.append((a, b))
+        return b
+    monkeypatch.setattr(pool_gemini.random, "uniform", uniform)
+    pool = PoolGemini(ClienteFalso(), backoff_base=0.5, backoff_max=3.0)
+    assert [pool._espera_backoff(t) for t in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    assert all(a == 0 for a, _ in sorteios)
+
+
+def test_balde_tokens_limita_a_taxa():
+    balde = BaldeTokens(por_minuto=1200, capacidade=2)   # 20/s, rajada de 2
+    inicio = time.monotonic()
+    for _ in range(6):
+        balde.adquirir()
+    # 2 da rajada na hora e mais 4 a 20/s
+    assert time.monotonic() - inicio >= 0.18
+
+
+def test_ao_esperar_recebe_a_posicao_na_fila():
+    cliente = ClienteFalso()
+    cliente.liberar.clear()
+    pool = PoolGemini(cliente, max_concorrencia=1, requisicoes_por_minuto=6000)
+    primeiro = pool.transmitir(["primeira"])
+    segundo = pool.transmitir(["segunda"])
+    terceiro = pool.transmitir(["terceira"])
+    posicoes = []
+    terceiro.ao_esperar = posicoes.append
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leituras = [executor.submit(ler, f) for f in (primeiro, segundo, terceiro)]
+        time.sleep(0.2)
+        assert posicoes == [2]
+        cliente.liberar.set()
+        assert [f.result(timeout=5) for f in leituras] == ["olá mundo"] * 3
+    assert posicoes[0] == 2 and set(posicoes) <= {1, 2}